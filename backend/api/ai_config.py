@@ -4,8 +4,8 @@ AI配置API路由
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from datetime import datetime
-import json
 import logging
+import openai
 
 from backend.database.db import get_db
 
@@ -119,19 +119,16 @@ def test_ai_config():
                 'error': '缺少必要的配置参数（API密钥、基础URL或模型名称）'
             }), 400
         
-        # 导入 requests 库
-        import requests
+        # 使用进程内共享的客户端（与回复任务复用同一连接池）
+        from core.ai.client_registry import get_llm_client_registry
+        client = get_llm_client_registry().get(base_url, api_key)
         
-        # 构建请求头
-        headers = {
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json'
-        }
+        logger.info(f'测试AI连接: URL={base_url}, Model={model}')
         
-        # 构建请求体
-        payload = {
-            'model': model,
-            'messages': [
+        # 发送请求到 AI API
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
                 {
                     'role': 'system',
                     'content': '你是一个友好的助手。'
@@ -141,91 +138,53 @@ def test_ai_config():
                     'content': '你好，请回复"测试成功"'
                 }
             ],
-            'temperature': float(temperature),
-            'max_tokens': int(max_tokens)
-        }
-        
-        # 确保 base_url 格式正确
-        api_url = base_url.rstrip('/')
-        if not api_url.endswith('/chat/completions'):
-            api_url += '/chat/completions'
-        
-        logger.info(f'测试AI连接: URL={api_url}, Model={model}')
-        
-        # 发送请求到 AI API
-        response = requests.post(
-            api_url,
-            headers=headers,
-            json=payload,
+            temperature=float(temperature),
+            max_tokens=int(max_tokens),
             timeout=30
         )
         
-        logger.info(f'AI API 响应状态码: {response.status_code}')
-        
-        # 检查响应状态
-        if response.status_code == 200:
-            try:
-                result = response.json()
-                
-                # 提取 AI 回复内容
-                choices = result.get('choices', [])
-                if choices and len(choices) > 0:
-                    message = choices[0].get('message', {})
-                    reply_content = message.get('content', '')
-                    
-                    logger.info(f'AI 回复内容: {reply_content}')
-                    
-                    return jsonify({
-                        'success': True,
-                        'message': 'AI连接测试成功',
-                        'reply': reply_content,
-                        'model': result.get('model', model),
-                        'usage': result.get('usage', {})
-                    })
-                else:
-                    return jsonify({
-                        'success': False,
-                        'error': 'AI API 返回格式异常：缺少 choices 字段'
-                    }), 400
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f'解析 AI API 响应失败: {e}')
-                return jsonify({
-                    'success': False,
-                    'error': f'解析响应失败: {str(e)}'
-                }), 400
-        else:
-            # API 返回错误状态码
-            error_text = response.text
-            logger.error(f'AI API 错误 ({response.status_code}): {error_text}')
-            
-            try:
-                error_json = response.json()
-                error_message = error_json.get('error', {}).get('message', error_text)
-            except:
-                error_message = error_text[:200]  # 只取前200个字符
-            
+        # 提取 AI 回复内容
+        if not response.choices:
             return jsonify({
                 'success': False,
-                'error': f'API返回错误 (HTTP {response.status_code})',
-                'details': error_message
+                'error': 'AI API 返回格式异常：缺少 choices 字段'
             }), 400
-            
-    except requests.exceptions.Timeout:
+        
+        reply_content = response.choices[0].message.content or ''
+        logger.info(f'AI 回复内容: {reply_content}')
+        
+        return jsonify({
+            'success': True,
+            'message': 'AI连接测试成功',
+            'reply': reply_content,
+            'model': response.model or model,
+            'usage': response.usage.model_dump() if response.usage else {}
+        })
+        
+    except openai.APITimeoutError:
         logger.error('AI API 连接超时')
         return jsonify({
             'success': False,
             'error': '连接超时，请检查网络或API地址是否正确'
         }), 400
         
-    except requests.exceptions.ConnectionError as e:
+    except openai.APIConnectionError as e:
         logger.error(f'无法连接到 AI API: {e}')
         return jsonify({
             'success': False,
             'error': '无法连接到API服务器，请检查Base URL是否正确'
         }), 400
         
-    except requests.exceptions.RequestException as e:
+    except openai.APIStatusError as e:
+        # API 返回错误状态码
+        logger.error(f'AI API 错误 ({e.status_code}): {e.message}')
+        return jsonify({
+            'success': False,
+            'error': f'API返回错误 (HTTP {e.status_code})',
+            'details': str(e.message)[:200]
+        }), 400
+        
+    except openai.APIError as e:
         logger.error(f'请求 AI API 失败: {e}')
         return jsonify({
             'success': False,
@@ -238,3 +197,10 @@ def test_ai_config():
             'success': False,
             'error': f'测试失败: {str(e)}'
         }), 500
+
+@bp.route('/config/pool', methods=['GET'])
+@jwt_required()
+def get_client_pool_stats():
+    """LLM 客户端连接池统计（当前进程）"""
+    from core.ai.client_registry import get_llm_client_registry
+    return jsonify(get_llm_client_registry().get_stats())
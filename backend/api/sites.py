@@ -232,6 +232,23 @@ def test_site_connection(site_id):
     # TODO: 实现站点连接测试逻辑
     return jsonify({'message': '连接测试功能开发中'}), 501
 
+@bp.route('/<int:site_id>/profile/reset', methods=['POST'])
+@jwt_required()
+def reset_site_profile(site_id):
+    """重置站点的持久化浏览器配置（配置损坏时使用）"""
+    from core.browser.profile_store import get_profile_store
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM sites WHERE id = ?', (site_id,))
+        if not cursor.fetchone():
+            return jsonify({'error': '站点不存在'}), 404
+    
+    if not get_profile_store().reset(f'site_{site_id}'):
+        return jsonify({'error': '浏览器配置正在使用中，请稍后再试'}), 409
+    
+    return jsonify({'message': '浏览器配置已重置'}), 200
+
 @bp.route('/<int:site_id>/run', methods=['POST'])
 @jwt_required()
 def run_site_task(site_id):
@@ -97,9 +97,62 @@ def init_db(db_path: str):
         )
     ''')
     
+    # 创建帖子列表水位表（上次成功运行时读到的最大帖子ID）
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS site_watermarks (
+            site_id INTEGER PRIMARY KEY,
+            last_post_id INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (site_id) REFERENCES sites(id) ON DELETE CASCADE
+        )
+    ''')
+    
+    # 创建已回复帖子表（按站点 + 帖子ID 去重，避免重复回复）
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS replied_posts (
+            site_id INTEGER NOT NULL,
+            post_id TEXT NOT NULL,
+            post_title TEXT,
+            reply_content TEXT,
+            result TEXT NOT NULL,
+            replied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (site_id, post_id),
+            FOREIGN KEY (site_id) REFERENCES sites(id) ON DELETE CASCADE
+        )
+    ''')
+    
+    # 创建被内容分析拒绝的帖子表（负缓存，过期后重新分析）
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rejected_posts (
+            site_id INTEGER NOT NULL,
+            post_id TEXT NOT NULL,
+            reason TEXT,
+            rejected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (site_id, post_id),
+            FOREIGN KEY (site_id) REFERENCES sites(id) ON DELETE CASCADE
+        )
+    ''')
+    
+    # 创建 LLM 响应缓存表（按提示词指纹缓存，过期或超出容量时按最近使用时间淘汰）
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            cache_key TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            model TEXT,
+            response TEXT NOT NULL,
+            hits INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
     # 创建索引
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_task_logs_site_id ON task_logs(site_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_task_logs_executed_at ON task_logs(executed_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_rejected_posts_expires_at ON rejected_posts(expires_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_replied_posts_content ON replied_posts(site_id, reply_content)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used_at ON llm_cache(last_used_at)')
     
     conn.commit()
     
@@ -71,10 +71,55 @@ CREATE TABLE IF NOT EXISTS notification_config (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- 帖子列表水位表
+CREATE TABLE IF NOT EXISTS site_watermarks (
+    site_id INTEGER PRIMARY KEY,
+    last_post_id INTEGER NOT NULL,         -- 上次成功运行时读到的最大帖子ID
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (site_id) REFERENCES sites(id) ON DELETE CASCADE
+);
+
+-- 已回复帖子表
+CREATE TABLE IF NOT EXISTS replied_posts (
+    site_id INTEGER NOT NULL,
+    post_id TEXT NOT NULL,
+    post_title TEXT,
+    reply_content TEXT,
+    result TEXT NOT NULL,                  -- success, failed, uncertain（请求已发出但结果未知，按已回复处理，不再重试）
+    replied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (site_id, post_id),        -- 主键即索引，批量查询走索引
+    FOREIGN KEY (site_id) REFERENCES sites(id) ON DELETE CASCADE
+);
+
+-- 被内容分析拒绝的帖子表（负缓存）
+CREATE TABLE IF NOT EXISTS rejected_posts (
+    site_id INTEGER NOT NULL,
+    post_id TEXT NOT NULL,
+    reason TEXT,                           -- ContentAnalyzer 给出的原因
+    rejected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,         -- 过期后重新分析
+    PRIMARY KEY (site_id, post_id),
+    FOREIGN KEY (site_id) REFERENCES sites(id) ON DELETE CASCADE
+);
+
+-- LLM 响应缓存表
+CREATE TABLE IF NOT EXISTS llm_cache (
+    cache_key TEXT PRIMARY KEY,            -- 模型、温度档位、系统提示词和用户提示词的哈希
+    kind TEXT NOT NULL,                    -- reply, sentiment
+    model TEXT,
+    response TEXT NOT NULL,
+    hits INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- 创建索引
 CREATE INDEX IF NOT EXISTS idx_task_logs_site_id ON task_logs(site_id);
 CREATE INDEX IF NOT EXISTS idx_task_logs_executed_at ON task_logs(executed_at);
 CREATE INDEX IF NOT EXISTS idx_sites_is_active ON sites(is_active);
+CREATE INDEX IF NOT EXISTS idx_rejected_posts_expires_at ON rejected_posts(expires_at);
+CREATE INDEX IF NOT EXISTS idx_replied_posts_content ON replied_posts(site_id, reply_content);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used_at ON llm_cache(last_used_at);
 
 -- 插入默认管理员账户
 -- 密码: admin123 (已哈希)
@@ -5,5 +5,10 @@ from backend.services.auth_service import AuthService
 from backend.services.site_service import SiteService
 from backend.services.task_service import TaskService
 from backend.services.notification_service import NotificationService
+from backend.services.watermark_service import WatermarkService
+from backend.services.reply_ledger_service import ReplyLedgerService
+from backend.services.rejected_post_service import RejectedPostService
+from backend.services.llm_cache_service import LLMCacheService
 
-__all__ = ['AuthService', 'SiteService', 'TaskService', 'NotificationService']
+__all__ = ['AuthService', 'SiteService', 'TaskService', 'NotificationService', 'WatermarkService',
+           'ReplyLedgerService', 'RejectedPostService', 'LLMCacheService']
@@ -0,0 +1,64 @@
+"""
+LLM 响应缓存服务
+按提示词指纹持久化模型输出，带过期时间和容量上限（按最近使用时间淘汰）
+"""
+from typing import Optional
+from datetime import datetime, timedelta
+
+from backend.database.db import get_db
+
+class LLMCacheService:
+    @staticmethod
+    def get(cache_key: str, ttl_hours: float) -> Optional[str]:
+        """读取未过期的缓存并刷新最近使用时间，未命中返回 None"""
+        now = datetime.now()
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT response FROM llm_cache WHERE cache_key = ? AND created_at > ?',
+                (cache_key, now - timedelta(hours=ttl_hours))
+            )
+            row = cursor.fetchone()
+            if not row:
+                return None
+            cursor.execute(
+                'UPDATE llm_cache SET hits = hits + 1, last_used_at = ? WHERE cache_key = ?',
+                (now, cache_key)
+            )
+            conn.commit()
+            return row['response']
+    
+    @staticmethod
+    def put(cache_key: str, kind: str, model: str, response: str, ttl_hours: float, max_entries: int):
+        """写入缓存，随后删除过期记录，并在超出容量时淘汰最久未使用的记录"""
+        now = datetime.now()
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO llm_cache (cache_key, kind, model, response, hits, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, 0, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    response = excluded.response,
+                    hits = 0,
+                    created_at = excluded.created_at,
+                    last_used_at = excluded.last_used_at
+            ''', (cache_key, kind, model, response, now, now))
+            
+            cursor.execute('DELETE FROM llm_cache WHERE created_at <= ?', (now - timedelta(hours=ttl_hours),))
+            cursor.execute('SELECT COUNT(*) FROM llm_cache')
+            overflow = cursor.fetchone()[0] - max_entries
+            if overflow > 0:
+                cursor.execute('''
+                    DELETE FROM llm_cache WHERE cache_key IN (
+                        SELECT cache_key FROM llm_cache ORDER BY last_used_at ASC LIMIT ?
+                    )
+                ''', (overflow,))
+            conn.commit()
+    
+    @staticmethod
+    def clear() -> int:
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM llm_cache')
+            conn.commit()
+            return cursor.rowcount
@@ -0,0 +1,68 @@
+"""
+被拒绝帖子服务
+持久化内容分析拒绝的帖子（负缓存），记录带过期时间
+"""
+from typing import Iterable, List, Set
+from datetime import datetime, timedelta
+
+from backend.database.db import get_db
+from backend.services.reply_ledger_service import QUERY_CHUNK_SIZE
+
+class RejectedPostService:
+    @staticmethod
+    def get_rejected_ids(site_id: int, post_ids: Iterable[str]) -> Set[str]:
+        """返回 post_ids 中未过期的被拒绝帖子ID"""
+        post_ids = list(dict.fromkeys(str(post_id) for post_id in post_ids))
+        rejected = set()
+        if not post_ids:
+            return rejected
+        
+        now = datetime.now()
+        with get_db() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(post_ids), QUERY_CHUNK_SIZE):
+                chunk = post_ids[start:start + QUERY_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f'SELECT post_id FROM rejected_posts WHERE site_id = ? AND expires_at > ? '
+                    f'AND post_id IN ({placeholders})',
+                    [site_id, now] + chunk
+                )
+                rejected.update(row['post_id'] for row in cursor.fetchall())
+        return rejected
+    
+    @staticmethod
+    def get_active_ids(site_id: int) -> List[str]:
+        """站点所有未过期的被拒绝帖子ID（用于重建布隆过滤器）"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT post_id FROM rejected_posts WHERE site_id = ? AND expires_at > ?',
+                (site_id, datetime.now())
+            )
+            return [row['post_id'] for row in cursor.fetchall()]
+    
+    @staticmethod
+    def add_rejected(site_id: int, post_id: str, reason: str, ttl_days: float):
+        """记录被拒绝的帖子，已存在时刷新原因和过期时间"""
+        now = datetime.now()
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO rejected_posts (site_id, post_id, reason, rejected_at, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(site_id, post_id) DO UPDATE SET
+                    reason = excluded.reason,
+                    rejected_at = excluded.rejected_at,
+                    expires_at = excluded.expires_at
+            ''', (site_id, str(post_id), reason, now, now + timedelta(days=ttl_days)))
+            conn.commit()
+    
+    @staticmethod
+    def purge_expired() -> int:
+        """删除过期记录，返回删除条数"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM rejected_posts WHERE expires_at <= ?', (datetime.now(),))
+            conn.commit()
+            return cursor.rowcount
@@ -0,0 +1,64 @@
+"""
+已回复帖子服务
+记录每个站点回复过的帖子，抓取列表后一次批量查询，跳过已回复的帖子
+"""
+from typing import Iterable, Optional, Set
+from datetime import datetime
+
+from backend.database.db import get_db
+
+# SQLite 单条语句的参数个数上限较低（旧版本为 999），批量查询分块进行
+QUERY_CHUNK_SIZE = 500
+
+class ReplyLedgerService:
+    @staticmethod
+    def get_replied_ids(site_id: int, post_ids: Iterable[str]) -> Set[str]:
+        """
+        返回 post_ids 中已成功回复过的帖子ID（按主键索引批量查询）
+        接口请求已发出但结果未知（uncertain）的帖子同样返回，避免重复回复
+        """
+        post_ids = list(dict.fromkeys(str(post_id) for post_id in post_ids))
+        replied = set()
+        if not post_ids:
+            return replied
+        
+        with get_db() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(post_ids), QUERY_CHUNK_SIZE):
+                chunk = post_ids[start:start + QUERY_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f"SELECT post_id FROM replied_posts WHERE site_id = ? AND result IN ('success', 'uncertain') "
+                    f"AND post_id IN ({placeholders})",
+                    [site_id] + chunk
+                )
+                replied.update(row['post_id'] for row in cursor.fetchall())
+        return replied
+    
+    @staticmethod
+    def has_posted(site_id: int, reply_content: str) -> bool:
+        """该站点是否已成功发过相同内容的回复"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT 1 FROM replied_posts WHERE site_id = ? AND reply_content = ? AND result = 'success' LIMIT 1",
+                (site_id, reply_content)
+            )
+            return cursor.fetchone() is not None
+    
+    @staticmethod
+    def record_reply(site_id: int, post_id: str, result: str,
+                     post_title: Optional[str] = None, reply_content: Optional[str] = None):
+        """记录一次回复（同一帖子再次回复时覆盖）"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO replied_posts (site_id, post_id, post_title, reply_content, result, replied_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(site_id, post_id) DO UPDATE SET
+                    post_title = excluded.post_title,
+                    reply_content = excluded.reply_content,
+                    result = excluded.result,
+                    replied_at = excluded.replied_at
+            ''', (site_id, str(post_id), post_title, reply_content, result, datetime.now()))
+            conn.commit()
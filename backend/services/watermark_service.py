@@ -0,0 +1,39 @@
+"""
+帖子列表水位服务
+记录每个站点上次成功运行时读到的最大帖子ID，增量抓取读到水位以下的帖子即停止翻页
+"""
+from typing import Optional
+from datetime import datetime
+
+from backend.database.db import get_db
+
+class WatermarkService:
+    @staticmethod
+    def get_watermark(site_id: int) -> Optional[int]:
+        """获取站点水位，首次运行返回 None"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT last_post_id FROM site_watermarks WHERE site_id = ?', (site_id,))
+            row = cursor.fetchone()
+            return row['last_post_id'] if row else None
+    
+    @staticmethod
+    def update_watermark(site_id: int, last_post_id: int):
+        """更新站点水位（只前进，不后退）"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO site_watermarks (site_id, last_post_id, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(site_id) DO UPDATE SET
+                    last_post_id = MAX(last_post_id, excluded.last_post_id),
+                    updated_at = excluded.updated_at
+            ''', (site_id, last_post_id, datetime.now()))
+            conn.commit()
+    
+    @staticmethod
+    def reset_watermark(site_id: int):
+        """清除站点水位，下次运行重新完整读取列表"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM site_watermarks WHERE site_id = ?', (site_id,))
+            conn.commit()
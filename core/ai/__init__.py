@@ -3,5 +3,6 @@ AI模块
 """
 from .reply_generator import ReplyGenerator
 from .content_analyzer import ContentAnalyzer
+from .client_registry import get_llm_client_registry
 
-__all__ = ['ReplyGenerator', 'ContentAnalyzer']
+__all__ = ['ReplyGenerator', 'ContentAnalyzer', 'get_llm_client_registry']
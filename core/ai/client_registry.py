@@ -0,0 +1,159 @@
+"""
+LLM 客户端注册表
+进程内按 (base_url, api_key) 复用 openai 客户端及其 HTTP 连接池，保持 TLS 长连接；
+AI 配置变化（地址或密钥不同）时才创建新客户端，超过上限时移除最久未使用的客户端，
+被移除的客户端在所有使用方释放后关闭连接池
+"""
+import os
+import time
+import logging
+import weakref
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import openai
+
+logger = logging.getLogger(__name__)
+
+class LLMClientRegistry:
+    def __init__(self, max_clients: int = 4, max_connections: int = 20,
+                 keepalive_expiry: float = 120, timeout: float = 60):
+        self.max_clients = max_clients
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        # 句柄被回收时的释放回调可能在持有锁的线程中由垃圾回收触发，使用可重入锁
+        self._lock = threading.RLock()
+        self._clients: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+        # 已移出注册表、仍有使用方持有句柄的客户端
+        self._retired: List[Dict] = []
+        self.stats = {'created': 0, 'reused': 0, 'evicted': 0, 'closed': 0}
+    
+    @staticmethod
+    def _key(base_url: str, api_key: str) -> Tuple[str, str]:
+        return (base_url or '').strip().rstrip('/'), (api_key or '').strip()
+    
+    def get(self, base_url: str, api_key: str, **options) -> openai.OpenAI:
+        """
+        获取（必要时创建）客户端，返回共享连接池的句柄（options 传给 with_options，如 max_retries）
+        使用方持有句柄期间客户端不会被关闭，句柄被回收时自动释放引用
+        """
+        key = self._key(base_url, api_key)
+        evicted = []
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry:
+                self._clients.move_to_end(key)
+                self.stats['reused'] += 1
+            else:
+                entry = self._create(*key)
+                self._clients[key] = entry
+                self.stats['created'] += 1
+                while len(self._clients) > self.max_clients:
+                    _, old = self._clients.popitem(last=False)
+                    self.stats['evicted'] += 1
+                    if old['refs']:
+                        # 仍有使用方，等最后一个句柄释放时再关闭
+                        self._retired.append(old)
+                    else:
+                        evicted.append(old)
+            entry['refs'] += 1
+            handle = entry['client'].with_options(**options)
+        weakref.finalize(handle, self._release, entry)
+        for old in evicted:
+            self._close(old)
+        return handle
+    
+    def _release(self, entry: Dict):
+        with self._lock:
+            entry['refs'] -= 1
+            if entry['refs'] > 0 or entry not in self._retired:
+                return
+            self._retired.remove(entry)
+        self._close(entry)
+    
+    def _create(self, base_url: str, api_key: str) -> Dict:
+        counters = {'requests': 0, 'errors': 0}
+        
+        def on_response(response):
+            counters['requests'] += 1
+            if response.status_code >= 400:
+                counters['errors'] += 1
+        
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            timeout=self.timeout,
+            event_hooks={'response': [on_response]}
+        )
+        client = openai.OpenAI(api_key=api_key, base_url=base_url or None, http_client=http_client)
+        logger.info(f"创建 LLM 客户端: {base_url}")
+        return {
+            'client': client,
+            'http_client': http_client,
+            'base_url': base_url,
+            'counters': counters,
+            'refs': 0,
+            'created_at': time.time()
+        }
+    
+    def _close(self, entry: Dict):
+        try:
+            entry['http_client'].close()
+            logger.info(f"关闭 LLM 客户端: {entry['base_url']}")
+        except Exception as e:
+            logger.debug(f"关闭 LLM 客户端失败: {e}")
+        with self._lock:
+            self.stats['closed'] += 1
+    
+    @staticmethod
+    def _pool_connections(http_client: httpx.Client) -> Tuple[int, int]:
+        """连接池中的 (连接数, 空闲连接数)，依赖 httpcore 内部结构，取不到时为 (0, 0)"""
+        try:
+            connections = http_client._transport._pool.connections
+            return len(connections), sum(1 for conn in connections if conn.is_idle())
+        except Exception:
+            return 0, 0
+    
+    def get_stats(self) -> Dict:
+        """各客户端的请求数、错误数和连接池状态"""
+        with self._lock:
+            clients = []
+            for entry in self._clients.values():
+                connections, idle = self._pool_connections(entry['http_client'])
+                clients.append({
+                    'base_url': entry['base_url'],
+                    'requests': entry['counters']['requests'],
+                    'errors': entry['counters']['errors'],
+                    'connections': connections,
+                    'idle_connections': idle,
+                    'refs': entry['refs'],
+                    'age': round(time.time() - entry['created_at'], 1)
+                })
+            return dict(self.stats, clients=clients, retired=len(self._retired))
+    
+    def close_all(self):
+        """关闭所有客户端（包括等待释放的），进程退出前调用"""
+        with self._lock:
+            entries = list(self._clients.values()) + self._retired
+            self._clients.clear()
+            self._retired = []
+        for entry in entries:
+            self._close(entry)
+
+
+_registry: Optional[LLMClientRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_llm_client_registry() -> LLMClientRegistry:
+    """获取全局 LLM 客户端注册表，单个客户端的连接数上限由 LLM_MAX_CONNECTIONS 配置（默认 20）"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LLMClientRegistry(max_connections=int(os.getenv('LLM_MAX_CONNECTIONS', '20')))
+        return _registry
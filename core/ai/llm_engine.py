@@ -0,0 +1,305 @@
+"""
+LLM 请求调度引擎
+进程内所有站点的模型请求都经由后台线程中的 asyncio 事件循环排队执行：
+全局并发信号量 + 每分钟请求数 / token 数令牌桶，按站点轮转出队，使并发运行的站点公平分享服务商配额；
+可重试的错误（429、5xx、超时、连接失败）按带抖动的指数退避重试，并遵循 Retry-After
+"""
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+# 可重试的 HTTP 状态码
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    每分钟 rate 个令牌的令牌桶，容量为 rate（允许一分钟内的突发），rate 为 0 时不限制
+    consume 允许扣成负数，用于按实际 token 用量修正预估值
+    """
+    
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute
+        self.tokens = float(rate_per_minute)
+        self._updated = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self._updated) * self.rate / 60)
+        self._updated = now
+    
+    def wait_time(self, amount: float) -> float:
+        """距离可以取出 amount 个令牌还需等待的秒数"""
+        if not self.rate:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.rate)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * 60 / self.rate
+    
+    def consume(self, amount: float):
+        if not self.rate:
+            return
+        self._refill()
+        self.tokens -= amount
+
+
+class LLMJob:
+    """一次排队中的模型请求"""
+    
+    def __init__(self, site_key: str, func: Callable[[], Any], estimated_tokens: int,
+                 future: asyncio.Future):
+        self.site_key = site_key
+        self.func = func
+        self.estimated_tokens = estimated_tokens
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+        self.queue_wait = 0.0
+        self.backoff = 0.0
+
+
+class LLMEngine:
+    def __init__(self, max_concurrency: int = 4, rpm: int = 0, tpm: int = 0,
+                 max_retries: int = 3, backoff_base: float = 1.0, backoff_max: float = 60.0):
+        """
+        Args:
+            max_concurrency: 同时在途的请求数上限
+            rpm / tpm: 每分钟请求数 / token 数上限，0 为不限制
+            max_retries: 可重试错误的最大重试次数
+            backoff_base / backoff_max: 指数退避的基数与上限（秒）
+        """
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._request_bucket = TokenBucket(rpm)
+        self._token_bucket = TokenBucket(tpm)
+        # 站点 -> 等待中的请求；轮转时从头部取出站点，处理后放回尾部
+        self._queues: "OrderedDict[str, Deque[LLMJob]]" = OrderedDict()
+        # 收到 429 后整个配额暂停到该时间点（所有站点共享同一配额）
+        self._paused_until = 0.0
+        self._stats = {
+            'requests': 0, 'succeeded': 0, 'failed': 0, 'retries': 0, 'rate_limited': 0,
+            'queue_wait': 0.0, 'latency': 0.0
+        }
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name='llm-engine', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+    
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._loop.create_task(self._dispatch())
+        self._ready.set()
+        self._loop.run_forever()
+    
+    def run(self, func: Callable[[], Any], site_id: Optional[int] = None,
+            estimated_tokens: int = 0) -> Tuple[Any, Dict]:
+        """
+        同步接口：在调用线程中阻塞，直到请求完成
+        
+        Args:
+            func: 实际发起请求的无参函数（在线程池中执行）
+            site_id: 用于公平调度的站点ID，None 归入公共队列
+            estimated_tokens: 预估的 token 数（提示词 + max_tokens），用于 TPM 限流
+        
+        Returns:
+            (func 的返回值, {'queue_wait', 'latency', 'attempts', 'backoff'})；重试耗尽时抛出最后一次的异常
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.submit(func, site_id, estimated_tokens), self._loop
+        ).result()
+    
+    async def submit(self, func: Callable[[], Any], site_id: Optional[int] = None,
+                     estimated_tokens: int = 0) -> Tuple[Any, Dict]:
+        """异步接口，须在引擎的事件循环中调用，参数与返回值同 run"""
+        job = LLMJob(str(site_id) if site_id is not None else '-', func, estimated_tokens,
+                     self._loop.create_future())
+        self._enqueue(job)
+        return await job.future
+    
+    def _enqueue(self, job: LLMJob, front: bool = False):
+        queue = self._queues.get(job.site_key)
+        if queue is None:
+            queue = self._queues[job.site_key] = deque()
+        if front:
+            queue.appendleft(job)
+        else:
+            queue.append(job)
+        self._wakeup.set()
+    
+    def _next_job(self) -> Optional[LLMJob]:
+        """按站点轮转取出下一个请求，并发运行的站点交替获得配额"""
+        while self._queues:
+            site_key, queue = self._queues.popitem(last=False)
+            if queue:
+                job = queue.popleft()
+                if queue:
+                    self._queues[site_key] = queue
+                return job
+        return None
+    
+    def _peek_job(self) -> Optional[LLMJob]:
+        for queue in self._queues.values():
+            if queue:
+                return queue[0]
+        return None
+    
+    async def _dispatch(self):
+        while True:
+            job = self._peek_job()
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            
+            await self._semaphore.acquire()
+            # 等待暂停结束和令牌桶；等待期间可能有其他站点入队，出队时再按轮转顺序选取
+            while True:
+                job = self._peek_job()
+                delay = max(
+                    self._paused_until - time.monotonic(),
+                    self._request_bucket.wait_time(1),
+                    self._token_bucket.wait_time(job.estimated_tokens)
+                )
+                if delay <= 0:
+                    break
+                await asyncio.sleep(min(delay, 1.0))
+            
+            job = self._next_job()
+            self._request_bucket.consume(1)
+            self._token_bucket.consume(job.estimated_tokens)
+            job.queue_wait += time.monotonic() - job.enqueued_at
+            self._loop.create_task(self._execute(job))
+    
+    async def _execute(self, job: LLMJob):
+        job.attempts += 1
+        self._stats['requests'] += 1
+        start = time.monotonic()
+        try:
+            result = await self._loop.run_in_executor(None, job.func)
+        except Exception as e:
+            latency = time.monotonic() - start
+            self._stats['latency'] += latency
+            self._semaphore.release()
+            delay = self._retry_delay(e, job.attempts)
+            if delay is None:
+                self._stats['failed'] += 1
+                self._stats['queue_wait'] += job.queue_wait
+                if not job.future.done():
+                    job.future.set_exception(e)
+                return
+            
+            self._stats['retries'] += 1
+            logger.warning(f"LLM 请求失败，{delay:.1f} 秒后第 {job.attempts} 次重试: {e}")
+            job.backoff += delay
+            await asyncio.sleep(delay)
+            # 重试的请求排在本站点队首，退避时间不计入排队等待
+            job.enqueued_at = time.monotonic()
+            self._enqueue(job, front=True)
+            return
+        
+        latency = time.monotonic() - start
+        self._semaphore.release()
+        # 按实际用量修正 TPM 预估
+        usage = getattr(result, 'usage', None)
+        if usage and getattr(usage, 'total_tokens', None):
+            self._token_bucket.consume(usage.total_tokens - job.estimated_tokens)
+        
+        self._stats['succeeded'] += 1
+        self._stats['queue_wait'] += job.queue_wait
+        self._stats['latency'] += latency
+        if not job.future.done():
+            job.future.set_result((result, {
+                'queue_wait': round(job.queue_wait, 3),
+                'latency': round(latency, 3),
+                'attempts': job.attempts,
+                'backoff': round(job.backoff, 3)
+            }))
+    
+    def _retry_delay(self, error: Exception, attempts: int) -> Optional[float]:
+        """可重试时返回等待秒数，否则返回 None；429 同时暂停整个配额"""
+        if attempts > self.max_retries:
+            return None
+        if isinstance(error, openai.APIStatusError):
+            if error.status_code not in RETRYABLE_STATUS:
+                return None
+        elif not isinstance(error, openai.APIConnectionError):
+            return None
+        
+        # 全抖动：在 [0, base * 2^(n-1)] 中随机取值，避免各站点同时重试
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1)))
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        if getattr(error, 'status_code', None) == 429:
+            self._stats['rate_limited'] += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+    
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """从响应头读取 retry-after-ms 或 retry-after（秒数或 HTTP 日期）"""
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None)
+        if not headers:
+            return None
+        try:
+            value = headers.get('retry-after-ms')
+            if value:
+                return float(value) / 1000
+            value = headers.get('retry-after')
+            if not value:
+                return None
+            try:
+                return max(float(value), 0.0)
+            except ValueError:
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+    
+    def get_stats(self) -> Dict:
+        """累计请求数、重试与限流次数、平均排队等待和平均模型耗时，以及当前排队数"""
+        stats = dict(self._stats)
+        finished = stats['succeeded'] + stats['failed']
+        stats['avg_queue_wait'] = round(stats.pop('queue_wait') / finished, 3) if finished else 0.0
+        stats['avg_latency'] = round(stats.pop('latency') / stats['requests'], 3) if stats['requests'] else 0.0
+        stats['queued'] = sum(len(queue) for queue in list(self._queues.values()))
+        return stats
+
+
+_engine: Optional[LLMEngine] = None
+_engine_lock = threading.Lock()
+
+def get_llm_engine() -> LLMEngine:
+    """
+    获取全局 LLM 调度引擎
+    LLM_MAX_CONCURRENCY（默认 4）、LLM_RPM / LLM_TPM（默认 0，不限制）、LLM_MAX_RETRIES（默认 3）、
+    LLM_BACKOFF_BASE / LLM_BACKOFF_MAX（默认 1 / 60 秒）
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = LLMEngine(
+                max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', '4')),
+                rpm=int(os.getenv('LLM_RPM', '0')),
+                tpm=int(os.getenv('LLM_TPM', '0')),
+                max_retries=int(os.getenv('LLM_MAX_RETRIES', '3')),
+                backoff_base=float(os.getenv('LLM_BACKOFF_BASE', '1')),
+                backoff_max=float(os.getenv('LLM_BACKOFF_MAX', '60'))
+            )
+        return _engine
@@ -2,25 +2,154 @@
 AI回复生成器
 基于OpenAI API
 """
-import openai
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+import os
+import json
+import time
 import logging
+from types import SimpleNamespace
+
+from .client_registry import get_llm_client_registry
+from .response_cache import get_response_cache
+from .llm_engine import get_llm_engine
 
 logger = logging.getLogger(__name__)
 
+# 批量生成时的系统提示（各条目的长度要求写在用户消息中）
+BATCH_SYSTEM_PROMPT = """你是一个友好的论坛用户，正在浏览多个论坛帖子并准备分别发表简短的回复。
+回复要求：
+1. 每条回复的长度符合该帖子标注的字数范围
+2. 回复要自然、口语化，不要太正式
+3. 回复要与对应帖子的内容相关，不要混淆不同帖子
+4. 不要使用"作为AI"、"我认为"等表述
+5. 可以使用emoji表情
+6. 回复要简洁有力，一针见血
+7. 如果是技术帖，可以简短提问或表达观点
+8. 如果是分享帖，可以表达感谢或赞同
+9. 只输出要求的 JSON，不要输出其他内容
+"""
+
+# 批量请求 max_tokens 的上限
+BATCH_MAX_TOKENS = 4000
+
+# 流式生成时视为句子结束的字符，以及可以跟在句末的后引号、括号
+SENTENCE_ENDINGS = '。！？!?…~～\n'
+SENTENCE_TRAILERS = '"\'”’」』）)'
+# 开引号 -> 对应的闭引号，截断后只剩开引号时将其去掉
+QUOTE_PAIRS = {'"': '"', "'": "'", '“': '”', '‘': '’', '「': '」', '『': '』'}
+
 class ReplyGenerator:
-    def __init__(self, api_key: str, base_url: str, model: str, temperature: float = 0.8, max_tokens: int = 100):
-        self.client = openai.OpenAI(api_key=api_key, base_url=base_url)
+    def __init__(self, api_key: str, base_url: str, model: str, temperature: float = 0.8, max_tokens: int = 100,
+                 stream: Optional[bool] = None):
+        # 复用进程内的客户端及其连接池，各站点、各次运行不再重新建立 TCP/TLS 连接
+        # 重试由调度引擎统一处理（遵循 Retry-After 并与其他站点共享配额），关闭 SDK 自带的重试
+        self.client = get_llm_client_registry().get(base_url, api_key, max_retries=0)
+        self.engine = get_llm_engine()
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        # 流式生成：读到长度范围内的完整句子即断开，未指定时由 LLM_STREAM 配置（默认关闭）
+        self.stream = os.getenv('LLM_STREAM', 'false').lower() == 'true' if stream is None else stream
+        # 接口是否接受 stream_options.include_usage（部分兼容接口会拒绝，首次被拒后不再传）
+        self.stream_usage = True
+        # 响应缓存（LLM_CACHE=false 时为 None），命中统计按生成器实例（即每次运行）计数
+        self.cache = get_response_cache()
+        self.cache_stats = {'hits': 0, 'misses': 0, 'posted_skips': 0, 'errors': 0}
+        self.llm_stats = self._empty_llm_stats()
     
-    def generate_reply(self, title: str, content: str, min_length: int = 1, max_length: int = 10) -> Optional[str]:
+    def generate_reply(self, title: str, content: str, min_length: int = 1, max_length: int = 10,
+                       site_id: Optional[int] = None) -> Optional[str]:
         """
         生成回复内容
+        传入 site_id 时，缓存中已在该站点发过的回复不会被复用
         """
+        return self._generate_single(title, content, min_length, max_length, site_id)['reply']
+    
+    def pop_cache_stats(self) -> Optional[Dict]:
+        """取出本次运行的缓存命中统计并清零，未启用缓存或没有查询时返回 None"""
+        stats = self.cache_stats
+        self.cache_stats = {'hits': 0, 'misses': 0, 'posted_skips': 0, 'errors': 0}
+        if not self.cache or not (stats['hits'] or stats['misses'] or stats['errors']):
+            return None
+        return stats
+    
+    @staticmethod
+    def _empty_llm_stats() -> Dict:
+        return {'requests': 0, 'failures': 0, 'retries': 0, 'queue_wait': 0.0, 'latency': 0.0,
+                'streamed': 0, 'cutoffs': 0, 'ttft': 0.0}
+    
+    def pop_llm_stats(self) -> Optional[Dict]:
+        """取出本次运行的模型请求统计（排队等待与模型耗时分开累计）并清零，没有请求时返回 None"""
+        stats, self.llm_stats = self.llm_stats, self._empty_llm_stats()
+        if not stats['requests']:
+            return None
+        stats['queue_wait'] = round(stats['queue_wait'], 3)
+        stats['latency'] = round(stats['latency'], 3)
+        stats['ttft'] = round(stats['ttft'], 3)
+        return stats
+    
+    def _complete(self, site_id: Optional[int] = None, request=None, **kwargs) -> Tuple[object, Dict]:
+        """
+        经调度引擎发起请求，返回 (response, {'queue_wait', 'latency', 'attempts', 'backoff'})
+        request 为自定义的请求函数（接收 kwargs），缺省为非流式的 chat.completions.create
+        重试耗尽或不可重试的错误原样抛出
+        """
+        request = request or self.client.chat.completions.create
+        # 提示词 token 估算值加上输出上限
+        estimated = self._estimate_tokens(kwargs['messages']) + kwargs.get('max_tokens', 0)
+        self.llm_stats['requests'] += 1
         try:
-            system_prompt = f"""你是一个友好的论坛用户，正在浏览论坛帖子并准备发表简短的回复。
+            response, timing = self.engine.run(
+                lambda: request(**kwargs), site_id, estimated
+            )
+        except Exception:
+            self.llm_stats['failures'] += 1
+            raise
+        self.llm_stats['retries'] += timing['attempts'] - 1
+        self.llm_stats['queue_wait'] += timing['queue_wait']
+        self.llm_stats['latency'] += timing['latency']
+        return response, timing
+    
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict]) -> int:
+        """按字符数粗略估算提示词 token（中文约 1-2 字/token）"""
+        return sum(len(message['content']) for message in messages) // 2
+    
+    def _cache_key(self, system_prompt: str, user_prompt: str, temperature: Optional[float] = None) -> Optional[str]:
+        if not self.cache:
+            return None
+        temperature = self.temperature if temperature is None else temperature
+        return self.cache.fingerprint(self.model, temperature, system_prompt, user_prompt)
+    
+    def _cache_get(self, cache_key: Optional[str], site_id: Optional[int] = None) -> Optional[str]:
+        """读取缓存并计数，缓存故障不影响生成"""
+        if not cache_key:
+            return None
+        try:
+            response = self.cache.get(cache_key)
+            if response is not None and site_id is not None and self.cache.posted_on_site(site_id, response):
+                logger.info("缓存的回复已在本站点发过，重新生成")
+                self.cache_stats['posted_skips'] += 1
+                response = None
+        except Exception as e:
+            logger.warning(f"读取 LLM 缓存失败: {e}")
+            self.cache_stats['errors'] += 1
+            return None
+        self.cache_stats['hits' if response is not None else 'misses'] += 1
+        return response
+    
+    def _cache_put(self, cache_key: Optional[str], kind: str, response: Optional[str]):
+        if not cache_key or not response:
+            return
+        try:
+            self.cache.put(cache_key, kind, self.model, response)
+        except Exception as e:
+            logger.warning(f"写入 LLM 缓存失败: {e}")
+            self.cache_stats['errors'] += 1
+    
+    @staticmethod
+    def _system_prompt(min_length: int, max_length: int) -> str:
+        return f"""你是一个友好的论坛用户，正在浏览论坛帖子并准备发表简短的回复。
 回复要求：
 1. 回复长度在{min_length}-{max_length}个字之间
 2. 回复要自然、口语化，不要太正式
@@ -31,14 +160,58 @@ class ReplyGenerator:
 7. 如果是技术帖，可以简短提问或表达观点
 8. 如果是分享帖，可以表达感谢或赞同
 """
-            
-            user_prompt = f"""帖子标题：{title}
+    
+    @staticmethod
+    def _clean_reply(reply: str) -> str:
+        reply = reply.strip()
+        # 移除可能的引号
+        if reply.startswith('"') and reply.endswith('"'):
+            reply = reply[1:-1]
+        if reply.startswith("'") and reply.endswith("'"):
+            reply = reply[1:-1]
+        return reply
+    
+    @staticmethod
+    def _usage(response) -> Tuple[int, int]:
+        """(prompt_tokens, completion_tokens)，部分兼容接口不返回 usage 时为 0"""
+        usage = getattr(response, 'usage', None)
+        if not usage:
+            return 0, 0
+        return usage.prompt_tokens or 0, usage.completion_tokens or 0
+    
+    @staticmethod
+    def _user_prompt(title: str, content: str, min_length: int, max_length: int) -> str:
+        return f"""帖子标题：{title}
 
 帖子内容：{content}
 
 请生成一个简短的回复（{min_length}-{max_length}字）："""
-            
-            response = self.client.chat.completions.create(
+    
+    def _generate_single(self, title: str, content: str, min_length: int, max_length: int,
+                         site_id: Optional[int] = None, lookup: bool = True) -> Dict:
+        """
+        单条生成，返回回复及其 token 用量、排队等待和模型耗时
+        lookup 为 True 时先查缓存（命中时 mode 为 cache），生成结果总会写入缓存；
+        开启流式时 mode 为 stream，另外返回首 token 耗时 ttft 和是否提前截断 cutoff
+        """
+        if self.stream:
+            return self._generate_stream(title, content, min_length, max_length, site_id, lookup)
+        result = {'reply': None, 'mode': 'single', 'prompt_tokens': 0, 'completion_tokens': 0,
+                  'queue_wait': 0.0, 'latency': 0.0}
+        start = time.perf_counter()
+        system_prompt = self._system_prompt(min_length, max_length)
+        user_prompt = self._user_prompt(title, content, min_length, max_length)
+        cache_key = self._cache_key(system_prompt, user_prompt)
+        
+        cached = self._cache_get(cache_key, site_id) if lookup else None
+        if cached is not None:
+            logger.info(f"使用缓存的回复: {cached}")
+            result.update(reply=cached, mode='cache', latency=round(time.perf_counter() - start, 3))
+            return result
+        
+        try:
+            response, timing = self._complete(
+                site_id,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -47,40 +220,300 @@ class ReplyGenerator:
                 temperature=self.temperature,
                 max_tokens=self.max_tokens
             )
+            result['queue_wait'], result['latency'] = timing['queue_wait'], timing['latency']
             
-            reply = response.choices[0].message.content.strip()
-            
-            # 移除可能的引号
-            if reply.startswith('"') and reply.endswith('"'):
-                reply = reply[1:-1]
-            if reply.startswith("'") and reply.endswith("'"):
-                reply = reply[1:-1]
+            reply = self._clean_reply(response.choices[0].message.content)
+            result['prompt_tokens'], result['completion_tokens'] = self._usage(response)
+            result['reply'] = reply
+            self._cache_put(cache_key, 'reply', reply)
             
             logger.info(f"生成回复: {reply}")
-            return reply
             
         except Exception as e:
             logger.error(f"生成回复失败: {e}")
-            return None
+        
+        return result
+    
+    def _generate_stream(self, title: str, content: str, min_length: int, max_length: int,
+                         site_id: Optional[int] = None, lookup: bool = True) -> Dict:
+        """流式单条生成，缓存的使用方式同 _generate_single"""
+        result = {'reply': None, 'mode': 'stream', 'prompt_tokens': 0, 'completion_tokens': 0,
+                  'queue_wait': 0.0, 'latency': 0.0, 'ttft': None, 'cutoff': False}
+        system_prompt = self._system_prompt(min_length, max_length)
+        user_prompt = self._user_prompt(title, content, min_length, max_length)
+        cache_key = self._cache_key(system_prompt, user_prompt)
+        
+        cached = self._cache_get(cache_key, site_id) if lookup else None
+        if cached is not None:
+            logger.info(f"使用缓存的回复: {cached}")
+            result.update(reply=cached, mode='cache')
+            return result
+        
+        try:
+            streamed, timing = self._complete(
+                site_id,
+                request=lambda **kwargs: self._read_stream(min_length, max_length, **kwargs),
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=self.temperature,
+                max_tokens=self.max_tokens
+            )
+            result['queue_wait'], result['latency'] = timing['queue_wait'], timing['latency']
+            result['ttft'], result['cutoff'] = streamed.ttft, streamed.cutoff
+            result['prompt_tokens'], result['completion_tokens'] = self._usage(streamed)
+            self.llm_stats['streamed'] += 1
+            self.llm_stats['cutoffs'] += int(streamed.cutoff)
+            self.llm_stats['ttft'] += streamed.ttft or 0.0
+            
+            reply = self._strip_open_quote(self._clean_reply(streamed.text))
+            if not reply:
+                raise ValueError('流式输出为空')
+            result['reply'] = reply
+            self._cache_put(cache_key, 'reply', reply)
+            
+            logger.info(
+                f"生成回复: {reply}（首 token {streamed.ttft}s，总耗时 {timing['latency']}s"
+                f"{'，已提前截断' if streamed.cutoff else ''}）"
+            )
+            
+        except Exception as e:
+            logger.error(f"生成回复失败: {e}")
+        
+        return result
+    
+    def _open_stream(self, **kwargs):
+        """请求流式输出并要求在末尾返回 usage；接口不接受 stream_options 时去掉该参数重试"""
+        if self.stream_usage:
+            try:
+                return self.client.chat.completions.create(
+                    stream=True, stream_options={'include_usage': True}, **kwargs
+                )
+            except Exception as e:
+                if getattr(e, 'status_code', None) not in (400, 422):
+                    raise
+                logger.info(f"接口不支持 stream_options，改为估算流式输出的 token 用量: {e}")
+                self.stream_usage = False
+        return self.client.chat.completions.create(stream=True, **kwargs)
+    
+    def _read_stream(self, min_length: int, max_length: int, **kwargs) -> SimpleNamespace:
+        """
+        在调度引擎的工作线程中执行：读取流式输出，出现长度范围内的完整句子时关闭连接，取消剩余的生成
+        返回 text、ttft（首个内容 token 的耗时，秒）、cutoff 和 usage（与非流式响应的 usage 字段兼容，
+        调度引擎据此修正 TPM）；提前截断或接口未返回 usage 时按提示词长度和已收到的内容块数估算
+        """
+        start = time.perf_counter()
+        text, ttft, cutoff, usage, chunks = '', None, False, None, 0
+        stream = self._open_stream(**kwargs)
+        try:
+            for chunk in stream:
+                if getattr(chunk, 'usage', None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if ttft is None:
+                    ttft = round(time.perf_counter() - start, 3)
+                chunks += 1
+                text += delta
+                end = self._sentence_cutoff(text, min_length, max_length)
+                if end is not None:
+                    text, cutoff = text[:end], True
+                    break
+        finally:
+            stream.close()
+        
+        if usage is None:
+            # 每个内容块通常对应一个 token
+            prompt_tokens = self._estimate_tokens(kwargs['messages'])
+            usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=chunks,
+                                    total_tokens=prompt_tokens + chunks)
+        return SimpleNamespace(text=text, ttft=ttft, cutoff=cutoff, usage=usage)
+    
+    @staticmethod
+    def _strip_open_quote(reply: str) -> str:
+        """去掉没有对应闭引号的开头引号（截断发生在引号内时出现）"""
+        closing = QUOTE_PAIRS.get(reply[:1])
+        if closing and closing not in reply[1:]:
+            return reply[1:].lstrip()
+        return reply
+    
+    @staticmethod
+    def _sentence_cutoff(text: str, min_length: int, max_length: int) -> Optional[int]:
+        """
+        返回第一个清理后长度在 min_length-max_length 之间的完整句子的结束位置，没有时返回 None
+        句末标点及其后的引号、括号连续出现时一并保留，之后还有其他字符才认为句子已经结束
+        """
+        index = 0
+        while index < len(text):
+            if text[index] not in SENTENCE_ENDINGS:
+                index += 1
+                continue
+            end = index + 1
+            while end < len(text) and (text[end] in SENTENCE_ENDINGS or text[end] in SENTENCE_TRAILERS):
+                end += 1
+            if end == len(text):
+                return None
+            length = len(ReplyGenerator._strip_open_quote(ReplyGenerator._clean_reply(text[:end])))
+            if length > max_length:
+                return None
+            if length >= min_length:
+                return end
+            index = end
+        return None
+    
+    def generate_replies(self, items: List[Dict], site_id: Optional[int] = None) -> List[Dict]:
+        """
+        批量生成回复：N 个帖子只发送一次请求（系统提示只发送一次），要求模型输出 JSON
+        
+        Args:
+            items: [{'title', 'content', 'min_length', 'max_length'}]，长度范围缺省为 1-10
+            site_id: 用于缓存的站点去重，见 generate_reply
+        
+        Returns:
+            与 items 一一对应的 [{'reply', 'mode', 'prompt_tokens', 'completion_tokens', 'queue_wait', 'latency'}]，
+            mode 为 cache 时来自缓存；为 batch 时 token、排队等待与模型耗时按条均摊（补全 token 按回复长度分摊）；
+            解析失败或不合要求的条目逐条重新生成，mode 为 single，生成失败时 reply 为 None
+        """
+        results: List[Optional[Dict]] = [None] * len(items)
+        cache_keys: List[Optional[str]] = []
+        for index, item in enumerate(items):
+            min_length, max_length = item.get('min_length', 1), item.get('max_length', 10)
+            # 与单条生成使用相同的键，批量得到的回复之后也可被单条请求复用
+            cache_key = self._cache_key(
+                self._system_prompt(min_length, max_length),
+                self._user_prompt(item['title'], item['content'], min_length, max_length)
+            )
+            cache_keys.append(cache_key)
+            cached = self._cache_get(cache_key, site_id)
+            if cached is not None:
+                results[index] = {'reply': cached, 'mode': 'cache', 'prompt_tokens': 0, 'completion_tokens': 0,
+                                  'queue_wait': 0.0, 'latency': 0.0}
+        
+        pending = [index for index in range(len(items)) if results[index] is None]
+        if len(pending) > 1:
+            self._generate_batch([items[index] for index in pending], pending, results, cache_keys, site_id)
+        
+        for index, item in enumerate(items):
+            if results[index] is None:
+                # 缓存已在上面查过，不再重复计数
+                results[index] = self._generate_single(
+                    item['title'], item['content'], item.get('min_length', 1), item.get('max_length', 10),
+                    site_id, lookup=False
+                )
+        return results
+    
+    def _generate_batch(self, items: List[Dict], positions: List[int], results: List[Optional[Dict]],
+                        cache_keys: List[Optional[str]], site_id: Optional[int] = None):
+        """一次请求生成 items 的回复，成功解析的条目写入 results 中对应 positions 的位置"""
+        try:
+            response, timing = self._complete(
+                site_id,
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                    {"role": "user", "content": self._batch_prompt(items)}
+                ],
+                temperature=self.temperature,
+                max_tokens=min(self.max_tokens * len(items) + 50 * len(items), BATCH_MAX_TOKENS)
+            )
+            latency = timing['latency']
+            replies = self._parse_batch(response.choices[0].message.content, items)
+            prompt_tokens, completion_tokens = self._usage(response)
+            
+            total_chars = sum(len(reply) for reply in replies.values()) or 1
+            for index, reply in replies.items():
+                self._cache_put(cache_keys[positions[index]], 'reply', reply)
+                results[positions[index]] = {
+                    'reply': reply,
+                    'mode': 'batch',
+                    'prompt_tokens': round(prompt_tokens / len(items)),
+                    'completion_tokens': round(completion_tokens * len(reply) / total_chars),
+                    'queue_wait': round(timing['queue_wait'] / len(items), 3),
+                    'latency': round(latency / len(items), 3)
+                }
+            logger.info(f"批量生成回复 {len(replies)}/{len(items)} 条，耗时 {latency:.2f} 秒")
+        except Exception as e:
+            logger.warning(f"批量生成回复失败，改为逐条生成: {e}")
+    
+    @staticmethod
+    def _batch_prompt(items: List[Dict]) -> str:
+        parts = []
+        for index, item in enumerate(items, 1):
+            parts.append(f"""[{index}] 回复长度：{item.get('min_length', 1)}-{item.get('max_length', 10)}字
+帖子标题：{item['title']}
+帖子内容：{item['content']}""")
+        return '\n\n'.join(parts) + f"""
+
+请为以上 {len(items)} 个帖子分别生成回复，只输出 JSON，格式为：
+{{"replies": [{{"id": 1, "reply": "回复内容"}}]}}"""
+    
+    @staticmethod
+    def _parse_batch(text: str, items: List[Dict]) -> Dict[int, str]:
+        """
+        解析批量输出，返回 {条目下标: 回复}
+        编号越界、重复或回复长度不在该条 min_length-max_length 范围内的条目被丢弃（之后逐条生成）
+        """
+        text = (text or '').strip()
+        # 去掉可能的 ```json 代码块包裹及前后说明文字
+        start, end = text.find('{'), text.rfind('}')
+        if start == -1 or end <= start:
+            raise ValueError('输出中没有 JSON 对象')
+        data = json.loads(text[start:end + 1])
+        entries = data.get('replies') if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            raise ValueError('JSON 中没有 replies 数组')
+        
+        replies = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                index = int(entry.get('id')) - 1
+            except (TypeError, ValueError):
+                continue
+            reply = entry.get('reply')
+            if not 0 <= index < len(items) or index in replies or not isinstance(reply, str):
+                continue
+            reply = ReplyGenerator._clean_reply(reply)
+            min_length, max_length = items[index].get('min_length', 1), items[index].get('max_length', 10)
+            if not min_length <= len(reply) <= max_length:
+                logger.warning(f"批量回复第 {index + 1} 条不符合要求，改为单独生成: {reply!r}")
+                continue
+            replies[index] = reply
+        return replies
     
     def analyze_sentiment(self, content: str) -> str:
         """
         分析内容情感
         返回: positive, negative, neutral
         """
+        system_prompt = "你是一个情感分析助手，分析文本情感并只返回: positive, negative 或 neutral"
+        user_prompt = f"请分析以下文本的情感：\n{content}"
+        cache_key = self._cache_key(system_prompt, user_prompt, temperature=0.3)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.client.chat.completions.create(
+            response, _ = self._complete(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": "你是一个情感分析助手，分析文本情感并只返回: positive, negative 或 neutral"},
-                    {"role": "user", "content": f"请分析以下文本的情感：\n{content}"}
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.3,
                 max_tokens=10
             )
             
             sentiment = response.choices[0].message.content.strip().lower()
-            return sentiment if sentiment in ['positive', 'negative', 'neutral'] else 'neutral'
+            sentiment = sentiment if sentiment in ['positive', 'negative', 'neutral'] else 'neutral'
+            self._cache_put(cache_key, 'sentiment', sentiment)
+            return sentiment
             
         except Exception as e:
             logger.error(f"情感分析失败: {e}")
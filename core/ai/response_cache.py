@@ -0,0 +1,61 @@
+"""
+LLM 响应缓存
+以 (模型, 温度档位, 系统提示词, 用户提示词) 的哈希为键，将模型输出持久化到 SQLite。
+同一话题再次出现或多个站点转载相同内容时直接复用，不再请求模型
+"""
+import os
+import json
+import hashlib
+import logging
+from typing import Optional
+
+from backend.services.llm_cache_service import LLMCacheService
+from backend.services.reply_ledger_service import ReplyLedgerService
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    def __init__(self, ttl_hours: float = 72, max_entries: int = 5000, unique_per_site: bool = True):
+        """
+        Args:
+            ttl_hours: 缓存有效期（小时）
+            max_entries: 缓存条数上限，超出时按最近使用时间淘汰
+            unique_per_site: 为 True 时，缓存的回复已在同一站点发过则不使用
+        """
+        self.ttl_hours = ttl_hours
+        self.max_entries = max_entries
+        self.unique_per_site = unique_per_site
+    
+    @staticmethod
+    def fingerprint(model: str, temperature: float, system_prompt: str, user_prompt: str) -> str:
+        """温度按 0.1 分档，避免浮点误差产生不同的键"""
+        payload = json.dumps(
+            [model, round(float(temperature), 1), system_prompt, user_prompt],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, cache_key: str) -> Optional[str]:
+        """读取未过期的缓存，未命中返回 None"""
+        return LLMCacheService.get(cache_key, self.ttl_hours)
+    
+    def posted_on_site(self, site_id: int, response: str) -> bool:
+        """开启 unique_per_site 时，缓存的回复是否已在该站点发过（发过则不应再使用）"""
+        return self.unique_per_site and ReplyLedgerService.has_posted(site_id, response)
+    
+    def put(self, cache_key: str, kind: str, model: str, response: str):
+        LLMCacheService.put(cache_key, kind, model, response, self.ttl_hours, self.max_entries)
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    按环境变量创建响应缓存，LLM_CACHE 为 false 时返回 None
+    LLM_CACHE_TTL_HOURS（默认 72）、LLM_CACHE_MAX_ENTRIES（默认 5000）、LLM_CACHE_UNIQUE_PER_SITE（默认 true）
+    """
+    if os.getenv('LLM_CACHE', 'true').lower() != 'true':
+        return None
+    return ResponseCache(
+        ttl_hours=float(os.getenv('LLM_CACHE_TTL_HOURS', '72')),
+        max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '5000')),
+        unique_per_site=os.getenv('LLM_CACHE_UNIQUE_PER_SITE', 'true').lower() == 'true'
+    )
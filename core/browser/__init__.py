@@ -3,5 +3,6 @@
 """
 from .browser_manager import BrowserManager
 from .cookie_manager import CookieManager
+from .driver_pool import DriverPool, get_driver_pool
 
-__all__ = ['BrowserManager', 'CookieManager']
+__all__ = ['BrowserManager', 'CookieManager', 'DriverPool', 'get_driver_pool']
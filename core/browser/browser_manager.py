@@ -11,13 +11,21 @@ from selenium.common.exceptions import TimeoutException, WebDriverException
 import logging
 import time
 import os
+from contextlib import contextmanager
+
+from .network_monitor import NetworkMonitor
+from .memory_governor import MemoryGovernor
+from .driver_cache import get_driver_cache
+from core.metrics import get_metrics_registry
 
 logger = logging.getLogger(__name__)
 
 class BrowserManager:
     """浏览器管理器类"""
     
-    def __init__(self, headless=True, user_agent=None, proxy=None):
+    def __init__(self, headless=True, user_agent=None, proxy=None, pool=None,
+                 wait_mode='fixed', max_wait=10, user_data_dir=None,
+                 max_rss_mb=0, max_navigations=0, metrics_site=None):
         """
         初始化浏览器管理器
         
@@ -25,11 +33,31 @@ class BrowserManager:
             headless (bool): 是否使用无头模式
             user_agent (str): 自定义 User Agent
             proxy (str): 代理服务器地址
+            pool (DriverPool): 驱动池，指定后从池中借用驱动，quit 时归还
+            wait_mode (str): 等待模式，fixed 为固定休眠，smart 为按页面就绪状态等待
+            max_wait (float): smart 模式下单次等待的上限（秒）
+            user_data_dir (str): 持久化的 Chrome 用户数据目录，指定后不使用驱动池
+            max_rss_mb (float): 浏览器进程树常驻内存上限（MB），超过后在下次导航前回收浏览器，0 表示不限制
+            max_navigations (int): 单个浏览器实例的导航次数上限，超过后回收浏览器，0 表示不限制
+            metrics_site (str): 写入指标库时使用的站点标识
         """
         self.headless = headless
         self.user_agent = user_agent
         self.proxy = proxy
+        self.pool = pool
+        self.wait_mode = wait_mode
+        self.max_wait = max_wait
+        self.user_data_dir = user_data_dir
         self.driver = None
+        self.network = NetworkMonitor()
+        self._wait_records = []
+        self.blocked_urls = []
+        self._traffic_records = []
+        self.governor = MemoryGovernor(max_rss_mb=max_rss_mb, max_navigations=max_navigations)
+        self.navigations = 0
+        self._recycle_events = []
+        self.metrics_site = metrics_site
+        self._spans = []
         self.is_container = self._detect_container()
         
         logger.info(f'浏览器管理器初始化: headless={headless}, container={self.is_container}')
@@ -56,8 +84,67 @@ class BrowserManager:
         if self.driver:
             return self.driver
         
+        with self._span('driver.acquire'):
+            if self.pool and not self.user_data_dir:
+                self.driver = self.pool.acquire(
+                    headless=self.headless,
+                    user_agent=self.user_agent,
+                    proxy=self.proxy,
+                    factory=self._create_driver
+                )
+            else:
+                self.driver = self._create_driver()
+        
+        if self.blocked_urls:
+            self._apply_blocked_urls()
+        return self.driver
+    
+    @contextmanager
+    def _span(self, name):
+        """记录一个阶段的耗时：写入全局指标库，同时保留在本次运行的记录中"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record_span(name, time.perf_counter() - start)
+    
+    def _record_span(self, name, seconds):
+        get_metrics_registry().record(name, seconds, site=self.metrics_site)
+        self._spans.append({'phase': name, 'seconds': round(seconds, 3)})
+    
+    def set_blocked_urls(self, urls):
+        """
+        设置需要拦截的 URL 通配符（通过 CDP Network.setBlockedURLs）
+        
+        Args:
+            urls (list): URL 通配符列表，例如 *.png、*://*.doubleclick.net/*
+        """
+        self.blocked_urls = list(urls or [])
+        if self.driver:
+            self._apply_blocked_urls()
+    
+    def _apply_blocked_urls(self):
+        """将拦截列表应用到当前驱动"""
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+            logger.info(f'已设置资源拦截规则: {len(self.blocked_urls)} 条')
+        except Exception as e:
+            logger.warning(f'设置资源拦截规则失败: {e}')
+    
+    def _create_driver(self):
+        """
+        启动一个新的 Chrome WebDriver 实例
+        
+        Returns:
+            WebDriver: Chrome WebDriver 实例
+            
+        Raises:
+            Exception: 浏览器启动失败时抛出异常
+        """
         try:
             logger.info('正在配置 Chrome 选项...')
+            options_start = time.perf_counter()
             
             # 创建 ChromeOptions
             options = uc.ChromeOptions()
@@ -82,8 +169,6 @@ class BrowserManager:
             # ==================== 性能优化 ====================
             options.add_argument('--disable-extensions')
             options.add_argument('--disable-plugins')
-            options.add_argument('--disable-images')  # 禁用图片加载以提升速度
-            options.add_argument('--disable-javascript')  # 如果不需要 JS，可以禁用
             options.add_argument('--disable-infobars')
             options.add_argument('--disable-notifications')
             options.add_argument('--disable-popup-blocking')
@@ -133,86 +218,37 @@ class BrowserManager:
             }
             options.add_experimental_option('prefs', prefs)
             
+            # 开启性能日志，用于读取 CDP Network 事件
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+            
+            self._record_span('launch.options', time.perf_counter() - options_start)
+            
             # ==================== 启动浏览器 ====================
             logger.info('正在启动 Chrome 浏览器...')
             
+            # 优先使用缓存中已修补的 chromedriver，未命中时修补一次并写入缓存
+            driver_path, version_main = None, None
+            cache = get_driver_cache()
+            if cache:
+                with self._span('launch.patch'):
+                    driver_path, version_main = cache.resolve()
+            
             # 使用 undetected_chromedriver 创建实例
-            self.driver = uc.Chrome(
-                options=options,
-                version_main=None,  # 自动检测 Chrome 版本
-                use_subprocess=True,
-                headless=self.headless
-            )
+            with self._span('launch.spawn'):
+                driver = uc.Chrome(
+                    options=options,
+                    driver_executable_path=driver_path,
+                    version_main=version_main,  # 为 None 时自动检测 Chrome 版本
+                    use_subprocess=True,
+                    headless=self.headless,
+                    user_data_dir=self.user_data_dir
+                )
             
             logger.info('✅ Chrome WebDriver 启动成功')
             
-            # ==================== 浏览器配置 ====================
-            # 设置隐式等待（全局）
-            self.driver.implicitly_wait(10)
-            logger.info('设置隐式等待: 10 秒')
-            
-            # 设置页面加载超时
-            self.driver.set_page_load_timeout(60)
-            logger.info('设置页面加载超时: 60 秒')
-            
-            # 设置脚本执行超时
-            self.driver.set_script_timeout(30)
-            logger.info('设置脚本执行超时: 30 秒')
-            
-            # ==================== 反检测脚本 ====================
-            try:
-                # 注入反检测脚本
-                self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-                    'source': '''
-                        // 隐藏 webdriver 属性
-                        Object.defineProperty(navigator, 'webdriver', {
-                            get: () => undefined
-                        });
-                        
-                        // 伪造 plugins
-                        Object.defineProperty(navigator, 'plugins', {
-                            get: () => [1, 2, 3, 4, 5]
-                        });
-                        
-                        // 伪造 languages
-                        Object.defineProperty(navigator, 'languages', {
-                            get: () => ['zh-CN', 'zh', 'en-US', 'en']
-                        });
-                        
-                        // 伪造 platform
-                        Object.defineProperty(navigator, 'platform', {
-                            get: () => 'Win32'
-                        });
-                        
-                        // 伪造 hardwareConcurrency
-                        Object.defineProperty(navigator, 'hardwareConcurrency', {
-                            get: () => 8
-                        });
-                        
-                        // 伪造 deviceMemory
-                        Object.defineProperty(navigator, 'deviceMemory', {
-                            get: () => 8
-                        });
-                        
-                        // 移除 chrome 对象中的自动化标识
-                        if (window.chrome) {
-                            delete window.chrome.runtime;
-                        }
-                        
-                        // 覆盖 Permission API
-                        const originalQuery = window.navigator.permissions.query;
-                        window.navigator.permissions.query = (parameters) => (
-                            parameters.name === 'notifications' ?
-                                Promise.resolve({ state: Notification.permission }) :
-                                originalQuery(parameters)
-                        );
-                    '''
-                })
-                logger.info('✅ 反检测脚本注入成功')
-            except Exception as e:
-                logger.warning(f'反检测脚本注入失败（可忽略）: {e}')
+            self._configure_driver(driver)
             
-            return self.driver
+            return driver
             
         except WebDriverException as e:
             error_msg = f'Chrome WebDriver 启动失败: {str(e)}'
@@ -231,26 +267,129 @@ class BrowserManager:
             logger.error(error_msg, exc_info=True)
             raise Exception(error_msg)
     
-    def navigate_to(self, url, wait_time=3):
+    def _configure_driver(self, driver):
+        """
+        配置新启动或新接入的驱动：超时设置与反检测脚本
+        
+        Args:
+            driver: WebDriver 实例
+        """
+        # 第一次 CDP 往返，衡量 DevTools 就绪耗时
+        with self._span('launch.first_cdp'):
+            try:
+                version = driver.execute_cdp_cmd('Browser.getVersion', {})
+                logger.info(f"浏览器版本: {version.get('product')}")
+            except Exception as e:
+                logger.debug(f'读取浏览器版本失败: {e}')
+        
+        # ==================== 浏览器配置 ====================
+        with self._span('launch.timeouts'):
+            # 设置隐式等待（全局）
+            driver.implicitly_wait(10)
+            logger.info('设置隐式等待: 10 秒')
+            
+            # 设置页面加载超时
+            driver.set_page_load_timeout(60)
+            logger.info('设置页面加载超时: 60 秒')
+            
+            # 设置脚本执行超时
+            driver.set_script_timeout(30)
+            logger.info('设置脚本执行超时: 30 秒')
+        
+        # ==================== 反检测脚本 ====================
+        stealth_start = time.perf_counter()
+        try:
+            # 注入反检测脚本
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+                'source': '''
+                    // 隐藏 webdriver 属性
+                    Object.defineProperty(navigator, 'webdriver', {
+                        get: () => undefined
+                    });
+                    
+                    // 伪造 plugins
+                    Object.defineProperty(navigator, 'plugins', {
+                        get: () => [1, 2, 3, 4, 5]
+                    });
+                    
+                    // 伪造 languages
+                    Object.defineProperty(navigator, 'languages', {
+                        get: () => ['zh-CN', 'zh', 'en-US', 'en']
+                    });
+                    
+                    // 伪造 platform
+                    Object.defineProperty(navigator, 'platform', {
+                        get: () => 'Win32'
+                    });
+                    
+                    // 伪造 hardwareConcurrency
+                    Object.defineProperty(navigator, 'hardwareConcurrency', {
+                        get: () => 8
+                    });
+                    
+                    // 伪造 deviceMemory
+                    Object.defineProperty(navigator, 'deviceMemory', {
+                        get: () => 8
+                    });
+                    
+                    // 移除 chrome 对象中的自动化标识
+                    if (window.chrome) {
+                        delete window.chrome.runtime;
+                    }
+                    
+                    // 覆盖 Permission API
+                    const originalQuery = window.navigator.permissions.query;
+                    window.navigator.permissions.query = (parameters) => (
+                        parameters.name === 'notifications' ?
+                            Promise.resolve({ state: Notification.permission }) :
+                            originalQuery(parameters)
+                    );
+                '''
+            })
+            logger.info('✅ 反检测脚本注入成功')
+        except Exception as e:
+            logger.warning(f'反检测脚本注入失败（可忽略）: {e}')
+        finally:
+            self._record_span('launch.stealth', time.perf_counter() - stealth_start)
+    
+    def navigate_to(self, url, wait_time=3, wait_for=None):
         """
         导航到指定 URL
         
         Args:
             url (str): 目标 URL
-            wait_time (int): 页面加载后等待时间（秒）
-            
+            wait_time (int): 页面加载后等待时间（秒），smart 模式下作为对比基准
+            wait_for (str): smart 模式下等待出现的 CSS 选择器
+        
         Returns:
             bool: 导航是否成功
         """
         try:
             logger.info(f'正在导航到: {url}')
             driver = self.get_driver()
-            driver.get(url)
+            if self.governor.enabled:
+                with self._span('navigate.governor'):
+                    driver = self._maybe_recycle(driver)
+            self.network.reset(driver)
+            with self._span('navigate.load'):
+                driver.get(url)
+            self.navigations += 1
             
             # 等待页面加载
-            time.sleep(wait_time)
+            with self._span('navigate.settle'):
+                self.settle(wait_time, selector=wait_for, label=url)
+            
+            # 记录本次导航的流量
+            self.network.drain(driver)
+            traffic = self.network.get_stats()
+            traffic['url'] = url
+            self._traffic_records.append(traffic)
             
             logger.info(f'✅ 成功导航到: {url}')
+            logger.info(
+                f"页面流量: {traffic['requests']} 个请求, {traffic['bytes'] / 1024:.1f} KB, "
+                f"拦截 {traffic['blocked']} 个"
+            )
             return True
             
         except TimeoutException:
@@ -260,6 +399,169 @@ class BrowserManager:
             logger.error(f'导航失败: {e}')
             return False
     
+    def settle(self, seconds, selector=None, label=None):
+        """
+        操作后的等待
+        fixed 模式固定休眠 seconds 秒；smart 模式等待页面就绪，最长 max_wait 秒
+        
+        Args:
+            seconds (float): 固定等待时间（秒）
+            selector (str): smart 模式下需要等待出现的 CSS 选择器
+            label (str): 记录中使用的标签（通常为 URL）
+        
+        Returns:
+            float: 实际等待的秒数
+        """
+        if self.wait_mode == 'smart':
+            waited = self.wait_until_ready(selector=selector, timeout=self.max_wait)
+        else:
+            time.sleep(seconds)
+            waited = seconds
+        
+        self._wait_records.append({
+            'label': label,
+            'mode': self.wait_mode,
+            'waited': round(waited, 2),
+            'baseline': seconds
+        })
+        return waited
+    
+    def wait_until_ready(self, selector=None, timeout=10, poll_interval=0.1):
+        """
+        等待页面就绪：document.readyState 为 complete、网络空闲，
+        以及指定选择器（如果有）已出现
+        
+        Args:
+            selector (str): 需要等待出现的 CSS 选择器
+            timeout (float): 最长等待时间（秒）
+            poll_interval (float): 轮询间隔（秒）
+        
+        Returns:
+            float: 实际等待的秒数
+        """
+        driver = self.get_driver()
+        start = time.time()
+        deadline = start + timeout
+        # 给刚触发的请求留出发起时间，避免点击后立即判定为空闲
+        self.network.last_activity = start
+        
+        script = '''
+            var sel = arguments[0];
+            if (document.readyState !== 'complete') return false;
+            return !sel || document.querySelector(sel) !== null;
+        '''
+        while time.time() < deadline:
+            try:
+                if driver.execute_script(script, selector) and self.network.is_idle(driver):
+                    break
+            except Exception as e:
+                logger.debug(f'检查页面就绪状态失败: {e}')
+            time.sleep(poll_interval)
+        else:
+            logger.warning(f'等待页面就绪超时（{timeout} 秒）: {selector or "readyState/网络空闲"}')
+        
+        return time.time() - start
+    
+    def pop_wait_summary(self):
+        """
+        取出等待统计并清空记录
+        saved 为固定等待基准与实际等待时间之差
+        
+        Returns:
+            dict: 等待统计
+        """
+        records = self._wait_records
+        self._wait_records = []
+        waited = sum(r['waited'] for r in records)
+        baseline = sum(r['baseline'] for r in records)
+        return {
+            'mode': self.wait_mode,
+            'count': len(records),
+            'waited': round(waited, 2),
+            'baseline': round(baseline, 2),
+            'saved': round(baseline - waited, 2),
+            'records': records
+        }
+    
+    def _maybe_recycle(self, driver):
+        """
+        检查内存与导航次数，超过阈值时保留 Cookies 重启浏览器
+        
+        Returns:
+            WebDriver: 当前可用的驱动（可能是重启后的新驱动）
+        """
+        reason = self.governor.check(driver, self.navigations)
+        if not reason:
+            return driver
+        
+        logger.warning(f'回收浏览器: {reason}')
+        event = {
+            'reason': reason,
+            'rss_mb': self.governor.last_rss_mb,
+            'navigations': self.navigations
+        }
+        start = time.time()
+        driver = self.restart(keep_state=True)
+        
+        event['seconds'] = round(time.time() - start, 2)
+        self._recycle_events.append(event)
+        return driver
+    
+    def pop_memory_summary(self):
+        """
+        取出内存统计（峰值常驻内存与回收记录）并清空记录
+        
+        Returns:
+            dict: 内存统计
+        """
+        if self.driver and self.governor.enabled:
+            self.governor.measure(self.driver)
+        events = self._recycle_events
+        self._recycle_events = []
+        summary = {
+            'peak_rss_mb': round(self.governor.peak_rss_mb, 1),
+            'recycles': len(events),
+            'events': events
+        }
+        self.governor.peak_rss_mb = 0.0
+        return summary
+    
+    def pop_timing_summary(self):
+        """
+        取出本次运行的阶段耗时并清空记录，附带该站点在指标库中的 p50/p95
+        
+        Returns:
+            dict: 阶段耗时统计
+        """
+        spans = self._spans
+        self._spans = []
+        phases = {}
+        for span in spans:
+            phase = phases.setdefault(span['phase'], {'count': 0, 'total': 0.0})
+            phase['count'] += 1
+            phase['total'] = round(phase['total'] + span['seconds'], 3)
+        return {
+            'phases': phases,
+            'percentiles': get_metrics_registry().summary(site=self.metrics_site)
+        }
+    
+    def pop_traffic_summary(self):
+        """
+        取出导航流量统计并清空记录
+        
+        Returns:
+            dict: 流量统计
+        """
+        records = self._traffic_records
+        self._traffic_records = []
+        return {
+            'navigations': len(records),
+            'requests': sum(r['requests'] for r in records),
+            'bytes': sum(r['bytes'] for r in records),
+            'blocked': sum(r['blocked'] for r in records),
+            'records': records
+        }
+    
     def wait_for_element(self, by, value, timeout=10):
         """
         等待元素出现
@@ -272,8 +574,11 @@ class BrowserManager:
         Returns:
             WebElement: 找到的元素，未找到返回 None
         """
+        driver = self.get_driver()
+        # 临时关闭隐式等待，避免每次轮询都被隐式等待拖长，超时以 timeout 为准
+        driver.implicitly_wait(0)
         try:
-            element = WebDriverWait(self.get_driver(), timeout).until(
+            element = WebDriverWait(driver, timeout).until(
                 EC.presence_of_element_located((by, value))
             )
             logger.info(f'✅ 元素已找到: {value}')
@@ -284,6 +589,86 @@ class BrowserManager:
         except Exception as e:
             logger.error(f'等待元素时出错: {e}')
             return None
+        finally:
+            driver.implicitly_wait(10)
+    
+    def probe_selectors(self, selectors, timeout=None, until='all'):
+        """
+        在页面内一次性检查一组 CSS 选择器，共用同一个截止时间
+        通过 MutationObserver 监听 DOM 变化，不受隐式等待影响
+        
+        Args:
+            selectors (list): CSS 选择器列表（None 或空字符串会被忽略）
+            timeout (float): 最长等待时间（秒），默认 max_wait，0 表示只检查当前页面
+            until (str): all 为等待全部出现，any 为任意一个出现即返回
+        
+        Returns:
+            dict: {选择器: {'present': bool, 'visible': bool}}
+        """
+        selectors = [s for s in dict.fromkeys(selectors) if s]
+        if not selectors:
+            return {}
+        if timeout is None:
+            timeout = self.max_wait
+        # 不能超过脚本执行超时（30 秒）
+        timeout = max(0, min(timeout, 25))
+        
+        script = '''
+            var selectors = arguments[0], timeout = arguments[1], until = arguments[2];
+            var done = arguments[arguments.length - 1];
+            function check() {
+                var result = {}, hits = 0;
+                selectors.forEach(function (sel) {
+                    var el = null;
+                    try { el = document.querySelector(sel); } catch (e) {}
+                    var visible = !!el && !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+                        && window.getComputedStyle(el).visibility !== 'hidden';
+                    result[sel] = {present: !!el, visible: visible};
+                    if (el) hits++;
+                });
+                return {result: result, finished: until === 'any' ? hits > 0 : hits === selectors.length};
+            }
+            var state = check();
+            if (state.finished || timeout <= 0) { done(state.result); return; }
+            var timer = null;
+            var observer = new MutationObserver(function () {
+                var state = check();
+                if (state.finished) {
+                    observer.disconnect();
+                    clearTimeout(timer);
+                    done(state.result);
+                }
+            });
+            observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+            timer = setTimeout(function () {
+                observer.disconnect();
+                done(check().result);
+            }, timeout * 1000);
+        '''
+        with self._span('probe'):
+            try:
+                result = self.get_driver().execute_async_script(script, selectors, timeout, until)
+            except Exception as e:
+                logger.warning(f'批量检查元素失败: {e}')
+                result = None
+        
+        result = result or {}
+        return {sel: result.get(sel, {'present': False, 'visible': False}) for sel in selectors}
+    
+    def find_element_now(self, selector):
+        """
+        立即查找元素（CSS 选择器），不经过隐式等待
+        
+        Returns:
+            WebElement: 找到的元素，未找到返回 None
+        """
+        if not selector:
+            return None
+        try:
+            return self.get_driver().execute_script('return document.querySelector(arguments[0]);', selector)
+        except Exception as e:
+            logger.debug(f'查找元素失败 {selector}: {e}')
+            return None
     
     def get_cookies(self):
         """
@@ -350,6 +735,12 @@ class BrowserManager:
     def quit(self):
         """关闭浏览器并清理资源"""
         if self.driver:
+            if self.pool and not self.user_data_dir:
+                try:
+                    self.pool.release(self.driver)
+                finally:
+                    self.driver = None
+                return
             try:
                 logger.info('正在关闭浏览器...')
                 self.driver.quit()
@@ -359,12 +750,49 @@ class BrowserManager:
             finally:
                 self.driver = None
     
-    def restart(self):
-        """重启浏览器"""
+    def restart(self, keep_state=False):
+        """
+        重启浏览器
+        
+        Args:
+            keep_state (bool): 是否保留 Cookies，重启后恢复，调用方无需重新登录
+        """
         logger.info('正在重启浏览器...')
+        cookies = []
+        if keep_state and self.driver:
+            try:
+                cookies = self.driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+            except Exception as e:
+                logger.warning(f'保存浏览器状态失败: {e}')
+        
+        if self.driver and self.pool and not self.user_data_dir:
+            # 重启意味着当前驱动不可信，直接从池中丢弃
+            self.pool.discard(self.driver)
+            self.driver = None
         self.quit()
         time.sleep(2)
-        return self.get_driver()
+        driver = self.get_driver()
+        self.navigations = 0
+        
+        if cookies:
+            self._restore_cookies(driver, cookies)
+        return driver
+    
+    def _restore_cookies(self, driver, cookies):
+        """通过 CDP 写回 Network.getAllCookies 取得的 Cookies（不需要先打开对应域名）"""
+        fields = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+        params = []
+        for cookie in cookies:
+            param = {k: cookie[k] for k in fields if k in cookie}
+            # 会话 Cookie 的 expires 为 -1，写回时省略
+            if cookie.get('session') or param.get('expires', 0) < 0:
+                param.pop('expires', None)
+            params.append(param)
+        try:
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': params})
+            logger.info(f'✅ 已恢复 {len(params)} 个 Cookies')
+        except Exception as e:
+            logger.warning(f'恢复 Cookies 失败: {e}')
     
     def __enter__(self):
         """上下文管理器入口"""
@@ -381,7 +809,7 @@ class BrowserManager:
 
 
 # 便捷函数
-def create_browser(headless=True, user_agent=None, proxy=None):
+def create_browser(headless=True, user_agent=None, proxy=None, pool=None):
     """
     创建浏览器管理器实例（便捷函数）
     
@@ -389,8 +817,9 @@ def create_browser(headless=True, user_agent=None, proxy=None):
         headless (bool): 是否使用无头模式
         user_agent (str): 自定义 User Agent
         proxy (str): 代理服务器地址
+        pool (DriverPool): 驱动池（可选）
         
     Returns:
         BrowserManager: 浏览器管理器实例
     """
-    return BrowserManager(headless=headless, user_agent=user_agent, proxy=proxy)
+    return BrowserManager(headless=headless, user_agent=user_agent, proxy=proxy, pool=pool)
@@ -0,0 +1,124 @@
+"""
+chromedriver 缓存
+按 Chrome 主版本号缓存打过补丁的 chromedriver，避免每次启动都重新下载和修补
+"""
+import os
+import re
+import json
+import time
+import shutil
+import logging
+import subprocess
+from pathlib import Path
+from typing import Optional, Tuple
+
+import undetected_chromedriver as uc
+
+from backend.config import Config
+from .file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+class DriverCache:
+    def __init__(self, base_dir: Optional[str] = None):
+        """
+        Args:
+            base_dir: 缓存目录，默认 CHROMEDRIVER_CACHE_DIR 或 数据目录/chromedriver_cache
+        """
+        self.base_dir = Path(base_dir or os.getenv('CHROMEDRIVER_CACHE_DIR', str(Config.DATA_DIR / 'chromedriver_cache')))
+        self.exe_name = 'chromedriver.exe' if os.name == 'nt' else 'chromedriver'
+    
+    def resolve(self) -> Tuple[Optional[str], Optional[int]]:
+        """
+        获取与已安装 Chrome 匹配的 chromedriver
+        
+        Returns:
+            (chromedriver 路径, Chrome 主版本号)，无法使用缓存时返回 (None, None)，由 uc 自行处理
+        """
+        start = time.time()
+        chrome_version = self.detect_chrome_version()
+        if not chrome_version:
+            return None, None
+        major = int(chrome_version.split('.')[0])
+        
+        entry_dir = self.base_dir / str(major)
+        driver_path = entry_dir / self.exe_name
+        try:
+            # 同一主版本的并发启动在这里排队，只有第一个会执行修补
+            with FileLock(str(self.base_dir / f'{major}.lock')):
+                if self._is_valid(entry_dir, chrome_version):
+                    logger.info(f'chromedriver 缓存命中: Chrome {chrome_version}，耗时 {(time.time() - start) * 1000:.0f} ms')
+                    return str(driver_path), major
+                
+                self._patch(entry_dir, major, chrome_version)
+        except Exception as e:
+            logger.warning(f'chromedriver 缓存不可用，交由 undetected_chromedriver 处理: {e}')
+            return None, None
+        
+        logger.info(f'chromedriver 缓存未命中: Chrome {chrome_version}，修补耗时 {time.time() - start:.2f} 秒')
+        return str(driver_path), major
+    
+    def detect_chrome_version(self) -> Optional[str]:
+        """读取已安装 Chrome 的完整版本号，例如 120.0.6099.109"""
+        executable = os.getenv('CHROME_BINARY') or uc.find_chrome_executable()
+        if not executable:
+            logger.warning('未找到 Chrome 可执行文件')
+            return None
+        try:
+            output = subprocess.run(
+                [executable, '--version'],
+                capture_output=True,
+                text=True,
+                timeout=10
+            ).stdout
+        except Exception as e:
+            logger.warning(f'读取 Chrome 版本失败: {e}')
+            return None
+        
+        match = re.search(r'(\d+)\.(\d+)\.(\d+)\.(\d+)', output)
+        return match.group(0) if match else None
+    
+    def _is_valid(self, entry_dir: Path, chrome_version: str) -> bool:
+        """缓存存在且对应的 Chrome 版本未变化"""
+        meta_path = entry_dir / 'meta.json'
+        if not (entry_dir / self.exe_name).exists() or not meta_path.exists():
+            return False
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return False
+        return meta.get('chrome_version') == chrome_version
+    
+    def _patch(self, entry_dir: Path, major: int, chrome_version: str):
+        """下载并修补 chromedriver，写入缓存目录"""
+        patcher = uc.Patcher(version_main=major)
+        patcher.auto()
+        
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        driver_path = entry_dir / self.exe_name
+        # 先复制到临时文件再替换，避免正在运行的 chromedriver 读到半个文件
+        tmp_path = entry_dir / f'{self.exe_name}.tmp'
+        shutil.copy2(patcher.executable_path, tmp_path)
+        os.chmod(tmp_path, 0o755)
+        os.replace(tmp_path, driver_path)
+        
+        (entry_dir / 'meta.json').write_text(json.dumps({
+            'chrome_version': chrome_version,
+            'driver_version': str(patcher.version_full) if patcher.version_full else None,
+            'patched_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }))
+
+
+_cache: Optional[DriverCache] = None
+
+def get_driver_cache() -> Optional[DriverCache]:
+    """
+    获取全局 chromedriver 缓存
+    环境变量 CHROMEDRIVER_CACHE=false 时禁用
+    """
+    global _cache
+    if os.getenv('CHROMEDRIVER_CACHE', 'true').lower() != 'true':
+        return None
+    if _cache is None:
+        _cache = DriverCache()
+    return _cache
@@ -0,0 +1,272 @@
+"""
+浏览器驱动池
+复用已启动的 Chrome 实例，避免每次任务都冷启动浏览器
+"""
+import os
+import time
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledDriver:
+    """池中驱动的包装，记录使用次数和空闲时间"""
+    
+    def __init__(self, driver, key: Tuple, launch_seconds: float):
+        self.driver = driver
+        self.key = key
+        self.launch_seconds = launch_seconds
+        self.uses = 0
+        self.idle_since = time.time()
+
+
+class DriverPool:
+    """
+    Chrome WebDriver 池
+    按 (proxy, user_agent, headless) 分组保存空闲驱动，
+    借出前保证状态干净，使用次数达到上限后回收重建
+    """
+    
+    def __init__(self, max_idle_per_key: int = 1, max_uses: int = 20, max_idle_seconds: int = 1800):
+        """
+        Args:
+            max_idle_per_key: 每个分组最多保留的空闲驱动数量
+            max_uses: 单个驱动最多被借出的次数，超过后关闭
+            max_idle_seconds: 空闲驱动最长保留时间（秒）
+        """
+        self.max_idle_per_key = max_idle_per_key
+        self.max_uses = max_uses
+        self.max_idle_seconds = max_idle_seconds
+        
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple, List[_PooledDriver]] = {}
+        self._in_use: Dict[int, _PooledDriver] = {}
+        
+        self._hits = 0
+        self._misses = 0
+        self._launches = 0
+        self._launch_seconds = 0.0
+        self._recycled = 0
+        self._discarded = 0
+    
+    @staticmethod
+    def make_key(headless: bool, user_agent: Optional[str], proxy: Optional[str]) -> Tuple:
+        """生成分组键"""
+        return (proxy or '', user_agent or '', bool(headless))
+    
+    def acquire(self, headless: bool, user_agent: Optional[str], proxy: Optional[str],
+                factory: Callable):
+        """
+        借出一个驱动，池中没有可用驱动时调用 factory 启动新实例
+        
+        Args:
+            factory: 无参可调用对象，返回新的 WebDriver
+        """
+        key = self.make_key(headless, user_agent, proxy)
+        self.evict_idle()
+        
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                entry = idle.pop() if idle else None
+            if entry is None:
+                break
+            if self._is_alive(entry.driver):
+                entry.uses += 1
+                with self._lock:
+                    self._in_use[id(entry.driver)] = entry
+                    self._hits += 1
+                logger.info(f'驱动池命中: 第 {entry.uses} 次使用 (proxy={key[0] or "无"})')
+                return entry.driver
+            logger.warning('池中驱动已失效，丢弃')
+            self._close(entry)
+            with self._lock:
+                self._discarded += 1
+        
+        start = time.time()
+        driver = factory()
+        launch_seconds = time.time() - start
+        
+        entry = _PooledDriver(driver, key, launch_seconds)
+        entry.uses = 1
+        with self._lock:
+            self._in_use[id(driver)] = entry
+            self._misses += 1
+            self._launches += 1
+            self._launch_seconds += launch_seconds
+        logger.info(f'驱动池未命中，新启动浏览器耗时 {launch_seconds:.2f} 秒')
+        return driver
+    
+    def release(self, driver):
+        """归还驱动，清理状态后放回池中；超出使用次数或容量时直接关闭"""
+        with self._lock:
+            entry = self._in_use.pop(id(driver), None)
+        if entry is None:
+            # 不是池借出的驱动，直接关闭
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.error(f'关闭浏览器失败: {e}')
+            return
+        
+        if entry.uses >= self.max_uses:
+            logger.info(f'驱动已使用 {entry.uses} 次，达到上限，回收')
+            self._close(entry)
+            with self._lock:
+                self._recycled += 1
+            return
+        
+        if not self._reset(entry.driver):
+            self._close(entry)
+            with self._lock:
+                self._discarded += 1
+            return
+        
+        entry.idle_since = time.time()
+        with self._lock:
+            idle = self._idle.setdefault(entry.key, [])
+            if len(idle) < self.max_idle_per_key:
+                idle.append(entry)
+                entry = None
+        if entry is not None:
+            self._close(entry)
+    
+    def discard(self, driver):
+        """丢弃借出的驱动（例如驱动已异常），不再放回池中"""
+        with self._lock:
+            entry = self._in_use.pop(id(driver), None)
+            self._discarded += 1
+        if entry:
+            self._close(entry)
+        else:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    
+    def prewarm(self, count: int, headless: bool, user_agent: Optional[str], proxy: Optional[str],
+                factory: Callable):
+        """预先启动若干驱动放入池中"""
+        key = self.make_key(headless, user_agent, proxy)
+        with self._lock:
+            missing = min(count, self.max_idle_per_key) - len(self._idle.get(key, []))
+        for _ in range(max(missing, 0)):
+            start = time.time()
+            driver = factory()
+            entry = _PooledDriver(driver, key, time.time() - start)
+            with self._lock:
+                self._launches += 1
+                self._launch_seconds += entry.launch_seconds
+                self._idle.setdefault(key, []).append(entry)
+        logger.info(f'驱动池预热完成: {max(missing, 0)} 个')
+    
+    def evict_idle(self):
+        """关闭空闲过久的驱动"""
+        now = time.time()
+        expired = []
+        with self._lock:
+            for key, idle in self._idle.items():
+                keep = []
+                for entry in idle:
+                    if now - entry.idle_since > self.max_idle_seconds:
+                        expired.append(entry)
+                    else:
+                        keep.append(entry)
+                self._idle[key] = keep
+        for entry in expired:
+            self._close(entry)
+        if expired:
+            logger.info(f'驱动池清理空闲驱动: {len(expired)} 个')
+    
+    def close_all(self):
+        """关闭池中所有空闲驱动"""
+        with self._lock:
+            entries = [entry for idle in self._idle.values() for entry in idle]
+            self._idle = {}
+        for entry in entries:
+            self._close(entry)
+    
+    def get_stats(self) -> Dict:
+        """
+        获取驱动池统计
+        saved_seconds 按平均启动耗时估算命中所节省的时间
+        """
+        with self._lock:
+            avg_launch = self._launch_seconds / self._launches if self._launches else 0.0
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'launches': self._launches,
+                'recycled': self._recycled,
+                'discarded': self._discarded,
+                'idle': sum(len(idle) for idle in self._idle.values()),
+                'in_use': len(self._in_use),
+                'avg_launch_seconds': round(avg_launch, 2),
+                'saved_seconds': round(avg_launch * self._hits, 2)
+            }
+    
+    @staticmethod
+    def _is_alive(driver) -> bool:
+        """检查驱动是否仍可用"""
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _reset(driver) -> bool:
+        """清理驱动状态：关闭多余标签页、清除 Cookies、回到空白页"""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.get('about:blank')
+            try:
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+            except Exception:
+                pass
+            try:
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            except Exception:
+                driver.delete_all_cookies()
+            return True
+        except Exception as e:
+            logger.warning(f'清理驱动状态失败，丢弃该驱动: {e}')
+            return False
+    
+    @staticmethod
+    def _close(entry: _PooledDriver):
+        try:
+            entry.driver.quit()
+        except Exception as e:
+            logger.error(f'关闭浏览器失败: {e}')
+
+
+_pool: Optional[DriverPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool() -> Optional[DriverPool]:
+    """
+    获取全局驱动池
+    通过环境变量 DRIVER_POOL_SIZE 配置每组空闲驱动数量，为 0 时禁用
+    """
+    global _pool
+    size = int(os.getenv('DRIVER_POOL_SIZE', '1'))
+    if size <= 0:
+        return None
+    
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool(
+                max_idle_per_key=size,
+                max_uses=int(os.getenv('DRIVER_POOL_MAX_USES', '20')),
+                max_idle_seconds=int(os.getenv('DRIVER_POOL_IDLE_SECONDS', '1800'))
+            )
+            logger.info(f'驱动池已启用: 每组 {size} 个, 最多使用 {_pool.max_uses} 次')
+        return _pool
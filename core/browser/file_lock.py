@@ -0,0 +1,92 @@
+"""
+文件锁
+用于在多个进程之间互斥访问浏览器配置目录、驱动缓存等共享文件
+"""
+import os
+import time
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows 本地开发环境
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class FileLock:
+    """基于 flock 的进程间文件锁，不支持 flock 的平台退化为独占创建锁文件"""
+    
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._fd = None
+    
+    @property
+    def locked(self) -> bool:
+        return self._fd is not None
+    
+    def acquire(self, timeout: float = 0, poll_interval: float = 0.2) -> bool:
+        """
+        获取锁
+        
+        Args:
+            timeout: 最长等待时间（秒），0 表示不等待
+            poll_interval: 重试间隔（秒）
+        
+        Returns:
+            bool: 是否获取成功
+        """
+        if self._fd is not None:
+            return True
+        
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        deadline = time.time() + timeout
+        while True:
+            if self._try_acquire():
+                return True
+            if time.time() >= deadline:
+                return False
+            time.sleep(poll_interval)
+    
+    def _try_acquire(self) -> bool:
+        if fcntl:
+            fd = os.open(self.path, os.O_CREAT | os.O_RDWR)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+            os.ftruncate(fd, 0)
+            os.write(fd, str(os.getpid()).encode())
+            self._fd = fd
+            return True
+        
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_RDWR)
+        except FileExistsError:
+            return False
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+    
+    def release(self):
+        """释放锁"""
+        if self._fd is None:
+            return
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            if not fcntl:
+                os.remove(self.path)
+        except OSError as e:
+            logger.warning(f'释放文件锁失败 {self.path}: {e}')
+        finally:
+            self._fd = None
+    
+    def __enter__(self):
+        self.acquire(timeout=float('inf'))
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
@@ -0,0 +1,127 @@
+"""
+内存守护
+统计 chromedriver / Chrome 进程树的常驻内存，超过阈值时提示回收浏览器
+"""
+import os
+import logging
+from typing import Dict, List, Optional, Set
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+class MemoryGovernor:
+    def __init__(self, max_rss_mb: float = 0, max_navigations: int = 0):
+        """
+        Args:
+            max_rss_mb: 进程树常驻内存上限（MB），0 表示不限制
+            max_navigations: 单个浏览器实例最多导航次数，0 表示不限制
+        """
+        self.max_rss_mb = max_rss_mb
+        self.max_navigations = max_navigations
+        self.peak_rss_mb = 0.0
+        self.last_rss_mb: Optional[float] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_rss_mb or self.max_navigations)
+    
+    def check(self, driver, navigations: int) -> Optional[str]:
+        """
+        检查是否需要回收浏览器
+        
+        Returns:
+            str: 需要回收时返回原因，否则返回 None
+        """
+        rss_mb = self.measure(driver)
+        if self.max_rss_mb and rss_mb is not None and rss_mb >= self.max_rss_mb:
+            return f'内存占用 {rss_mb:.0f} MB 超过上限 {self.max_rss_mb:.0f} MB'
+        
+        if self.max_navigations and navigations >= self.max_navigations:
+            return f'导航次数达到 {navigations}'
+        return None
+    
+    def measure(self, driver) -> Optional[float]:
+        """统计驱动相关进程树的常驻内存（MB），无法统计时返回 None"""
+        root_pids = []
+        for pid in (getattr(driver, 'browser_pid', None), self._service_pid(driver)):
+            if pid:
+                root_pids.append(pid)
+        if not root_pids:
+            return None
+        
+        try:
+            if psutil:
+                rss = self._measure_psutil(root_pids)
+            else:
+                rss = self._measure_proc(root_pids)
+        except Exception as e:
+            logger.debug(f'统计浏览器内存失败: {e}')
+            return None
+        
+        rss_mb = round(rss / 1024 / 1024, 1)
+        self.last_rss_mb = rss_mb
+        self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+        return rss_mb
+    
+    @staticmethod
+    def _service_pid(driver) -> Optional[int]:
+        try:
+            return driver.service.process.pid
+        except AttributeError:
+            return None
+    
+    @staticmethod
+    def _measure_psutil(root_pids: List[int]) -> int:
+        seen: Set[int] = set()
+        total = 0
+        for pid in root_pids:
+            try:
+                root = psutil.Process(pid)
+                processes = [root] + root.children(recursive=True)
+            except psutil.NoSuchProcess:
+                continue
+            for process in processes:
+                if process.pid in seen:
+                    continue
+                seen.add(process.pid)
+                try:
+                    total += process.memory_info().rss
+                except psutil.NoSuchProcess:
+                    continue
+        return total
+    
+    @staticmethod
+    def _measure_proc(root_pids: List[int]) -> int:
+        """没有 psutil 时读取 /proc（仅 Linux）"""
+        parents: Dict[int, int] = {}
+        rss_pages: Dict[int, int] = {}
+        for name in os.listdir('/proc'):
+            if not name.isdigit():
+                continue
+            try:
+                with open(f'/proc/{name}/stat') as f:
+                    stat = f.read()
+                with open(f'/proc/{name}/statm') as f:
+                    statm = f.read().split()
+            except OSError:
+                continue
+            # comm 字段可能含空格，取最后一个右括号之后的字段
+            fields = stat[stat.rfind(')') + 2:].split()
+            parents[int(name)] = int(fields[1])
+            rss_pages[int(name)] = int(statm[1])
+        
+        tree = set(pid for pid in root_pids if pid in rss_pages)
+        changed = True
+        while changed:
+            changed = False
+            for pid, ppid in parents.items():
+                if ppid in tree and pid not in tree:
+                    tree.add(pid)
+                    changed = True
+        
+        page_size = os.sysconf('SC_PAGE_SIZE')
+        return sum(rss_pages[pid] for pid in tree) * page_size
@@ -0,0 +1,95 @@
+"""
+网络监视器
+读取 Chrome 性能日志中的 CDP Network 事件，跟踪进行中的请求
+"""
+import json
+import time
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+class NetworkMonitor:
+    """基于 goog:loggingPrefs 性能日志的网络活动跟踪"""
+    
+    def __init__(self):
+        self.inflight: Dict[str, float] = {}
+        self.last_activity = time.time()
+        self.requests = 0
+        self.bytes = 0
+        self.failed = 0
+        self.blocked = 0
+        self.available = True
+    
+    def reset(self, driver):
+        """丢弃之前积压的事件并清零计数，在每次导航前调用"""
+        self.drain(driver)
+        self.inflight = {}
+        self.last_activity = time.time()
+        self.requests = 0
+        self.bytes = 0
+        self.failed = 0
+        self.blocked = 0
+    
+    def drain(self, driver):
+        """读取并处理所有新产生的网络事件"""
+        if not self.available:
+            return
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            # 驱动未开启性能日志时不再尝试
+            logger.debug(f'性能日志不可用: {e}')
+            self.available = False
+            return
+        
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError, TypeError):
+                continue
+            self._handle(message.get('method', ''), message.get('params', {}))
+    
+    def _handle(self, method: str, params: Dict):
+        """处理单个 CDP 事件"""
+        if not method.startswith('Network.'):
+            return
+        request_id = params.get('requestId')
+        
+        if method == 'Network.requestWillBeSent':
+            self.inflight[request_id] = time.time()
+            self.requests += 1
+        elif method == 'Network.loadingFinished':
+            self.inflight.pop(request_id, None)
+            self.bytes += int(params.get('encodedDataLength', 0) or 0)
+        elif method == 'Network.loadingFailed':
+            self.inflight.pop(request_id, None)
+            if params.get('blockedReason'):
+                self.blocked += 1
+            else:
+                self.failed += 1
+        else:
+            return
+        self.last_activity = time.time()
+    
+    def is_idle(self, driver, quiet_seconds: float = 0.5, long_poll_seconds: float = 5) -> bool:
+        """
+        判断网络是否空闲
+        没有进行中的请求，且至少 quiet_seconds 秒内没有新的网络事件；
+        持续超过 long_poll_seconds 的请求视为长轮询（如 Discourse message-bus），不计入
+        """
+        self.drain(driver)
+        if not self.available:
+            return True
+        now = time.time()
+        pending = [t for t in self.inflight.values() if now - t < long_poll_seconds]
+        return not pending and now - self.last_activity >= quiet_seconds
+    
+    def get_stats(self) -> Dict:
+        """当前导航的请求统计"""
+        return {
+            'requests': self.requests,
+            'bytes': self.bytes,
+            'failed': self.failed,
+            'blocked': self.blocked
+        }
@@ -0,0 +1,171 @@
+"""
+浏览器配置目录存储
+为每个站点保留独立的 Chrome 用户数据目录，复用 Cookies 和磁盘缓存
+"""
+import os
+import shutil
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from backend.config import Config
+from .file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+# 可以安全清理的缓存目录（相对于用户数据目录）
+CACHE_DIRS = [
+    'Default/Cache',
+    'Default/Code Cache',
+    'Default/GPUCache',
+    'Default/Service Worker/CacheStorage',
+    'GrShaderCache',
+    'ShaderCache',
+]
+
+class ProfileStore:
+    def __init__(self, base_dir: Optional[str] = None, max_size_mb: Optional[int] = None):
+        """
+        Args:
+            base_dir: 配置目录根路径，默认 CHROME_PROFILE_DIR 或 数据目录/chrome_profiles
+            max_size_mb: 所有配置目录的总大小上限（MB），超出后按最近使用时间清理缓存
+        """
+        self.base_dir = Path(base_dir or os.getenv('CHROME_PROFILE_DIR', str(Config.DATA_DIR / 'chrome_profiles')))
+        self.max_size_mb = max_size_mb if max_size_mb is not None else int(os.getenv('CHROME_PROFILE_MAX_MB', '1024'))
+        self._locks: Dict[str, FileLock] = {}
+    
+    def profile_path(self, profile_key: str) -> Path:
+        """配置目录路径"""
+        return self.base_dir / profile_key
+    
+    def _lock_for(self, profile_key: str) -> FileLock:
+        return FileLock(str(self.base_dir / f'{profile_key}.lock'))
+    
+    def acquire(self, profile_key: str, timeout: float = 0) -> Optional[str]:
+        """
+        锁定并返回站点的配置目录，已被其他运行占用时返回 None
+        
+        Args:
+            profile_key: 配置目录标识，通常为 site_<id>
+            timeout: 等待锁的最长时间（秒）
+        """
+        lock = self._lock_for(profile_key)
+        if not lock.acquire(timeout=timeout):
+            logger.warning(f'浏览器配置目录正被占用: {profile_key}')
+            return None
+        
+        self._locks[profile_key] = lock
+        path = self.profile_path(profile_key)
+        path.mkdir(parents=True, exist_ok=True)
+        
+        # 上次异常退出可能残留 Chrome 的单例锁
+        for name in ('SingletonLock', 'SingletonCookie', 'SingletonSocket'):
+            try:
+                (path / name).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.debug(f'清理单例锁失败 {name}: {e}')
+        
+        self.enforce_size_cap()
+        logger.info(f'使用持久化浏览器配置: {path}')
+        return str(path)
+    
+    def release(self, profile_key: str):
+        """释放配置目录"""
+        lock = self._locks.pop(profile_key, None)
+        if lock:
+            lock.release()
+    
+    def reset(self, profile_key: str) -> bool:
+        """
+        删除站点的配置目录（用于修复损坏的配置）
+        配置目录正在使用时返回 False
+        """
+        held = profile_key in self._locks
+        lock = self._locks.get(profile_key) or self._lock_for(profile_key)
+        if not held and not lock.acquire():
+            logger.warning(f'配置目录正在使用，无法重置: {profile_key}')
+            return False
+        try:
+            path = self.profile_path(profile_key)
+            if path.exists():
+                shutil.rmtree(path, ignore_errors=True)
+            logger.info(f'已重置浏览器配置: {profile_key}')
+            return True
+        finally:
+            if not held:
+                lock.release()
+    
+    def get_size_mb(self) -> float:
+        """所有配置目录的总大小（MB）"""
+        return self._dir_size(self.base_dir) / 1024 / 1024
+    
+    def enforce_size_cap(self):
+        """
+        总大小超过上限时，从最久未使用的缓存文件开始删除，直到回到上限以内
+        只清理缓存目录，不动 Cookies 和本地存储
+        """
+        if not self.base_dir.exists():
+            return
+        limit = self.max_size_mb * 1024 * 1024
+        total = self._dir_size(self.base_dir)
+        if total <= limit:
+            return
+        
+        candidates: List[Tuple[float, int, Path]] = []
+        for profile_dir in self.base_dir.iterdir():
+            if not profile_dir.is_dir():
+                continue
+            # 跳过其他运行正在使用的配置目录
+            lock = None
+            if profile_dir.name not in self._locks:
+                lock = self._lock_for(profile_dir.name)
+                if not lock.acquire():
+                    continue
+            try:
+                for cache_dir in CACHE_DIRS:
+                    for file_path in (profile_dir / cache_dir).rglob('*'):
+                        try:
+                            if file_path.is_file():
+                                stat = file_path.stat()
+                                candidates.append((max(stat.st_atime, stat.st_mtime), stat.st_size, file_path))
+                        except OSError:
+                            continue
+            finally:
+                if lock:
+                    lock.release()
+        
+        candidates.sort(key=lambda c: c[0])
+        freed = 0
+        for _, size, file_path in candidates:
+            if total - freed <= limit:
+                break
+            try:
+                file_path.unlink()
+                freed += size
+            except OSError:
+                continue
+        
+        logger.info(f'浏览器配置目录超出上限，已清理缓存 {freed / 1024 / 1024:.1f} MB')
+    
+    @staticmethod
+    def _dir_size(path: Path) -> int:
+        total = 0
+        for file_path in path.rglob('*'):
+            try:
+                if file_path.is_file():
+                    total += file_path.stat().st_size
+            except OSError:
+                continue
+        return total
+
+
+_store: Optional[ProfileStore] = None
+
+def get_profile_store() -> ProfileStore:
+    """获取全局配置目录存储"""
+    global _store
+    if _store is None:
+        _store = ProfileStore()
+    return _store
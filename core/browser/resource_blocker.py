@@ -0,0 +1,78 @@
+"""
+资源拦截配置
+根据站点配置生成 CDP Network.setBlockedURLs 使用的 URL 通配符列表
+"""
+from typing import Any, Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 资源类型对应的文件扩展名
+RESOURCE_TYPE_EXTENSIONS = {
+    'image': ['png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp'],
+    'font': ['woff', 'woff2', 'ttf', 'otf', 'eot'],
+    'media': ['mp4', 'webm', 'ogg', 'mp3', 'wav', 'm4a', 'mov'],
+    'stylesheet': ['css'],
+}
+
+# 常见第三方域名分组
+THIRD_PARTY_HOSTS = {
+    'analytics': [
+        'google-analytics.com', 'googletagmanager.com', 'clarity.ms', 'hotjar.com',
+        'plausible.io', 'static.cloudflareinsights.com', 'hm.baidu.com', 'cnzz.com',
+        'umami.is', 'matomo.cloud'
+    ],
+    'ads': [
+        'doubleclick.net', 'googlesyndication.com', 'googleadservices.com',
+        'adservice.google.com', 'amazon-adsystem.com', 'taboola.com', 'outbrain.com'
+    ],
+}
+
+# 预置拦截方案
+BLOCK_PROFILES = {
+    'none': {},
+    'light': {
+        'resource_types': ['image', 'media', 'font'],
+        'third_party': ['analytics', 'ads'],
+    },
+    'aggressive': {
+        'resource_types': ['image', 'media', 'font', 'stylesheet'],
+        'third_party': ['analytics', 'ads'],
+    },
+}
+
+
+def build_blocked_urls(selectors: Dict[str, Any]) -> List[str]:
+    """
+    根据站点选择器配置生成拦截 URL 列表
+    
+    支持的配置项：
+        block_profile: 预置方案名称（none / light / aggressive）
+        blocked_resource_types: 额外拦截的资源类型列表
+        blocked_hosts: 额外拦截的域名列表
+        blocked_urls: 额外的 URL 通配符列表
+    """
+    profile_name = selectors.get('block_profile') or 'none'
+    profile = BLOCK_PROFILES.get(profile_name)
+    if profile is None:
+        logger.warning(f'未知的拦截方案: {profile_name}，已忽略')
+        profile = {}
+    
+    resource_types = list(profile.get('resource_types', [])) + list(selectors.get('blocked_resource_types') or [])
+    hosts = []
+    for group in profile.get('third_party', []):
+        hosts.extend(THIRD_PARTY_HOSTS.get(group, []))
+    hosts.extend(selectors.get('blocked_hosts') or [])
+    
+    urls = []
+    for resource_type in resource_types:
+        for ext in RESOURCE_TYPE_EXTENSIONS.get(resource_type, []):
+            urls.append(f'*.{ext}')
+            urls.append(f'*.{ext}?*')
+    for host in hosts:
+        urls.append(f'*://{host}/*')
+        urls.append(f'*://*.{host}/*')
+    urls.extend(selectors.get('blocked_urls') or [])
+    
+    # 去重并保持顺序
+    return list(dict.fromkeys(urls))
@@ -0,0 +1,200 @@
+"""
+共享浏览器
+多个站点共用一个 Chrome 进程，每个站点使用独立的浏览器上下文（CDP Target.createBrowserContext），
+Cookies 与本地存储互相隔离
+"""
+import os
+import threading
+import logging
+from typing import Dict, Optional, Tuple
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+from .browser_manager import BrowserManager
+
+logger = logging.getLogger(__name__)
+
+class SharedBrowser:
+    """持有一个 Chrome 进程，并在其中创建/销毁隔离的浏览器上下文"""
+    
+    def __init__(self, headless: bool = True, max_contexts: int = 4):
+        """
+        Args:
+            headless: 是否使用无头模式
+            max_contexts: 单个 Chrome 进程中最多同时存在的上下文数量
+        """
+        self.headless = headless
+        self.max_contexts = max_contexts
+        self.host = BrowserManager(headless=headless)
+        self._lock = threading.Lock()
+        self._contexts: Dict[str, str] = {}  # browserContextId -> targetId
+    
+    def open_context(self, proxy: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """
+        创建一个新的隔离上下文及其中的页面
+        
+        Args:
+            proxy: 该上下文使用的代理服务器
+        
+        Returns:
+            (browserContextId, targetId)，达到上限时返回 None
+        """
+        with self._lock:
+            if len(self._contexts) >= self.max_contexts:
+                logger.warning(f'共享浏览器上下文已达上限: {self.max_contexts}')
+                return None
+            
+            host_driver = self._ensure_host()
+            params = {'disposeOnDetach': False}
+            if proxy:
+                params['proxyServer'] = proxy
+            context_id = host_driver.execute_cdp_cmd('Target.createBrowserContext', params)['browserContextId']
+            target_id = host_driver.execute_cdp_cmd('Target.createTarget', {
+                'url': 'about:blank',
+                'browserContextId': context_id
+            })['targetId']
+            self._contexts[context_id] = target_id
+        
+        logger.info(f'创建浏览器上下文: {context_id} (当前 {len(self._contexts)}/{self.max_contexts})')
+        return context_id, target_id
+    
+    def attach(self, target_id: str):
+        """
+        新建一个 WebDriver 会话接入共享的 Chrome，并切换到指定页面
+        chromedriver 的窗口句柄即为 CDP targetId
+        """
+        host_driver = self.host.get_driver()
+        options = webdriver.ChromeOptions()
+        options.debugger_address = host_driver.options.debugger_address
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        service = Service(executable_path=host_driver.patcher.executable_path)
+        
+        driver = webdriver.Chrome(service=service, options=options)
+        driver.switch_to.window(target_id)
+        return driver
+    
+    def close_context(self, context_id: str):
+        """销毁上下文（同时关闭其中的页面），不影响其他上下文"""
+        with self._lock:
+            if self._contexts.pop(context_id, None) is None:
+                return
+            try:
+                self.host.driver.execute_cdp_cmd('Target.disposeBrowserContext', {'browserContextId': context_id})
+                logger.info(f'已销毁浏览器上下文: {context_id}')
+            except Exception as e:
+                logger.warning(f'销毁浏览器上下文失败: {e}')
+    
+    def get_stats(self) -> Dict:
+        return {
+            'contexts': len(self._contexts),
+            'max_contexts': self.max_contexts
+        }
+    
+    def close(self):
+        """关闭共享浏览器"""
+        with self._lock:
+            self._contexts = {}
+            self.host.quit()
+    
+    def _ensure_host(self):
+        """确保宿主浏览器可用，没有上下文在用时允许重新启动"""
+        if self.host.driver:
+            try:
+                self.host.driver.current_url
+                return self.host.driver
+            except Exception:
+                if self._contexts:
+                    raise Exception('共享浏览器已失效')
+                logger.warning('共享浏览器已失效，重新启动')
+                self.host.driver = None
+        return self.host.get_driver()
+
+
+class ContextBrowserManager(BrowserManager):
+    """
+    在共享浏览器的独立上下文中工作的浏览器管理器
+    接口与 BrowserManager 相同，quit 时只销毁自己的上下文
+    context 为调用方预先通过 open_context 占用的 (browserContextId, targetId)，
+    预占后并发创建的站点不会在启动时才发现上下文已满
+    """
+    
+    def __init__(self, shared: SharedBrowser, context: Optional[Tuple[str, str]] = None, user_agent=None,
+                 proxy=None, wait_mode='fixed', max_wait=10, metrics_site=None):
+        super().__init__(
+            headless=shared.headless,
+            user_agent=user_agent,
+            proxy=proxy,
+            wait_mode=wait_mode,
+            max_wait=max_wait,
+            metrics_site=metrics_site
+        )
+        self.shared = shared
+        self.context_id, self.target_id = context if context else (None, None)
+    
+    def get_driver(self):
+        if self.driver:
+            return self.driver
+        
+        if self.context_id is None:
+            # 没有预占的上下文（如 quit 之后重新启动）时再申请
+            with self._span('context.open'):
+                context = self.shared.open_context(proxy=self.proxy)
+            if context is None:
+                raise Exception('共享浏览器上下文已满')
+            self.context_id, self.target_id = context
+        target_id = self.target_id
+        
+        try:
+            with self._span('context.attach'):
+                driver = self.shared.attach(target_id)
+            if self.user_agent:
+                driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': self.user_agent})
+            self._configure_driver(driver)
+        except Exception:
+            self.shared.close_context(self.context_id)
+            self.context_id = self.target_id = None
+            raise
+        
+        self.driver = driver
+        if self.blocked_urls:
+            self._apply_blocked_urls()
+        return self.driver
+    
+    def quit(self):
+        """销毁自己的上下文，断开会话，不关闭共享的 Chrome"""
+        if self.context_id:
+            self.shared.close_context(self.context_id)
+            self.context_id = self.target_id = None
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logger.debug(f'断开共享浏览器会话: {e}')
+            finally:
+                self.driver = None
+
+
+_shared: Dict[bool, SharedBrowser] = {}
+_shared_lock = threading.Lock()
+
+def get_shared_browser(headless: bool = True) -> Optional[SharedBrowser]:
+    """
+    获取全局共享浏览器
+    通过环境变量 SHARED_BROWSER_CONTEXTS 设置每个 Chrome 进程的上下文上限，为 0 时禁用
+    """
+    max_contexts = int(os.getenv('SHARED_BROWSER_CONTEXTS', '0'))
+    if max_contexts <= 0:
+        return None
+    
+    with _shared_lock:
+        if headless not in _shared:
+            _shared[headless] = SharedBrowser(headless=headless, max_contexts=max_contexts)
+        return _shared[headless]
+
+def close_shared_browsers():
+    """关闭所有共享浏览器"""
+    with _shared_lock:
+        for shared in _shared.values():
+            shared.close()
+        _shared.clear()
@@ -0,0 +1,105 @@
+"""
+增量列表抓取
+按需逐页读取帖子列表（生成器），读到上次运行的水位即停止翻页
+"""
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+def numeric_id(post_id) -> Optional[int]:
+    """帖子ID转为整数，非数字ID（部分订阅源的 guid）返回 None，不参与水位比较"""
+    try:
+        return int(post_id)
+    except (TypeError, ValueError):
+        return None
+
+class ListCrawler:
+    """
+    水位为上次成功运行时读到的最大帖子ID。列表按最后回复时间排序，旧帖被顶起时会夹在新帖中，
+    因此逐帖跳过水位以下的帖子，整页都不高于水位时才停止翻页。
+    exclude 接收一页中新帖的ID列表，返回其中应跳过的ID（如已回复过的帖子），每页只调用一次。
+    产出的帖子由调用方在回复成功或内容被拒绝后调用 mark_handled；未标记的帖子（回复失败、
+    运行提前结束）视为未处理，水位不会越过它们，下次运行会再次读到
+    """
+    
+    def __init__(self, watermark: Optional[int] = None,
+                 exclude: Optional[Callable[[List[str]], Set[str]]] = None):
+        self.watermark = watermark
+        self.exclude = exclude
+        self.pages = 0
+        self.posts_yielded = 0
+        self.posts_below_watermark = 0
+        self.posts_excluded = 0
+        self.reached_watermark = False
+        self._seen = set()
+        self._max_handled: Optional[int] = None
+        # 已读到但尚未处理完成的新帖，水位不能越过它们
+        self._pending = set()
+    
+    def iter_posts(self, pages: Iterable[List[Dict]]) -> Iterator[Dict]:
+        """
+        逐个产出水位以上、本次运行中未出现过的帖子
+        调用方停止迭代（如回复数已满）后，不会再读取后续页
+        """
+        for posts in pages:
+            self.pages += 1
+            fresh = []
+            for post in posts:
+                if post['id'] in self._seen:
+                    continue
+                self._seen.add(post['id'])
+                post_id = numeric_id(post['id'])
+                if self.watermark is not None and post_id is not None and post_id <= self.watermark:
+                    self.posts_below_watermark += 1
+                    continue
+                fresh.append(post)
+                if post_id is not None:
+                    self._pending.add(post_id)
+            
+            if self.watermark is not None and not fresh:
+                self.reached_watermark = True
+                logger.info(f"第 {self.pages} 页没有水位（{self.watermark}）以上的帖子，停止翻页")
+                return
+            
+            excluded = self.exclude([post['id'] for post in fresh]) if self.exclude and fresh else set()
+            for post in fresh:
+                if post['id'] in excluded:
+                    # 跳过的帖子也视为已处理，水位可以越过它们
+                    self.mark_handled(post)
+                    self.posts_excluded += 1
+                    continue
+                self.posts_yielded += 1
+                yield post
+    
+    def mark_handled(self, post: Dict):
+        """标记帖子已处理（已回复或内容被拒绝），水位可以越过它"""
+        post_id = numeric_id(post['id'])
+        if post_id is None:
+            return
+        self._pending.discard(post_id)
+        self._max_handled = post_id if self._max_handled is None else max(self._max_handled, post_id)
+    
+    def next_watermark(self) -> Optional[int]:
+        """
+        本次运行成功后应写入的水位：已处理帖子的最大ID，
+        但不越过已读到而未处理的新帖（含回复失败的帖子，下次运行仍会读到它们）；没有变化时返回 None
+        """
+        if self._max_handled is None:
+            return None
+        candidate = self._max_handled
+        if self._pending:
+            candidate = min(candidate, min(self._pending) - 1)
+        if self.watermark is not None and candidate <= self.watermark:
+            return None
+        return candidate
+    
+    def summary(self) -> Dict:
+        return {
+            'pages': self.pages,
+            'posts': self.posts_yielded,
+            'below_watermark': self.posts_below_watermark,
+            'excluded': self.posts_excluded,
+            'reached_watermark': self.reached_watermark,
+            'watermark': self.watermark
+        }
@@ -1,27 +1,49 @@
 """
 回复执行器
 """
-from typing import Dict, Tuple, List, Optional
+from typing import Dict, Iterator, Tuple, List, Optional, Set
 import time
 import random
 import logging
 from selenium.webdriver.common.by import By
 
 # 修复导入路径
-from core.browser.browser_manager import BrowserManager
-from core.browser.cookie_manager import CookieManager
+from core.executors.site_session import SiteSession
+from core.executors.list_crawler import ListCrawler
 from core.ai.reply_generator import ReplyGenerator
 from core.ai.content_analyzer import ContentAnalyzer
 from core.parsers.post_parser import PostParser
+from core.parsers.dom_extractor import DomExtractor
+from core.fetchers import FetchError, PostAttemptedError, list_page_url
+from core.rejection_cache import get_rejection_cache
 from backend.models.site import Site
+from backend.services.watermark_service import WatermarkService
+from backend.services.reply_ledger_service import ReplyLedgerService
 
 logger = logging.getLogger(__name__)
 
 class ReplyExecutor:
-    def __init__(self, site: Site, ai_generator: ReplyGenerator):
+    def __init__(self, site: Site, ai_generator: ReplyGenerator, session: Optional[SiteSession] = None):
+        """
+        Args:
+            site: 站点配置
+            ai_generator: AI回复生成器
+            session: 共享的站点会话，未指定时自行创建并在结束后关闭
+        """
         self.site = site
         self.ai_generator = ai_generator
+        self.session = session
+        self.owns_session = session is None
         self.browser = None
+        # 支持 HTTP 读取的站点不经浏览器读取列表和详情，浏览器只用于登录和发帖
+        self.fetcher = None
+        # 接口模式：Cookie 有效且后端支持发帖时，整个回复流程不启动浏览器
+        self.api_mode = False
+        # 列表页上因已回复 / 负缓存命中而跳过的帖子数
+        self.already_replied = 0
+        self.rejected_before = 0
+        # 本次运行的列表抓取器，回复成功或内容被拒绝的帖子在其中标记为已处理
+        self.crawler: Optional[ListCrawler] = None
     
     def execute(self) -> Tuple[bool, str, Dict]:
         """
@@ -35,39 +57,27 @@ class ReplyExecutor:
             'replies': []
         }
         
+        if self.owns_session:
+            self.session = SiteSession(self.site)
+        
         try:
-            # 初始化浏览器
-            self.browser = BrowserManager(
-                headless=True,
-                user_agent=self.site.user_agent,
-                proxy=self.site.http_proxy
-            )
-            
-            # 导航到站点
-            self.browser.navigate_to(self.site.base_url)
-            time.sleep(2)
-            
-            # 登录
-            if self.site.auth_type == 'cookie' and self.site.cookie_string:
-                success = self._login_with_cookie()
-            elif self.site.auth_type == 'password' and self.site.username and self.site.password:
-                success = self._login_with_password()
+            self.fetcher = self.session.get_fetcher()
+            self.api_mode = self._can_use_api()
+            if self.api_mode:
+                logger.info(f"站点 {self.site.name} 使用 {self.fetcher.name} 接口回复，不启动浏览器")
             else:
-                return False, "未配置有效的登录方式", details
-            
-            if not success:
-                return False, "登录失败", details
-            
-            # 获取帖子列表
-            posts = self._fetch_posts()
-            details['posts_found'] = len(posts)
-            
-            if not posts:
-                return True, "未找到可回复的帖子", details
-            
-            # 回复帖子
+                # 登录（会话内只登录一次）
+                success, message = self._ensure_browser()
+                if not success:
+                    return False, message, details
+            details['api_mode'] = self.api_mode
+            
+            # 逐页读取帖子列表，回复数满额或读到上次运行的水位即停止；
+            # 每页的新帖先批量查询已回复记录和负缓存，这些帖子不再打开详情、生成回复
+            cache_snapshot = get_rejection_cache().snapshot(self.site.id)
+            crawler = self.crawler = ListCrawler(self._get_watermark(), exclude=self._known_ids)
             replied_count = 0
-            for post in posts[:self.site.max_daily_replies]:
+            for post in crawler.iter_posts(self._iter_list_pages()):
                 if self._reply_to_post(post):
                     replied_count += 1
                     details['posts_replied'] += 1
@@ -77,15 +87,29 @@ class ReplyExecutor:
                         'success': True
                     })
                     
+                    if replied_count >= self.site.max_daily_replies:
+                        break
+                    
                     # 随机等待
                     wait_time = random.randint(self.site.reply_interval_min, self.site.reply_interval_max)
                     logger.info(f"等待 {wait_time} 秒后继续...")
                     time.sleep(wait_time)
                 else:
                     details['posts_skipped'] += 1
-                
-                if replied_count >= self.site.max_daily_replies:
-                    break
+            
+            details['posts_found'] = crawler.posts_yielded
+            details['posts_already_replied'] = self.already_replied
+            details['posts_rejected_before'] = self.rejected_before
+            # 负缓存计数为进程内累计值，只记录本次运行的增量
+            cache_stats = get_rejection_cache().stats_since(self.site.id, cache_snapshot)
+            if cache_stats:
+                details['rejection_cache'] = cache_stats
+            details['crawl'] = crawler.summary()
+            # 只有成功运行才推进水位
+            self._save_watermark(crawler)
+            
+            if not crawler.posts_yielded:
+                return True, "未找到可回复的帖子", details
             
             message = f"回复完成，成功回复 {replied_count} 个帖子"
             logger.info(message)
@@ -96,72 +120,188 @@ class ReplyExecutor:
             return False, f"回复执行异常: {str(e)}", details
         
         finally:
-            if self.browser:
-                self.browser.quit()
+            wait_summary = self.session.pop_wait_summary()
+            if wait_summary:
+                details['waits'] = wait_summary
+            traffic_summary = self.session.pop_traffic_summary()
+            if traffic_summary:
+                details['traffic'] = traffic_summary
+            timing_summary = self.session.pop_timing_summary()
+            if timing_summary:
+                details['timings'] = timing_summary
+            memory_summary = self.session.pop_memory_summary()
+            if memory_summary:
+                details['memory'] = memory_summary
+            pool_stats = self.session.get_pool_stats()
+            if pool_stats:
+                details['driver_pool'] = pool_stats
+            fetcher_stats = self.session.pop_fetcher_stats()
+            if fetcher_stats:
+                details['fetcher'] = fetcher_stats
+            cache_stats = self.ai_generator.pop_cache_stats()
+            if cache_stats:
+                details['llm_cache'] = cache_stats
+            llm_stats = self.ai_generator.pop_llm_stats()
+            if llm_stats:
+                details['llm'] = llm_stats
+            if self.owns_session:
+                self.session.close()
     
-    def _login_with_cookie(self) -> bool:
-        """使用Cookie登录"""
+    def _can_use_api(self) -> bool:
+        """Cookie 登录的站点，后端支持发帖且 HTTP 会话已登录时使用接口模式"""
+        if not self.fetcher or not self.fetcher.supports_posting:
+            return False
+        if self.site.auth_type != 'cookie' or not self.site.cookie_string:
+            return False
+        return self.fetcher.check_login()
+    
+    def _ensure_browser(self) -> Tuple[bool, str]:
+        """确保浏览器已启动并登录（接口模式下回退时才会延迟调用）"""
+        if self.browser:
+            return True, "已登录"
+        
+        success, message = self.session.login()
+        if not success:
+            return False, message
+        
+        self.browser = self.session.get_browser()
+        if self.fetcher and self.site.auth_type == 'password':
+            # 账号密码登录的状态只在浏览器中，同步给 HTTP 会话
+            self.fetcher.load_cookies(self.browser.get_cookies())
+        return True, message
+    
+    def _get_watermark(self) -> Optional[int]:
         try:
-            cookies = CookieManager.parse_cookie_string(self.site.cookie_string)
-            if not cookies:
-                return False
-            
-            from urllib.parse import urlparse
-            parsed_url = urlparse(self.site.base_url)
-            domain = parsed_url.netloc
-            
-            CookieManager.load_cookies_to_driver(self.browser.driver, cookies, domain)
-            return True
+            return WatermarkService.get_watermark(self.site.id)
         except Exception as e:
-            logger.error(f"Cookie登录失败: {e}")
-            return False
+            logger.warning(f"读取帖子水位失败，本次完整读取列表: {e}")
+            return None
     
-    def _login_with_password(self) -> bool:
-        """使用账号密码登录"""
+    def _save_watermark(self, crawler: ListCrawler):
+        watermark = crawler.next_watermark()
+        if watermark is None:
+            return
         try:
-            login_modal_selector = self.site.selectors.get('login_modal')
-            if login_modal_selector:
-                ele = self.browser.wait_for_element(By.CSS_SELECTOR, login_modal_selector)
-                if ele: ele.click()
-                time.sleep(1)
-            
-            username_selector = self.site.selectors.get('username_input')
-            if username_selector:
-                ele = self.browser.wait_for_element(By.CSS_SELECTOR, username_selector)
-                if ele: ele.send_keys(self.site.username)
-            
-            password_selector = self.site.selectors.get('password_input')
-            if password_selector:
-                ele = self.browser.wait_for_element(By.CSS_SELECTOR, password_selector)
-                if ele: ele.send_keys(self.site.password)
-            
-            login_submit_selector = self.site.selectors.get('login_submit')
-            if login_submit_selector:
-                ele = self.browser.wait_for_element(By.CSS_SELECTOR, login_submit_selector)
-                if ele: ele.click()
-                time.sleep(3)
-            
-            return True
+            WatermarkService.update_watermark(self.site.id, watermark)
+            logger.info(f"站点 {self.site.name} 帖子水位更新为 {watermark}")
         except Exception as e:
-            logger.error(f"账号密码登录失败: {e}")
-            return False
+            logger.warning(f"更新帖子水位失败: {e}")
     
-    def _fetch_posts(self) -> List[Dict]:
-        """获取帖子列表"""
+    def _known_ids(self, post_ids: List[str]) -> Set[str]:
+        """批量查询已回复过的帖子和负缓存中的帖子"""
+        known = set()
         try:
-            # 导航到帖子列表页
-            post_list_url = self.site.selectors.get('post_list_url', '/all')
-            if not post_list_url.startswith('http'):
-                post_list_url = self.site.base_url.rstrip('/') + '/' + post_list_url.lstrip('/')
-            
-            self.browser.navigate_to(post_list_url)
-            time.sleep(3)
+            replied = ReplyLedgerService.get_replied_ids(self.site.id, post_ids)
+            self.already_replied += len(replied)
+            known |= replied
+        except Exception as e:
+            logger.warning(f"查询已回复记录失败: {e}")
+        
+        remaining = [post_id for post_id in post_ids if post_id not in known]
+        try:
+            rejected = get_rejection_cache().filter_rejected(self.site.id, remaining)
+            self.rejected_before += len(rejected)
+            known |= rejected
+        except Exception as e:
+            logger.warning(f"查询负缓存失败: {e}")
+        
+        if known:
+            logger.info(f"跳过 {len(known)} 个已回复或已被过滤的帖子")
+        return known
+    
+    def _reject(self, post: Dict, reason: str):
+        """内容分析拒绝的帖子写入负缓存，过期前不再打开"""
+        if self.crawler:
+            self.crawler.mark_handled(post)
+        try:
+            get_rejection_cache().add(self.site.id, post['id'], reason)
+        except Exception as e:
+            logger.warning(f"写入负缓存失败: {e}")
+    
+    def _record_reply(self, post: Dict, content: str, success: bool, uncertain: bool = False):
+        """
+        记录回复结果；成功的帖子在抓取器中标记为已处理，失败的帖子留待下次运行重试
+        uncertain 表示请求已发出但结果未知，按已回复处理，避免之后重复回复
+        """
+        if self.crawler and (success or uncertain):
+            self.crawler.mark_handled(post)
+        try:
+            ReplyLedgerService.record_reply(
+                self.site.id, post['id'], 'success' if success else ('uncertain' if uncertain else 'failed'),
+                post_title=post.get('title'), reply_content=content
+            )
+        except Exception as e:
+            logger.warning(f"记录回复失败: {e}")
+    
+    def _iter_list_pages(self) -> Iterator[List[Dict]]:
+        """逐页产出帖子列表，最多 max_list_pages 页（默认 3）"""
+        max_pages = max(int(self.site.selectors.get('max_list_pages') or 3), 1)
+        
+        if self.fetcher:
+            read_any = False
+            try:
+                for posts in self.fetcher.iter_pages(max_pages):
+                    logger.info(f"通过 {self.fetcher.name} 接口获取到 {len(posts)} 个帖子")
+                    read_any = True
+                    yield posts
+                return
+            except FetchError as e:
+                if read_any:
+                    logger.warning(f"接口翻页失败，停止读取后续页: {e}")
+                    return
+                # 接口不可用时本次运行改用浏览器
+                logger.warning(f"接口读取帖子列表失败，改用浏览器: {e}")
+                self.fetcher = None
+                self.api_mode = False
+        
+        yield from self._iter_browser_pages(max_pages)
+    
+    def _iter_browser_pages(self, max_pages: int) -> Iterator[List[Dict]]:
+        """
+        在浏览器中逐页读取帖子列表
+        配置 page_param 时按 URL 翻页；配置 infinite_scroll 时重新打开列表并滚动 page 次加载后续内容
+        （两页之间浏览器可能已打开过帖子详情，因此每页都重新导航）
+        """
+        infinite_scroll = str(self.site.selectors.get('infinite_scroll', '')).lower() == 'true'
+        for page in range(max_pages):
+            url = list_page_url(self.site, 0 if infinite_scroll else page)
+            if url is None:
+                return
             
-            # 获取页面HTML
-            html = self.browser.driver.page_source
+            posts = self._read_browser_list(url, scrolls=page if infinite_scroll else 0)
+            if not posts:
+                return
+            yield posts
             
-            # 解析帖子列表
-            posts = PostParser.parse_post_list(html, self.site.selectors, self.site.base_url)
+            if not infinite_scroll and not self.site.selectors.get('page_param'):
+                return
+    
+    def _read_browser_list(self, url: str, scrolls: int = 0) -> List[Dict]:
+        """打开列表页（可选滚动加载）并解析帖子"""
+        try:
+            success, message = self._ensure_browser()
+            if not success:
+                logger.error(f"获取帖子列表失败: {message}")
+                return []
+            
+            post_item = self.site.selectors.get('post_item')
+            self.browser.navigate_to(url, wait_for=post_item)
+            self.browser.settle(3, selector=post_item)
+            for _ in range(scrolls):
+                self.browser.driver.execute_script('window.scrollTo(0, document.body.scrollHeight);')
+                self.browser.settle(2, selector=post_item, label='scroll')
+            
+            # dom 模式在页面内执行选择器，只传回帖子字段
+            posts = None
+            if self._extract_in_page():
+                posts = DomExtractor.extract_post_list(self.browser.driver, self.site.selectors, self.site.base_url)
+            
+            if posts is None:
+                # 获取页面HTML
+                html = self.browser.driver.page_source
+                
+                # 解析帖子列表
+                posts = PostParser.parse_post_list(html, self.site.selectors, self.site.base_url)
             
             logger.info(f"获取到 {len(posts)} 个帖子")
             return posts
@@ -170,18 +310,47 @@ class ReplyExecutor:
             logger.error(f"获取帖子列表失败: {e}")
             return []
     
+    def _extract_in_page(self) -> bool:
+        """是否使用页面内提取（选择器配置 extraction_mode 为 dom）"""
+        return self.site.selectors.get('extraction_mode') == 'dom'
+    
     def _reply_to_post(self, post: Dict) -> bool:
         """回复单个帖子"""
         try:
             logger.info(f"准备回复帖子: {post['title']}")
             
-            # 导航到帖子详情页
-            self.browser.navigate_to(post['link'])
-            time.sleep(2)
-            
-            # 获取帖子内容
-            html = self.browser.driver.page_source
-            post_detail = PostParser.parse_post_detail(html, self.site.selectors)
+            # 订阅源条目自带正文，先预筛，避免打开不会回复的帖子
+            if post.get('content'):
+                should_skip, reason = ContentAnalyzer.should_skip(post['title'], post['content'])
+                if should_skip:
+                    logger.info(f"跳过帖子（订阅源预筛）: {reason}")
+                    self._reject(post, reason)
+                    return False
+            
+            post_detail = None
+            if self.fetcher and self.fetcher.supports_detail:
+                try:
+                    post_detail = self.fetcher.fetch_post_detail(post)
+                except FetchError as e:
+                    logger.warning(f"接口读取帖子详情失败，改用浏览器: {e}")
+            
+            on_page = post_detail is None
+            if on_page:
+                success, message = self._ensure_browser()
+                if not success:
+                    logger.error(f"回复帖子失败: {message}")
+                    return False
+                
+                # 导航到帖子详情页
+                self.browser.navigate_to(post['link'], wait_for=self.site.selectors.get('detail_content'))
+                self.browser.settle(2, selector=self.site.selectors.get('detail_content'))
+                
+                # 获取帖子内容
+                if self._extract_in_page():
+                    post_detail = DomExtractor.extract_post_detail(self.browser.driver, self.site.selectors)
+                if post_detail is None:
+                    html = self.browser.driver.page_source
+                    post_detail = PostParser.parse_post_detail(html, self.site.selectors)
             
             # 分析是否应该回复
             should_skip, reason = ContentAnalyzer.should_skip(
@@ -191,6 +360,7 @@ class ReplyExecutor:
             
             if should_skip:
                 logger.info(f"跳过帖子: {reason}")
+                self._reject(post, reason)
                 return False
             
             # 生成AI回复
@@ -198,15 +368,44 @@ class ReplyExecutor:
                 post_detail.get('title', post['title']),
                 post_detail.get('content', ''),
                 self.site.min_reply_count,
-                self.site.max_reply_count
+                self.site.max_reply_count,
+                site_id=self.site.id
             )
             
             if not reply_content:
                 logger.warning("AI回复生成失败")
                 return False
             
+            if self.api_mode:
+                try:
+                    success = self.fetcher.post_reply(post, reply_content)
+                    self._record_reply(post, reply_content, success)
+                    return success
+                except PostAttemptedError as e:
+                    # 请求已经发出，改用浏览器重发可能重复回复或绕过限流，本帖记为失败
+                    logger.error(f"接口回复失败，不再改用浏览器重发: {e}")
+                    self._record_reply(post, reply_content, False, uncertain=e.uncertain)
+                    return False
+                except FetchError as e:
+                    # 请求发出前的失败（会话失效、缺少 CSRF 令牌等），本次及后续回复改用浏览器
+                    logger.warning(f"接口回复失败，改用浏览器: {e}")
+                    self.api_mode = False
+            
+            success, message = self._ensure_browser()
+            if not success:
+                logger.error(f"回复帖子失败: {message}")
+                return False
+            
+            if not on_page:
+                # 详情来自接口，发帖前才打开页面
+                reply_entry = self.site.selectors.get('reply_dropdown') or self.site.selectors.get('reply_textarea')
+                self.browser.navigate_to(post['link'], wait_for=reply_entry)
+                self.browser.settle(2, selector=reply_entry)
+            
             # 执行回复操作
-            return self._post_reply(reply_content)
+            success = self._post_reply(reply_content)
+            self._record_reply(post, reply_content, success)
+            return success
             
         except Exception as e:
             logger.error(f"回复帖子失败: {e}")
@@ -215,24 +414,26 @@ class ReplyExecutor:
     def _post_reply(self, content: str) -> bool:
         """发送回复"""
         try:
-            # 点击回复按钮（如果需要）
             reply_dropdown_selector = self.site.selectors.get('reply_dropdown')
-            if reply_dropdown_selector:
-                ele = self.browser.wait_for_element(By.CSS_SELECTOR, reply_dropdown_selector)
-                if ele: 
-                    ele.click()
-                    time.sleep(1)
-            
-            # 输入回复内容
             textarea_selector = self.site.selectors.get('reply_textarea')
             if not textarea_selector:
                 logger.error("未配置回复输入框选择器")
                 return False
             
+            # 点击回复按钮（如果需要）：一次检查回复按钮和输入框，输入框已可见时无需展开
+            if reply_dropdown_selector:
+                probe = self.browser.probe_selectors([reply_dropdown_selector, textarea_selector], until='any')
+                if probe[reply_dropdown_selector]['present'] and not probe[textarea_selector]['visible']:
+                    ele = self.browser.find_element_now(reply_dropdown_selector)
+                    if ele:
+                        ele.click()
+                        self.browser.settle(1, selector=textarea_selector)
+            
+            # 输入回复内容
             ele = self.browser.wait_for_element(By.CSS_SELECTOR, textarea_selector)
             if ele:
                 ele.send_keys(content)
-                time.sleep(1)
+                self.browser.settle(1)
             else:
                 return False
             
@@ -245,7 +446,7 @@ class ReplyExecutor:
             ele = self.browser.wait_for_element(By.CSS_SELECTOR, submit_selector)
             if ele:
                 ele.click()
-                time.sleep(2)
+                self.browser.settle(2)
             else:
                 return False
             
@@ -1,21 +1,26 @@
 """
 签到执行器
 """
-from typing import Dict, Tuple
-import time
+from typing import Dict, Tuple, Optional
 import logging
-from selenium.webdriver.common.by import By
 
 # 修复导入路径
-from core.browser.browser_manager import BrowserManager
-from core.browser.cookie_manager import CookieManager
+from core.executors.site_session import SiteSession
+from core.fetchers import FetchError
 from backend.models.site import Site
 
 logger = logging.getLogger(__name__)
 
 class SignInExecutor:
-    def __init__(self, site: Site):
+    def __init__(self, site: Site, session: Optional[SiteSession] = None):
+        """
+        Args:
+            site: 站点配置
+            session: 共享的站点会话，未指定时自行创建并在结束后关闭
+        """
         self.site = site
+        self.session = session
+        self.owns_session = session is None
         self.browser = None
     
     def execute(self) -> Tuple[bool, str, Dict]:
@@ -25,40 +30,35 @@ class SignInExecutor:
         """
         details = {}
         
+        if self.owns_session:
+            self.session = SiteSession(self.site)
+        
         try:
-            # 初始化浏览器
-            self.browser = BrowserManager(
-                headless=True,
-                user_agent=self.site.user_agent,
-                proxy=self.site.http_proxy
-            )
-            
-            # 导航到站点
-            self.browser.navigate_to(self.site.base_url)
-            time.sleep(2)
-            
-            # 加载Cookie或登录
-            if self.site.auth_type == 'cookie' and self.site.cookie_string:
-                success = self._login_with_cookie()
-            elif self.site.auth_type == 'password' and self.site.username and self.site.password:
-                success = self._login_with_password()
-            else:
-                return False, "未配置有效的登录方式", details
+            # 支持接口签到的站点不启动浏览器
+            result = self._sign_in_with_api(details)
+            if result:
+                return result
             
+            # 登录（会话内只登录一次）
+            success, message = self.session.login()
             if not success:
-                return False, "登录失败", details
+                return False, message, details
+            
+            self.browser = self.session.get_browser()
             
-            # 刷新页面确保Cookie生效
-            self.browser.navigate_to(self.site.base_url)
-            time.sleep(2)
+            # 确保位于首页
+            self.session.ensure_at(self.site.base_url)
             
             # 执行签到
             signin_selector = self.site.selectors.get('signin_button')
             if not signin_selector:
                 return False, "未配置签到按钮选择器", details
             
-            # 查找签到按钮
-            signin_button = self.browser.wait_for_element(By.CSS_SELECTOR, signin_selector)
+            # 查找签到按钮（已签到时按钮不存在，只等待一次 max_wait，不叠加隐式等待）
+            probe = self.browser.probe_selectors([signin_selector])
+            signin_button = None
+            if probe[signin_selector]['present']:
+                signin_button = self.browser.find_element_now(signin_selector)
             
             if not signin_button:
                 # 可能已经签到过了
@@ -68,15 +68,18 @@ class SignInExecutor:
             # 点击签到按钮
             try:
                 signin_button.click()
-                time.sleep(2)
+                self.browser.settle(2)
                 
                 # 检查是否需要确认
                 confirm_selector = self.site.selectors.get('signin_confirm')
                 if confirm_selector:
-                    confirm_btn = self.browser.wait_for_element(By.CSS_SELECTOR, confirm_selector)
+                    probe = self.browser.probe_selectors([confirm_selector], timeout=5)
+                    confirm_btn = None
+                    if probe[confirm_selector]['visible']:
+                        confirm_btn = self.browser.find_element_now(confirm_selector)
                     if confirm_btn:
                         confirm_btn.click()
-                        time.sleep(1)
+                        self.browser.settle(1)
                 
                 details['signed'] = True
                 logger.info(f"站点 {self.site.name} 签到成功")
@@ -89,63 +92,47 @@ class SignInExecutor:
             return False, f"签到执行异常: {str(e)}", details
         
         finally:
-            if self.browser:
-                self.browser.quit()
-    
-    def _login_with_cookie(self) -> bool:
-        """使用Cookie登录"""
-        try:
-            cookies = CookieManager.parse_cookie_string(self.site.cookie_string)
-            if not cookies:
-                logger.error("Cookie解析失败")
-                return False
-            
-            # 提取域名
-            from urllib.parse import urlparse
-            parsed_url = urlparse(self.site.base_url)
-            domain = parsed_url.netloc
-            
-            CookieManager.load_cookies_to_driver(self.browser.driver, cookies, domain)
-            logger.info("Cookie加载成功")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Cookie登录失败: {e}")
-            return False
+            wait_summary = self.session.pop_wait_summary()
+            if wait_summary:
+                details['waits'] = wait_summary
+            traffic_summary = self.session.pop_traffic_summary()
+            if traffic_summary:
+                details['traffic'] = traffic_summary
+            fetcher_stats = self.session.pop_fetcher_stats()
+            if fetcher_stats:
+                details['fetcher'] = fetcher_stats
+            timing_summary = self.session.pop_timing_summary()
+            if timing_summary:
+                details['timings'] = timing_summary
+            memory_summary = self.session.pop_memory_summary()
+            if memory_summary:
+                details['memory'] = memory_summary
+            pool_stats = self.session.get_pool_stats()
+            if pool_stats:
+                details['driver_pool'] = pool_stats
+            if self.owns_session:
+                self.session.close()
     
-    def _login_with_password(self) -> bool:
-        """使用账号密码登录"""
-        from selenium.webdriver.common.by import By
+    def _sign_in_with_api(self, details: Dict) -> Optional[Tuple[bool, str, Dict]]:
+        """
+        通过抓取后端的签到接口签到
+        不支持或接口失败时返回 None，由浏览器流程继续
+        """
+        fetcher = self.session.get_fetcher()
+        if not fetcher or not fetcher.supports_signin:
+            return None
+        if self.site.auth_type != 'cookie' or not self.site.cookie_string or not fetcher.check_login():
+            return None
+        
         try:
-            # 点击登录入口
-            login_modal_selector = self.site.selectors.get('login_modal')
-            if login_modal_selector:
-                ele = self.browser.wait_for_element(By.CSS_SELECTOR, login_modal_selector)
-                if ele: ele.click()
-                time.sleep(1)
-            
-            # 输入用户名
-            username_selector = self.site.selectors.get('username_input')
-            if username_selector:
-                ele = self.browser.wait_for_element(By.CSS_SELECTOR, username_selector)
-                if ele: ele.send_keys(self.site.username)
-            
-            # 输入密码
-            password_selector = self.site.selectors.get('password_input')
-            if password_selector:
-                ele = self.browser.wait_for_element(By.CSS_SELECTOR, password_selector)
-                if ele: ele.send_keys(self.site.password)
-            
-            # 点击登录按钮
-            login_submit_selector = self.site.selectors.get('login_submit')
-            if login_submit_selector:
-                ele = self.browser.wait_for_element(By.CSS_SELECTOR, login_submit_selector)
-                if ele: ele.click()
-                time.sleep(3)
-            
-            logger.info("账号密码登录完成")
-            return True
-            
-        except Exception as e:
-            logger.error(f"账号密码登录失败: {e}")
-            return False
+            result = fetcher.sign_in()
+        except FetchError as e:
+            logger.warning(f"接口签到失败，改用浏览器: {e}")
+            return None
+        
+        details.update(result)
+        details['api_mode'] = True
+        if result.get('already_signed'):
+            return True, "今日已签到", details
+        logger.info(f"站点 {self.site.name} 签到成功（接口）")
+        return True, "签到成功", details
@@ -0,0 +1,286 @@
+"""
+站点会话
+一次站点运行中只启动一个浏览器并登录一次，供签到、回复等阶段共享
+"""
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import os
+import time
+import logging
+from selenium.webdriver.common.by import By
+
+from core.browser.browser_manager import BrowserManager
+from core.browser.cookie_manager import CookieManager
+from core.browser.driver_pool import get_driver_pool
+from core.browser.resource_blocker import build_blocked_urls
+from core.browser.profile_store import get_profile_store
+from core.browser.shared_browser import ContextBrowserManager, get_shared_browser
+from core.metrics import get_metrics_registry
+from core.fetchers import BaseFetcher, create_fetcher
+from backend.models.site import Site
+
+logger = logging.getLogger(__name__)
+
+class SiteSession:
+    def __init__(self, site: Site):
+        self.site = site
+        self.browser: Optional[BrowserManager] = None
+        self.logged_in = False
+        self.profile_key = f'site_{site.id}'
+        self.profile_dir: Optional[str] = None
+        self._stage_timings: List[Dict] = []
+        self.fetcher: Optional[BaseFetcher] = None
+        self._fetcher_created = False
+    
+    def get_browser(self) -> BrowserManager:
+        """获取浏览器，首次调用时创建"""
+        if self.browser is None:
+            # 站点开启持久化配置时锁定独立的用户数据目录，被占用时退回临时配置
+            if self.site.selectors.get('persistent_profile'):
+                self.profile_dir = get_profile_store().acquire(self.profile_key)
+            
+            wait_mode = self.site.selectors.get('wait_mode') or os.getenv('BROWSER_WAIT_MODE', 'fixed')
+            max_wait = float(self.site.selectors.get('max_wait') or 10)
+            max_rss_mb = float(self.site.selectors.get('max_rss_mb') or os.getenv('BROWSER_MAX_RSS_MB', '0'))
+            max_navigations = int(self.site.selectors.get('max_navigations') or os.getenv('BROWSER_MAX_NAVIGATIONS', '0'))
+            
+            # 开启共享浏览器时在共享的 Chrome 进程中使用独立上下文；在此处直接占用上下文，
+            # 多个站点并发创建时，没抢到的站点退回独立进程，而不是在启动浏览器时失败
+            shared = None if self.profile_dir else get_shared_browser(headless=True)
+            context = None
+            if shared:
+                try:
+                    context = shared.open_context(proxy=self.site.http_proxy)
+                except Exception as e:
+                    logger.warning(f"创建共享浏览器上下文失败，改用独立浏览器: {e}")
+            if context:
+                self.browser = ContextBrowserManager(
+                    shared,
+                    context=context,
+                    user_agent=self.site.user_agent,
+                    proxy=self.site.http_proxy,
+                    wait_mode=wait_mode,
+                    max_wait=max_wait,
+                    metrics_site=self.site.name
+                )
+            else:
+                self.browser = BrowserManager(
+                    headless=True,
+                    user_agent=self.site.user_agent,
+                    proxy=self.site.http_proxy,
+                    pool=get_driver_pool(),
+                    wait_mode=wait_mode,
+                    max_wait=max_wait,
+                    user_data_dir=self.profile_dir,
+                    max_rss_mb=max_rss_mb,
+                    max_navigations=max_navigations,
+                    metrics_site=self.site.name
+                )
+            blocked_urls = build_blocked_urls(self.site.selectors)
+            if blocked_urls:
+                self.browser.set_blocked_urls(blocked_urls)
+        return self.browser
+    
+    def get_fetcher(self) -> Optional[BaseFetcher]:
+        """获取站点的 HTTP 抓取后端（首次调用时创建，不支持时返回 None），签到和回复共享登录状态与 CSRF 令牌"""
+        if not self._fetcher_created:
+            self.fetcher = create_fetcher(self.site)
+            self._fetcher_created = True
+        return self.fetcher
+    
+    def pop_fetcher_stats(self) -> Optional[Dict]:
+        """取出 HTTP 请求统计（未使用抓取后端时返回 None）"""
+        if self.fetcher and self.fetcher.stats['requests']:
+            return self.fetcher.pop_stats()
+        return None
+    
+    def login(self) -> Tuple[bool, str]:
+        """
+        登录站点，已登录时直接返回
+        返回: (是否成功, 消息)
+        """
+        if self.logged_in:
+            return True, "已登录"
+        
+        with self.stage('login'):
+            browser = self.get_browser()
+            self._start_browser()
+            
+            # 导航到站点
+            browser.navigate_to(self.site.base_url)
+            browser.settle(2)
+            
+            # 加载Cookie或登录
+            if self.site.auth_type == 'cookie' and self.site.cookie_string:
+                if self.profile_dir and self._has_session_cookies():
+                    # 持久化配置中已保留登录状态，无需重新注入
+                    logger.info("沿用持久化配置中的 Cookie")
+                    success = True
+                else:
+                    success = self._login_with_cookie()
+                if success:
+                    # 刷新页面确保Cookie生效
+                    browser.navigate_to(self.site.base_url)
+                    browser.settle(2)
+            elif self.site.auth_type == 'password' and self.site.username and self.site.password:
+                success = self._login_with_password()
+            else:
+                return False, "未配置有效的登录方式"
+        
+        if not success:
+            return False, "登录失败"
+        
+        self.logged_in = True
+        return True, "登录成功"
+    
+    def ensure_at(self, url: str):
+        """确保浏览器停留在指定页面，不在时才导航"""
+        browser = self.get_browser()
+        try:
+            current_url = browser.get_driver().current_url
+        except Exception:
+            current_url = ''
+        if current_url.rstrip('/') != url.rstrip('/'):
+            browser.navigate_to(url)
+            browser.settle(2)
+    
+    @contextmanager
+    def stage(self, name: str):
+        """记录一个阶段的耗时"""
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            duration = time.time() - start_time
+            self._stage_timings.append({'stage': name, 'duration': round(duration, 2)})
+            get_metrics_registry().record(f'stage.{name}', duration, site=self.site.name)
+            logger.info(f"站点 {self.site.name} 阶段 {name} 耗时: {duration:.2f}秒")
+    
+    def pop_stage_timings(self) -> List[Dict]:
+        """取出尚未写入日志的阶段耗时"""
+        timings = self._stage_timings
+        self._stage_timings = []
+        return timings
+    
+    def pop_wait_summary(self) -> Optional[Dict]:
+        """取出浏览器等待统计（尚未启动浏览器时返回 None）"""
+        if self.browser:
+            return self.browser.pop_wait_summary()
+        return None
+    
+    def pop_traffic_summary(self) -> Optional[Dict]:
+        """取出浏览器流量统计（尚未启动浏览器时返回 None）"""
+        if self.browser:
+            return self.browser.pop_traffic_summary()
+        return None
+    
+    def pop_timing_summary(self) -> Optional[Dict]:
+        """取出浏览器各阶段耗时及站点 p50/p95（尚未启动浏览器时返回 None）"""
+        if self.browser:
+            return self.browser.pop_timing_summary()
+        return None
+    
+    def pop_memory_summary(self) -> Optional[Dict]:
+        """取出浏览器内存统计（峰值常驻内存与回收记录，未启用内存守护时返回 None）"""
+        if self.browser and self.browser.governor.enabled:
+            return self.browser.pop_memory_summary()
+        return None
+    
+    def get_pool_stats(self) -> Optional[Dict]:
+        """获取驱动池统计（未启用驱动池时返回 None）"""
+        if self.browser and self.browser.pool:
+            return self.browser.pool.get_stats()
+        return None
+    
+    def close(self):
+        """关闭浏览器（使用驱动池时归还驱动）"""
+        if self.browser:
+            self.browser.quit()
+        if self.profile_dir:
+            get_profile_store().release(self.profile_key)
+            self.profile_dir = None
+        self.browser = None
+        self.logged_in = False
+    
+    def _start_browser(self):
+        """启动浏览器；持久化配置损坏导致启动失败时重置配置后重试一次"""
+        try:
+            self.browser.get_driver()
+        except Exception:
+            if not self.profile_dir:
+                raise
+            logger.warning(f"使用持久化配置启动失败，重置配置后重试: {self.profile_key}")
+            get_profile_store().reset(self.profile_key)
+            os.makedirs(self.profile_dir, exist_ok=True)
+            self.browser.get_driver()
+    
+    def _has_session_cookies(self) -> bool:
+        """
+        浏览器中是否已包含站点配置的全部 Cookie（名称和值都一致）
+        用户更新了 cookie_string 时值不同，需要重新注入，不能沿用持久化配置中的旧值
+        """
+        cookies = CookieManager.parse_cookie_string(self.site.cookie_string)
+        if not cookies:
+            return False
+        configured = {(cookie.get('name'), cookie.get('value')) for cookie in cookies}
+        current = {(cookie.get('name'), cookie.get('value')) for cookie in self.browser.get_cookies()}
+        return configured <= current
+    
+    def _login_with_cookie(self) -> bool:
+        """使用Cookie登录"""
+        try:
+            cookies = CookieManager.parse_cookie_string(self.site.cookie_string)
+            if not cookies:
+                logger.error("Cookie解析失败")
+                return False
+            
+            # 提取域名
+            domain = urlparse(self.site.base_url).netloc
+            
+            CookieManager.load_cookies_to_driver(self.browser.driver, cookies, domain)
+            logger.info("Cookie加载成功")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Cookie登录失败: {e}")
+            return False
+    
+    def _login_with_password(self) -> bool:
+        """使用账号密码登录"""
+        try:
+            # 点击登录入口：一次检查登录入口和用户名输入框，输入框已可见时无需点击
+            login_modal_selector = self.site.selectors.get('login_modal')
+            if login_modal_selector:
+                username_input = self.site.selectors.get('username_input')
+                probe = self.browser.probe_selectors([login_modal_selector, username_input], until='any')
+                if probe[login_modal_selector]['present'] and not probe.get(username_input, {}).get('visible'):
+                    ele = self.browser.find_element_now(login_modal_selector)
+                    if ele: ele.click()
+                    self.browser.settle(1, selector=username_input)
+            
+            # 输入用户名
+            username_selector = self.site.selectors.get('username_input')
+            if username_selector:
+                ele = self.browser.wait_for_element(By.CSS_SELECTOR, username_selector)
+                if ele: ele.send_keys(self.site.username)
+            
+            # 输入密码
+            password_selector = self.site.selectors.get('password_input')
+            if password_selector:
+                ele = self.browser.wait_for_element(By.CSS_SELECTOR, password_selector)
+                if ele: ele.send_keys(self.site.password)
+            
+            # 点击登录按钮
+            login_submit_selector = self.site.selectors.get('login_submit')
+            if login_submit_selector:
+                ele = self.browser.wait_for_element(By.CSS_SELECTOR, login_submit_selector)
+                if ele: ele.click()
+                self.browser.settle(3)
+            
+            logger.info("账号密码登录完成")
+            return True
+        
+        except Exception as e:
+            logger.error(f"账号密码登录失败: {e}")
+            return False
@@ -0,0 +1,15 @@
+"""
+抓取后端模块
+"""
+from .base import BaseFetcher, FetchError, PostAttemptedError, list_page_url
+from .discourse import DiscourseFetcher
+from .flarum import FlarumFetcher
+from .html import HtmlFetcher
+from .feed import FeedFetcher
+from .factory import create_fetcher
+from .http_session import get_http_session_pool
+
+__all__ = [
+    'BaseFetcher', 'FetchError', 'PostAttemptedError', 'DiscourseFetcher', 'FlarumFetcher', 'HtmlFetcher',
+    'FeedFetcher', 'create_fetcher', 'get_http_session_pool', 'list_page_url'
+]
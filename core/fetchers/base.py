@@ -0,0 +1,235 @@
+"""
+抓取后端基类
+不启动浏览器，直接通过 HTTP 读取帖子列表和详情，输出与 PostParser 相同的字典格式
+"""
+import time
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlparse, urlencode
+
+import requests
+from bs4 import BeautifulSoup
+
+from backend.models.site import Site
+from core.metrics import get_metrics_registry
+from core.parsers.feed_parser import FeedParser
+from .http_session import get_http_session_pool, load_cookies
+
+logger = logging.getLogger(__name__)
+
+class FetchError(Exception):
+    """抓取失败（网络错误、状态码异常或响应格式不符）"""
+
+
+class PostAttemptedError(FetchError):
+    """
+    写请求（发帖等）已经发出之后的失败，调用方不应改用浏览器重发（可能重复回复或绕过限流）
+    uncertain 为 True 时请求可能已经生效（超时、5xx），为 False 时确定未生效（如持续被限流）
+    """
+    
+    def __init__(self, message: str, uncertain: bool = True):
+        super().__init__(message)
+        self.uncertain = uncertain
+
+
+def list_page_url(site: Site, page: int = 0) -> Optional[str]:
+    """
+    帖子列表第 page 页（从 0 开始）的完整 URL
+    后续页通过选择器 page_param 指定的查询参数翻页，参数值为 page + page_offset（默认 1，即 ?page=2 为第二页）；
+    未配置 page_param 时只有第一页，page > 0 返回 None
+    """
+    url = site.selectors.get('post_list_url', '/all')
+    if not url.startswith('http'):
+        url = site.base_url.rstrip('/') + '/' + url.lstrip('/')
+    if page == 0:
+        return url
+    
+    page_param = site.selectors.get('page_param')
+    if not page_param:
+        return None
+    offset = int(site.selectors.get('page_offset', 1))
+    separator = '&' if '?' in url else '?'
+    return url + separator + urlencode({page_param: page + offset})
+
+
+class BaseFetcher(ABC):
+    name = 'base'
+    # 是否支持读取详情 / 不经浏览器直接发帖 / 签到
+    supports_detail = True
+    supports_posting = False
+    supports_signin = False
+    
+    def __init__(self, site: Site):
+        self.site = site
+        self.base_url = site.base_url.rstrip('/')
+        self.session = get_http_session_pool().get(site)
+        self.timeout = float(site.selectors.get('http_timeout') or 15)
+        self.stats = {'requests': 0, 'bytes': 0, 'seconds': 0.0, 'errors': 0}
+        self.calls: List[Dict] = []
+        self._logged_in: Optional[bool] = None
+        # 最近一次读取的列表页之后是否还有下一页（由 fetch_post_list 设置）
+        self.has_more_pages = False
+    
+    def list_posts(self) -> List[Dict[str, str]]:
+        """
+        读取帖子列表：post_list_url 为 RSS/Atom 订阅源时读取订阅源（条目附带 content，可用于预筛），
+        否则使用后端自身的列表接口
+        """
+        post_list_url = self.site.selectors.get('post_list_url')
+        if FeedParser.is_feed_url(post_list_url):
+            return self.fetch_feed(post_list_url)
+        return self.fetch_post_list()
+    
+    def iter_pages(self, max_pages: int) -> Iterator[List[Dict[str, str]]]:
+        """
+        逐页读取帖子列表（生成器，调用方停止迭代后不再请求后续页）
+        订阅源只有一页；其余后端在没有下一页或读满 max_pages 页时结束
+        """
+        post_list_url = self.site.selectors.get('post_list_url')
+        if FeedParser.is_feed_url(post_list_url):
+            yield self.fetch_feed(post_list_url)
+            return
+        
+        for page in range(max_pages):
+            posts = self.fetch_post_list(page)
+            if not posts:
+                return
+            yield posts
+            if not self.has_more_pages:
+                return
+    
+    @abstractmethod
+    def fetch_post_list(self, page: int = 0) -> List[Dict[str, str]]:
+        """
+        读取第 page 页（从 0 开始）帖子列表，并设置 has_more_pages
+        返回: [{'id', 'title', 'link'}]
+        """
+    
+    def fetch_feed(self, feed_url: str) -> List[Dict[str, str]]:
+        """流式读取订阅源，读到 feed_limit 条（默认 50）后停止下载"""
+        limit = int(self.site.selectors.get('feed_limit') or 50)
+        response = self.request('GET', feed_url, stream=True, headers={
+            'Accept': 'application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8'
+        })
+        try:
+            response.raw.decode_content = True
+            posts = FeedParser.parse(response.raw, self.site.base_url, limit=limit)
+            self.stats['bytes'] += response.raw.tell()
+        except ValueError as e:
+            raise FetchError(str(e))
+        finally:
+            # 提前停止时直接断开，不再下载剩余内容
+            response.close()
+        return posts
+    
+    @abstractmethod
+    def fetch_post_detail(self, post: Dict[str, str]) -> Dict[str, str]:
+        """
+        读取帖子详情
+        返回: {'title', 'content'}
+        """
+    
+    def check_login(self) -> bool:
+        """HTTP 会话是否处于登录状态（结果在本对象内缓存）"""
+        if self._logged_in is None:
+            try:
+                self._logged_in = self._check_login()
+            except FetchError as e:
+                logger.info(f"{self.name} 会话未登录: {e}")
+                self._logged_in = False
+        return self._logged_in
+    
+    def _check_login(self) -> bool:
+        return False
+    
+    def sign_in(self) -> Dict:
+        """
+        直接通过接口签到（supports_signin 为 True 的后端实现）
+        返回: {'signed': True} 或 {'already_signed': True}，失败时抛出 FetchError
+        """
+        raise FetchError(f'{self.name} 后端不支持接口签到')
+    
+    def post_reply(self, post: Dict[str, str], content: str) -> bool:
+        """
+        直接通过接口回复帖子（supports_posting 为 True 的后端实现）
+        返回: 是否成功（内容被站点拒绝时返回 False），登录失效等无法继续的情况抛出 FetchError
+        """
+        raise FetchError(f'{self.name} 后端不支持接口发帖')
+    
+    def load_cookies(self, cookies: List[Dict]):
+        """写入浏览器中的 Cookies（例如账号密码登录后），使 HTTP 请求沿用登录状态"""
+        load_cookies(self.session, cookies)
+    
+    def pop_stats(self) -> Dict:
+        """取出请求统计及每次调用的耗时，并清空记录"""
+        stats = dict(self.stats)
+        stats['backend'] = self.name
+        stats['seconds'] = round(stats['seconds'], 3)
+        stats['calls'] = self.calls
+        self.stats = {'requests': 0, 'bytes': 0, 'seconds': 0.0, 'errors': 0}
+        self.calls = []
+        return stats
+    
+    def url(self, path: str) -> str:
+        """相对路径补全为站点 URL"""
+        if path.startswith('http'):
+            return path
+        return self.base_url + '/' + path.lstrip('/')
+    
+    def request(self, method: str, path: str, raise_for_status: bool = True, **kwargs) -> requests.Response:
+        """发送请求并记录耗时和流量，状态码异常时抛出 FetchError（raise_for_status 为 False 时由调用方处理）"""
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        status = None
+        try:
+            response = self.session.request(method, self.url(path), **kwargs)
+            status = response.status_code
+        except requests.RequestException as e:
+            self.stats['errors'] += 1
+            raise FetchError(f'请求失败 {path}: {e}')
+        finally:
+            seconds = time.perf_counter() - start
+            self.stats['requests'] += 1
+            self.stats['seconds'] += seconds
+            self.calls.append({
+                'method': method,
+                'path': urlparse(self.url(path)).path,
+                'status': status,
+                'ms': round(seconds * 1000, 1)
+            })
+            get_metrics_registry().record(f'http.{self.name}', seconds, site=self.site.name)
+        
+        if not kwargs.get('stream'):
+            self.stats['bytes'] += len(response.content)
+        if raise_for_status and response.status_code >= 400:
+            self.stats['errors'] += 1
+            # 流式响应的正文未读取，不关闭的话连接不会归还连接池
+            response.close()
+            raise FetchError(f'请求失败 {path}: HTTP {response.status_code}')
+        return response
+    
+    def get_json(self, path: str, **kwargs) -> Dict:
+        headers = kwargs.pop('headers', {})
+        headers.setdefault('Accept', 'application/json')
+        response = self.request('GET', path, headers=headers, **kwargs)
+        try:
+            return response.json()
+        except ValueError:
+            raise FetchError(f'响应不是 JSON: {path}')
+    
+    @staticmethod
+    def _json(response) -> Dict:
+        """宽松解析响应体（错误响应等），不是 JSON 对象时返回空字典"""
+        try:
+            data = response.json()
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    
+    @staticmethod
+    def html_to_text(html: Optional[str]) -> str:
+        """与 PostParser 相同的文本提取方式"""
+        if not html:
+            return ""
+        return BeautifulSoup(html, 'html.parser').get_text(strip=True)
@@ -0,0 +1,146 @@
+"""
+Discourse 适配器
+读取使用 /latest.json 和 /t/{id}.json，回复使用 POST /posts.json
+"""
+import time
+import logging
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from .base import BaseFetcher, FetchError, PostAttemptedError
+
+logger = logging.getLogger(__name__)
+
+class DiscourseFetcher(BaseFetcher):
+    name = 'discourse'
+    supports_posting = True
+    
+    def __init__(self, site):
+        super().__init__(site)
+        self.csrf_token: Optional[str] = None
+        # 被限流时最多等待的秒数，超过则放弃本次回复
+        self.max_rate_limit_wait = max(site.reply_interval_max or 0, 60)
+    
+    def list_path(self) -> str:
+        """帖子列表的 JSON 地址：post_list_url（如 /latest、/new、/c/xxx/5）加 .json"""
+        post_list_url = self.site.selectors.get('post_list_url') or '/latest'
+        parsed = urlparse(post_list_url)
+        if parsed.netloc and parsed.netloc != urlparse(self.base_url).netloc:
+            return '/latest.json'
+        path = parsed.path.rstrip('/') or '/latest'
+        if not path.endswith('.json'):
+            path += '.json'
+        return path
+    
+    def fetch_post_list(self, page: int = 0) -> List[Dict[str, str]]:
+        data = self.get_json(self.list_path(), params={'page': page} if page else None)
+        topic_list = data.get('topic_list', {})
+        topics = topic_list.get('topics')
+        if topics is None:
+            raise FetchError('响应中没有 topic_list')
+        # 还有下一页时响应中带有 more_topics_url
+        self.has_more_pages = bool(topic_list.get('more_topics_url'))
+        
+        posts = []
+        for topic in topics:
+            if not topic.get('id') or not topic.get('title'):
+                continue
+            posts.append({
+                'id': str(topic['id']),
+                'title': topic['title'].strip(),
+                'link': f"{self.base_url}/t/{topic.get('slug') or 'topic'}/{topic['id']}"
+            })
+        return posts
+    
+    def fetch_post_detail(self, post: Dict[str, str]) -> Dict[str, str]:
+        data = self.get_json(f"/t/{post['id']}.json")
+        stream = data.get('post_stream', {}).get('posts') or []
+        # 与页面中第一个正文元素一致：取主题的首帖
+        first = next((p for p in stream if p.get('post_number') == 1), stream[0] if stream else {})
+        return {
+            'title': (data.get('title') or '').strip(),
+            'content': self.html_to_text(first.get('cooked'))
+        }
+    
+    def _check_login(self) -> bool:
+        """/session/current.json 在未登录时返回 404"""
+        data = self.get_json('/session/current.json', headers={'X-Requested-With': 'XMLHttpRequest'})
+        return bool(data.get('current_user'))
+    
+    def get_csrf_token(self, refresh: bool = False) -> str:
+        """获取 CSRF 令牌，会话内只请求一次"""
+        if self.csrf_token and not refresh:
+            return self.csrf_token
+        data = self.get_json('/session/csrf.json', headers={'X-Requested-With': 'XMLHttpRequest'})
+        if not data.get('csrf'):
+            raise FetchError('未获取到 CSRF 令牌')
+        self.csrf_token = data['csrf']
+        return self.csrf_token
+    
+    def post_reply(self, post: Dict[str, str], content: str) -> bool:
+        """
+        发送前的失败（获取 CSRF 令牌失败、401/403 会话失效）抛出 FetchError，可以改用浏览器；
+        请求发出后的失败（超时、5xx、持续限流）抛出 PostAttemptedError
+        """
+        csrf_refreshed = False
+        rate_limited = 0
+        while True:
+            headers = {
+                'Accept': 'application/json',
+                'X-CSRF-Token': self.get_csrf_token(),
+                'X-Requested-With': 'XMLHttpRequest',
+                'Origin': self.base_url,
+                'Referer': post.get('link') or self.base_url
+            }
+            try:
+                response = self.request(
+                    'POST',
+                    '/posts.json',
+                    raise_for_status=False,
+                    data={'raw': content, 'topic_id': post['id']},
+                    headers=headers
+                )
+            except FetchError as e:
+                # 超时或连接中断时无法确定回复是否已经发出
+                raise PostAttemptedError(str(e))
+            
+            if response.status_code == 200:
+                logger.info(f"回复已发送: topic={post['id']}, post={self._json(response).get('id')}")
+                return True
+            
+            if response.status_code == 403 and 'BAD CSRF' in response.text and not csrf_refreshed:
+                # 令牌过期，刷新一次后重试
+                self.get_csrf_token(refresh=True)
+                csrf_refreshed = True
+                continue
+            
+            if response.status_code == 429 and rate_limited < 2:
+                wait = self._retry_after(response)
+                if wait > self.max_rate_limit_wait:
+                    logger.warning(f"回复被限流，需等待 {wait:.0f} 秒，超过上限，放弃本次回复")
+                    return False
+                rate_limited += 1
+                logger.warning(f"回复被限流，{wait:.0f} 秒后重试")
+                time.sleep(wait)
+                continue
+            
+            if response.status_code == 422:
+                # 内容不符合站点要求（过短、重复等）
+                errors = self._json(response).get('errors') or [response.text[:200]]
+                logger.warning(f"回复被拒绝: {'; '.join(errors)}")
+                return False
+            
+            if response.status_code == 429:
+                raise PostAttemptedError('发送回复持续被限流: HTTP 429', uncertain=False)
+            if response.status_code >= 500 or response.status_code == 408:
+                raise PostAttemptedError(f'发送回复失败: HTTP {response.status_code}')
+            raise FetchError(f'发送回复失败: HTTP {response.status_code}')
+    
+    @staticmethod
+    def _retry_after(response) -> float:
+        """从 Retry-After 或响应体 extras.wait_seconds 读取等待时间"""
+        header = response.headers.get('Retry-After')
+        if header and header.isdigit():
+            return float(header)
+        wait_seconds = (DiscourseFetcher._json(response).get('extras') or {}).get('wait_seconds')
+        return float(wait_seconds) if wait_seconds else 10.0
@@ -0,0 +1,57 @@
+"""
+抓取后端选择
+按站点选择器中的 fetch_backend 或预设模板的 architecture 选择后端
+"""
+import json
+import logging
+from functools import lru_cache
+from typing import Dict, Optional, Type
+
+from backend.config import Config
+from backend.models.site import Site
+from .base import BaseFetcher
+from .discourse import DiscourseFetcher
+from .flarum import FlarumFetcher
+from .html import HtmlFetcher
+from .feed import FeedFetcher
+from core.parsers.feed_parser import FeedParser
+
+logger = logging.getLogger(__name__)
+
+FETCHERS: Dict[str, Type[BaseFetcher]] = {
+    'discourse': DiscourseFetcher,
+    'flarum': FlarumFetcher,
+    'html': HtmlFetcher,
+    'feed': FeedFetcher,
+}
+
+@lru_cache(maxsize=None)
+def get_preset_architecture(preset_id: str) -> Optional[str]:
+    """读取预设模板的 architecture 字段"""
+    preset_file = Config.PRESET_DIR / f'{preset_id}.json'
+    try:
+        with open(preset_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get('architecture')
+    except (OSError, ValueError) as e:
+        logger.debug(f'读取预设模板失败 {preset_id}: {e}')
+        return None
+
+def create_fetcher(site: Site) -> Optional[BaseFetcher]:
+    """
+    为站点创建抓取后端
+    selectors.fetch_backend 可指定 discourse / flarum / html / browser，
+    未指定时按预设模板的架构选择；post_list_url 为 RSS/Atom 订阅源且没有其他后端时使用 feed；
+    返回 None 表示使用浏览器读取
+    """
+    backend = (site.selectors.get('fetch_backend') or '').lower()
+    if backend == 'browser':
+        return None
+    if not backend and site.preset_template:
+        backend = (get_preset_architecture(site.preset_template) or '').lower()
+    
+    fetcher_cls = FETCHERS.get(backend)
+    if not fetcher_cls and FeedParser.is_feed_url(site.selectors.get('post_list_url')):
+        fetcher_cls = FeedFetcher
+    if not fetcher_cls:
+        return None
+    return fetcher_cls(site)
@@ -0,0 +1,17 @@
+"""
+订阅源抓取后端
+只从 RSS/Atom 订阅源读取帖子列表，详情与发帖仍由浏览器完成
+"""
+from typing import Dict, List
+
+from .base import BaseFetcher, FetchError
+
+class FeedFetcher(BaseFetcher):
+    name = 'feed'
+    supports_detail = False
+    
+    def fetch_post_list(self, page: int = 0) -> List[Dict[str, str]]:
+        return self.fetch_feed(self.site.selectors.get('post_list_url'))
+    
+    def fetch_post_detail(self, post: Dict[str, str]) -> Dict[str, str]:
+        raise FetchError('订阅源不提供帖子详情')
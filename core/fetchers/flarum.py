@@ -0,0 +1,203 @@
+"""
+Flarum 适配器
+通过 JSON:API（/api）读取讨论、发帖和签到，使用站点 Cookie 与 X-CSRF-Token
+"""
+import re
+import json
+import time
+import logging
+from typing import Dict, List, Optional
+
+from .base import BaseFetcher, FetchError, PostAttemptedError
+
+logger = logging.getLogger(__name__)
+
+# /api/discussions 默认每页条数
+PAGE_SIZE = 20
+
+PAYLOAD_PATTERN = re.compile(
+    r'<script[^>]+id="flarum-json-payload"[^>]*>(.*?)</script>', re.S
+)
+
+class FlarumFetcher(BaseFetcher):
+    name = 'flarum'
+    supports_posting = True
+    supports_signin = True
+    
+    def __init__(self, site):
+        super().__init__(site)
+        self.csrf_token: Optional[str] = None
+        self.user_id: Optional[str] = None
+        self.max_rate_limit_wait = max(site.reply_interval_max or 0, 60)
+    
+    def fetch_post_list(self, page: int = 0) -> List[Dict[str, str]]:
+        # 与 /all 页面默认排序一致：按最后回复时间倒序
+        params = {'sort': '-lastPostedAt'}
+        if page:
+            params['page[offset]'] = page * PAGE_SIZE
+        data = self.get_json('/api/discussions', params=params)
+        discussions = data.get('data')
+        if discussions is None:
+            raise FetchError('响应中没有 data')
+        # JSON:API 在还有下一页时返回 links.next
+        self.has_more_pages = bool((data.get('links') or {}).get('next'))
+        
+        posts = []
+        for discussion in discussions:
+            attributes = discussion.get('attributes', {})
+            title = (attributes.get('title') or '').strip()
+            if not discussion.get('id') or not title:
+                continue
+            slug = attributes.get('slug')
+            path = f"/d/{discussion['id']}-{slug}" if slug else f"/d/{discussion['id']}"
+            posts.append({
+                'id': str(discussion['id']),
+                'title': title,
+                'link': self.base_url + path
+            })
+        return posts
+    
+    def fetch_post_detail(self, post: Dict[str, str]) -> Dict[str, str]:
+        data = self.get_json(f"/api/discussions/{post['id']}", params={'include': 'firstPost'})
+        discussion = data.get('data') or {}
+        first_post_id = (
+            discussion.get('relationships', {}).get('firstPost', {}).get('data') or {}
+        ).get('id')
+        
+        content_html = ''
+        for included in data.get('included', []):
+            if included.get('type') == 'posts' and included.get('id') == first_post_id:
+                content_html = included.get('attributes', {}).get('contentHtml') or ''
+                break
+        
+        return {
+            'title': (discussion.get('attributes', {}).get('title') or '').strip(),
+            'content': self.html_to_text(content_html)
+        }
+    
+    def _check_login(self) -> bool:
+        self.load_session()
+        return bool(self.user_id)
+    
+    def load_session(self):
+        """从首页的 flarum-json-payload 中读取当前用户 ID 和 CSRF 令牌"""
+        response = self.request('GET', '/')
+        match = PAYLOAD_PATTERN.search(response.text)
+        session = {}
+        if match:
+            try:
+                session = json.loads(match.group(1)).get('session') or {}
+            except ValueError:
+                logger.warning("解析 flarum-json-payload 失败")
+        
+        self.user_id = str(session['userId']) if session.get('userId') else None
+        self.csrf_token = session.get('csrfToken') or response.headers.get('X-CSRF-Token')
+        if not self.csrf_token:
+            raise FetchError('未获取到 CSRF 令牌')
+    
+    def api(self, method: str, path: str, body: Optional[Dict] = None):
+        """
+        发送写操作，带 CSRF 令牌；令牌失效（400/419 且提示 csrf）时刷新一次后重试，
+        被限流（429）时按 Retry-After 等待后重试
+        """
+        if not self.csrf_token:
+            self.load_session()
+        
+        csrf_refreshed = False
+        rate_limited = 0
+        while True:
+            try:
+                response = self.request(
+                    method,
+                    path,
+                    raise_for_status=False,
+                    data=json.dumps(body) if body is not None else None,
+                    headers={
+                        'Accept': 'application/vnd.api+json, application/json',
+                        'Content-Type': 'application/vnd.api+json',
+                        'X-CSRF-Token': self.csrf_token
+                    }
+                )
+            except FetchError as e:
+                # 写请求超时或连接中断时无法确定是否已经生效
+                raise PostAttemptedError(str(e))
+            # Flarum 在响应头中下发最新的令牌
+            self.csrf_token = response.headers.get('X-CSRF-Token') or self.csrf_token
+            
+            if response.status_code in (400, 419) and 'csrf' in response.text.lower() and not csrf_refreshed:
+                self.load_session()
+                csrf_refreshed = True
+                continue
+            
+            if response.status_code == 429 and rate_limited < 2:
+                header = response.headers.get('Retry-After', '')
+                wait = float(header) if header.isdigit() else 10.0
+                if wait > self.max_rate_limit_wait:
+                    raise PostAttemptedError(f'被限流，需等待 {wait:.0f} 秒', uncertain=False)
+                rate_limited += 1
+                logger.warning(f"请求被限流，{wait:.0f} 秒后重试")
+                time.sleep(wait)
+                continue
+            
+            return response
+    
+    def post_reply(self, post: Dict[str, str], content: str) -> bool:
+        response = self.api('POST', '/api/posts', {
+            'data': {
+                'type': 'posts',
+                'attributes': {'content': content},
+                'relationships': {
+                    'discussion': {'data': {'type': 'discussions', 'id': str(post['id'])}}
+                }
+            }
+        })
+        
+        if response.status_code in (200, 201):
+            logger.info(f"回复已发送: discussion={post['id']}")
+            return True
+        if response.status_code == 422:
+            # 内容不符合站点要求
+            errors = [e.get('detail', '') for e in self._errors(response)] or [response.text[:200]]
+            logger.warning(f"回复被拒绝: {'; '.join(errors)}")
+            return False
+        if response.status_code == 429:
+            logger.warning("回复被限流，放弃本次回复")
+            return False
+        if response.status_code >= 500 or response.status_code == 408:
+            raise PostAttemptedError(f'发送回复失败: HTTP {response.status_code}')
+        raise FetchError(f'发送回复失败: HTTP {response.status_code}')
+    
+    def sign_in(self) -> Dict:
+        """
+        调用签到扩展的接口
+        默认适配 ziven/flarum-checkin：PATCH /api/users/{user_id}，attributes 为 {"canCheckin": false}，
+        可通过选择器 checkin_method / checkin_path / checkin_attributes 覆盖
+        """
+        if not self.check_login():
+            raise FetchError('Flarum 会话未登录')
+        
+        selectors = self.site.selectors
+        path = (selectors.get('checkin_path') or '/api/users/{user_id}').format(user_id=self.user_id)
+        method = (selectors.get('checkin_method') or 'PATCH').upper()
+        attributes = selectors.get('checkin_attributes') or {'canCheckin': False}
+        
+        # 扩展在用户属性中标记当天是否还能签到
+        user = self.get_json(f'/api/users/{self.user_id}').get('data', {}).get('attributes', {})
+        if user.get('canCheckin') is False:
+            return {'already_signed': True}
+        
+        response = self.api(method, path, {
+            'data': {'type': 'users', 'id': self.user_id, 'attributes': attributes}
+        })
+        if response.status_code >= 400:
+            raise FetchError(f'签到失败: HTTP {response.status_code}')
+        
+        result = {'signed': True}
+        updated = (self._json(response).get('data') or {}).get('attributes', {})
+        if 'totalContinuousCheckIn' in updated:
+            result['continuous_days'] = updated['totalContinuousCheckIn']
+        return result
+    
+    @staticmethod
+    def _errors(response) -> List[Dict]:
+        return FlarumFetcher._json(response).get('errors') or []
@@ -0,0 +1,21 @@
+"""
+HTML 抓取后端
+适用于服务端渲染的论坛：用 HTTP 取页面，再用站点选择器解析
+"""
+from typing import Dict, List
+
+from core.parsers.post_parser import PostParser
+from .base import BaseFetcher, list_page_url
+
+class HtmlFetcher(BaseFetcher):
+    name = 'html'
+    
+    def fetch_post_list(self, page: int = 0) -> List[Dict[str, str]]:
+        response = self.request('GET', list_page_url(self.site, page))
+        # 配置了 page_param 时才能翻页
+        self.has_more_pages = bool(self.site.selectors.get('page_param'))
+        return PostParser.parse_post_list(response.text, self.site.selectors, self.site.base_url)
+    
+    def fetch_post_detail(self, post: Dict[str, str]) -> Dict[str, str]:
+        response = self.request('GET', post['link'])
+        return PostParser.parse_post_detail(response.text, self.site.selectors)
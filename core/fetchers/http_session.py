@@ -0,0 +1,111 @@
+"""
+HTTP 会话池
+按站点复用 requests.Session（连接池、Cookies、代理），跨多次运行保持 keep-alive 连接
+"""
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core.browser.cookie_manager import CookieManager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+class HttpSessionPool:
+    def __init__(self, pool_maxsize: int = 10):
+        """
+        Args:
+            pool_maxsize: 每个会话中每个主机保留的连接数
+        """
+        self.pool_maxsize = pool_maxsize
+        self._lock = threading.Lock()
+        # site_id -> (配置指纹, 会话)
+        self._sessions: Dict[int, Tuple[Tuple, requests.Session]] = {}
+        self.created = 0
+        self.reused = 0
+    
+    def get(self, site) -> requests.Session:
+        """获取站点的会话，站点的代理、UA 或 Cookie 变化时重新创建"""
+        fingerprint = (site.base_url, site.http_proxy, site.user_agent, site.cookie_string)
+        with self._lock:
+            entry = self._sessions.get(site.id)
+            if entry and entry[0] == fingerprint:
+                self.reused += 1
+                return entry[1]
+            if entry:
+                entry[1].close()
+            
+            session = self._create_session(site)
+            self._sessions[site.id] = (fingerprint, session)
+            self.created += 1
+            return session
+    
+    def _create_session(self, site) -> requests.Session:
+        session = requests.Session()
+        retry = Retry(
+            total=2,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD'])
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize, max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        
+        session.headers.update({
+            'User-Agent': site.user_agent or DEFAULT_USER_AGENT,
+            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8'
+        })
+        if site.http_proxy:
+            session.proxies.update({'http': site.http_proxy, 'https': site.http_proxy})
+        
+        domain = urlparse(site.base_url).hostname
+        load_cookies(session, CookieManager.parse_cookie_string(site.cookie_string), domain)
+        logger.info(f'创建 HTTP 会话: {site.name}')
+        return session
+    
+    def get_stats(self) -> Dict:
+        return {
+            'sessions': len(self._sessions),
+            'created': self.created,
+            'reused': self.reused
+        }
+    
+    def close_all(self):
+        with self._lock:
+            for _, session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+def load_cookies(session: requests.Session, cookies: List[Dict], domain: Optional[str] = None):
+    """
+    将 Cookie 列表（CookieManager 或浏览器 get_cookies 的格式）写入会话
+    """
+    for cookie in cookies:
+        if not cookie.get('name'):
+            continue
+        session.cookies.set(
+            cookie['name'],
+            cookie.get('value', ''),
+            domain=cookie.get('domain') or domain,
+            path=cookie.get('path') or '/'
+        )
+
+
+_pool: Optional[HttpSessionPool] = None
+_pool_lock = threading.Lock()
+
+def get_http_session_pool() -> HttpSessionPool:
+    """获取全局 HTTP 会话池"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HttpSessionPool()
+        return _pool
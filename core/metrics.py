@@ -0,0 +1,85 @@
+"""
+进程内指标
+记录浏览器启动、导航等阶段的耗时，按站点统计 p50/p95
+"""
+import time
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, List, Optional, Tuple
+
+class MetricsRegistry:
+    """线程安全的耗时样本库，每个（站点, 阶段）保留最近 max_samples 个样本"""
+    
+    def __init__(self, max_samples: int = 500):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, str], Deque[float]] = defaultdict(lambda: deque(maxlen=self.max_samples))
+    
+    def record(self, name: str, seconds: float, site: Optional[str] = None):
+        """记录一个耗时样本"""
+        with self._lock:
+            self._samples[(site or '_', name)].append(seconds)
+    
+    @contextmanager
+    def span(self, name: str, site: Optional[str] = None):
+        """记录代码块的耗时（异常时同样记录）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, site=site)
+    
+    def summary(self, site: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        按阶段汇总耗时
+        
+        Args:
+            site: 只汇总指定站点，None 表示汇总所有站点
+        
+        Returns:
+            {阶段: {count, p50, p95, max}}，单位秒
+        """
+        merged: Dict[str, List[float]] = defaultdict(list)
+        with self._lock:
+            for (sample_site, name), samples in self._samples.items():
+                if site is None or sample_site == site:
+                    merged[name].extend(samples)
+        
+        return {name: self._describe(values) for name, values in sorted(merged.items())}
+    
+    def sites(self) -> List[str]:
+        """有样本的站点列表"""
+        with self._lock:
+            return sorted({site for site, _ in self._samples if site != '_'})
+    
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+    
+    @staticmethod
+    def _describe(values: List[float]) -> Dict:
+        ordered = sorted(values)
+        return {
+            'count': len(ordered),
+            'p50': round(percentile(ordered, 50), 3),
+            'p95': round(percentile(ordered, 95), 3),
+            'max': round(ordered[-1], 3)
+        }
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """已排序样本的百分位数（线性插值）"""
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+_registry = MetricsRegistry()
+
+def get_metrics_registry() -> MetricsRegistry:
+    """获取全局指标库"""
+    return _registry
@@ -2,5 +2,7 @@
 解析器模块
 """
 from .post_parser import PostParser
+from .dom_extractor import DomExtractor
+from .feed_parser import FeedParser
 
-__all__ = ['PostParser']
+__all__ = ['PostParser', 'DomExtractor', 'FeedParser']
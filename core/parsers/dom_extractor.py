@@ -0,0 +1,116 @@
+"""
+页面内结构化提取
+在浏览器中直接执行站点选择器，只传回精简的 JSON，避免传输整页 page_source
+输出格式与 PostParser.parse_post_list / parse_post_detail 一致
+"""
+from typing import List, Dict, Optional
+import logging
+
+from .post_parser import PostParser
+
+logger = logging.getLogger(__name__)
+
+# 与 BeautifulSoup get_text(strip=True) 一致：逐个文本节点去除首尾空白后直接拼接，
+# 忽略 script/style/template 中的文本
+TEXT_OF_JS = '''
+    function textOf(el) {
+        if (!el) return '';
+        var parts = [];
+        var walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+        var node;
+        while ((node = walker.nextNode())) {
+            var skipped = node.parentElement && node.parentElement.closest('script, style, template');
+            if (skipped && (skipped === el || el.contains(skipped))) continue;
+            var text = node.nodeValue.trim();
+            if (text) parts.push(text);
+        }
+        return parts.join('');
+    }
+'''
+
+POST_LIST_JS = TEXT_OF_JS + '''
+    var itemSel = arguments[0], titleSel = arguments[1], linkSel = arguments[2];
+    var items = [];
+    document.querySelectorAll(itemSel).forEach(function (el) {
+        var titleEl = el.querySelector(titleSel);
+        var linkEl = el.querySelector(linkSel);
+        items.push({
+            title: textOf(titleEl),
+            href: linkEl ? (linkEl.getAttribute('href') || '') : '',
+            data_id: el.getAttribute('data-id'),
+            id: el.getAttribute('id')
+        });
+    });
+    return items;
+'''
+
+POST_DETAIL_JS = TEXT_OF_JS + '''
+    return {
+        title: textOf(document.querySelector(arguments[0])),
+        content: textOf(document.querySelector(arguments[1]))
+    };
+'''
+
+class DomExtractor:
+    @staticmethod
+    def extract_post_list(driver, selectors: Dict[str, str], base_url: str) -> Optional[List[Dict[str, str]]]:
+        """
+        在页面内提取帖子列表
+        返回帖子列表，脚本执行失败时返回 None（调用方可退回 page_source 解析）
+        """
+        post_item_selector = selectors.get('post_item', 'li[data-id]')
+        title_selector = selectors.get('post_title', '.DiscussionListItem-title')
+        link_selector = selectors.get('post_link', '.DiscussionListItem-main a')
+        
+        try:
+            items = driver.execute_script(POST_LIST_JS, post_item_selector, title_selector, link_selector)
+        except Exception as e:
+            logger.warning(f"页面内提取帖子列表失败: {e}")
+            return None
+        
+        posts = []
+        for item in items or []:
+            try:
+                title = item.get('title') or ""
+                
+                link = item.get('href') or ""
+                if link and not link.startswith('http'):
+                    link = base_url.rstrip('/') + '/' + link.lstrip('/')
+                
+                # 与 PostParser 相同的 ID 提取规则，元素属性以字典形式传入
+                attrs = {'data-id': item.get('data_id'), 'id': item.get('id')}
+                post_id = PostParser.extract_post_id(link, attrs)
+                
+                if title and link and post_id:
+                    posts.append({
+                        'id': post_id,
+                        'title': title,
+                        'link': link
+                    })
+            
+            except Exception as e:
+                logger.warning(f"解析帖子项失败: {e}")
+                continue
+        
+        logger.info(f"页面内提取到 {len(posts)} 个帖子")
+        return posts
+    
+    @staticmethod
+    def extract_post_detail(driver, selectors: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """
+        在页面内提取帖子详情
+        返回帖子详细信息，脚本执行失败时返回 None
+        """
+        title_selector = selectors.get('detail_title', '.DiscussionHero-title')
+        content_selector = selectors.get('detail_content', '.Post-body')
+        
+        try:
+            detail = driver.execute_script(POST_DETAIL_JS, title_selector, content_selector)
+        except Exception as e:
+            logger.warning(f"页面内提取帖子详情失败: {e}")
+            return None
+        
+        return {
+            'title': detail.get('title') or "",
+            'content': detail.get('content') or ""
+        }
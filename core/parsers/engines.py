@@ -0,0 +1,166 @@
+"""
+解析引擎
+PostParser 的可选后端：lxml（需要 cssselect）或 selectolax（已安装时）
+CSS 选择器只编译一次并缓存；文本提取规则与 BeautifulSoup get_text(strip=True) 一致
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+except ImportError:  # 未安装 lxml 或 cssselect
+    CSSSelector = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:  # 未安装 selectolax，或 1.0 以后版本的旧后端
+        HTMLParser = None
+
+# get_text 不包含这些元素中的文本
+SKIP_TAGS = ('script', 'style', 'template')
+
+# (标题, href, {'data-id', 'id'})
+ListItem = Tuple[str, str, Dict[str, Optional[str]]]
+
+
+class LxmlEngine:
+    name = 'lxml'
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def compile(selector: str):
+        """编译 CSS 选择器（按选择器字符串缓存，同一站点/预设的选择器只编译一次）"""
+        return CSSSelector(selector)
+    
+    @staticmethod
+    def parse(html: str):
+        if not html or not html.strip():
+            return None
+        # 带编码声明的字符串 lxml 不接受，转为字节
+        if html.lstrip().startswith('<?xml'):
+            html = html.encode('utf-8')
+        try:
+            return lxml.html.document_fromstring(html)
+        except (etree.ParserError, ValueError) as e:
+            logger.warning(f"lxml 解析失败: {e}")
+            return None
+    
+    @staticmethod
+    def select_one(root, selector: str):
+        matches = LxmlEngine.compile(selector)(root)
+        return matches[0] if matches else None
+    
+    @staticmethod
+    def text(element) -> str:
+        if element is None:
+            return ""
+        parts = []
+        LxmlEngine._collect_text(element, parts)
+        return ''.join(parts)
+    
+    @staticmethod
+    def _collect_text(element, parts: List[str]):
+        # 注释、处理指令的 tag 不是字符串，跳过其内容但保留 tail
+        if isinstance(element.tag, str) and element.tag.lower() not in SKIP_TAGS:
+            if element.text:
+                text = element.text.strip()
+                if text:
+                    parts.append(text)
+            for child in element:
+                LxmlEngine._collect_text(child, parts)
+                if child.tail:
+                    tail = child.tail.strip()
+                    if tail:
+                        parts.append(tail)
+    
+    @staticmethod
+    def select_list(html: str, item_selector: str, title_selector: str, link_selector: str) -> List[ListItem]:
+        root = LxmlEngine.parse(html)
+        if root is None:
+            return []
+        title_sel = LxmlEngine.compile(title_selector)
+        link_sel = LxmlEngine.compile(link_selector)
+        items = []
+        for element in LxmlEngine.compile(item_selector)(root):
+            titles = title_sel(element)
+            links = link_sel(element)
+            items.append((
+                LxmlEngine.text(titles[0]) if titles else "",
+                links[0].get('href', '') if links else "",
+                {'data-id': element.get('data-id'), 'id': element.get('id')}
+            ))
+        return items
+    
+    @staticmethod
+    def select_detail(html: str, title_selector: str, content_selector: str) -> Tuple[str, str]:
+        root = LxmlEngine.parse(html)
+        if root is None:
+            return "", ""
+        return (
+            LxmlEngine.text(LxmlEngine.select_one(root, title_selector)),
+            LxmlEngine.text(LxmlEngine.select_one(root, content_selector))
+        )
+
+
+class SelectolaxEngine:
+    name = 'selectolax'
+    
+    @staticmethod
+    def parse(html: str):
+        tree = HTMLParser(html or '')
+        # get_text 忽略的元素直接从树中移除
+        tree.strip_tags(list(SKIP_TAGS))
+        return tree
+    
+    @staticmethod
+    def text(node) -> str:
+        if node is None:
+            return ""
+        return node.text(deep=True, separator='', strip=True)
+    
+    @staticmethod
+    def select_list(html: str, item_selector: str, title_selector: str, link_selector: str) -> List[ListItem]:
+        tree = SelectolaxEngine.parse(html)
+        items = []
+        for node in tree.css(item_selector):
+            link_node = node.css_first(link_selector)
+            attrs = node.attributes
+            items.append((
+                SelectolaxEngine.text(node.css_first(title_selector)),
+                (link_node.attributes.get('href') or '') if link_node else "",
+                {'data-id': attrs.get('data-id'), 'id': attrs.get('id')}
+            ))
+        return items
+    
+    @staticmethod
+    def select_detail(html: str, title_selector: str, content_selector: str) -> Tuple[str, str]:
+        tree = SelectolaxEngine.parse(html)
+        return (
+            SelectolaxEngine.text(tree.css_first(title_selector)),
+            SelectolaxEngine.text(tree.css_first(content_selector))
+        )
+
+
+def get_engine(name: Optional[str] = None):
+    """
+    获取解析引擎
+    name 为 lxml / selectolax / auto（优先 selectolax，其次 lxml），
+    为空时读取环境变量 PARSER_ENGINE；bs4 或引擎不可用时返回 None（使用 BeautifulSoup）
+    """
+    name = (name or os.getenv('PARSER_ENGINE', 'bs4')).lower()
+    if name in ('selectolax', 'auto') and HTMLParser is not None:
+        return SelectolaxEngine
+    if name in ('lxml', 'auto', 'selectolax') and CSSSelector is not None:
+        return LxmlEngine
+    if name != 'bs4':
+        logger.debug(f"解析引擎 {name} 不可用，使用 BeautifulSoup")
+    return None
@@ -0,0 +1,119 @@
+"""
+订阅源解析器
+流式解析 RSS/Atom，边读边解析，取够条目后立即停止，不构建完整的 DOM
+"""
+from typing import List, Dict, Optional
+from urllib.parse import urlparse
+import xml.etree.ElementTree as ET
+from bs4 import BeautifulSoup
+import logging
+
+from .post_parser import PostParser
+
+logger = logging.getLogger(__name__)
+
+FEED_SUFFIXES = ('.rss', '.xml', '.atom')
+
+class FeedParser:
+    @staticmethod
+    def is_feed_url(url: Optional[str]) -> bool:
+        """URL 是否指向 RSS/Atom 订阅源"""
+        if not url:
+            return False
+        path = urlparse(url).path.lower().rstrip('/')
+        return path.endswith(FEED_SUFFIXES) or path.endswith(('/feed', '/rss'))
+    
+    @staticmethod
+    def parse(stream, base_url: str, limit: int = 50) -> List[Dict[str, str]]:
+        """
+        流式解析订阅源
+        
+        Args:
+            stream: 类文件对象（例如 requests 的 response.raw）
+            base_url: 站点地址，用于补全相对链接
+            limit: 最多读取的条目数，达到后停止读取
+        
+        Returns:
+            帖子列表，每项包含 id/title/link/content
+        
+        Raises:
+            ValueError: 一个条目都没有解析出来就遇到格式错误
+        """
+        posts = []
+        # 已开始但尚未结束的元素，用于找到条目的父元素并在处理后移除
+        stack = []
+        try:
+            for event, element in ET.iterparse(stream, events=('start', 'end')):
+                if event == 'start':
+                    stack.append(element)
+                    continue
+                
+                stack.pop()
+                if FeedParser._local_name(element.tag) not in ('item', 'entry'):
+                    continue
+                
+                post = FeedParser._entry_to_post(element, base_url)
+                if post:
+                    posts.append(post)
+                # 已处理的条目立即释放
+                element.clear()
+                if stack:
+                    stack[-1].remove(element)
+                if len(posts) >= limit:
+                    break
+        except ET.ParseError as e:
+            if not posts:
+                raise ValueError(f'订阅源解析失败: {e}')
+            logger.warning(f'订阅源解析中断，已读取 {len(posts)} 条: {e}')
+        
+        logger.info(f"订阅源解析到 {len(posts)} 个帖子")
+        return posts
+    
+    @staticmethod
+    def _local_name(tag) -> str:
+        """去掉命名空间，例如 {http://www.w3.org/2005/Atom}entry -> entry"""
+        return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+    
+    @staticmethod
+    def _entry_to_post(entry: ET.Element, base_url: str) -> Optional[Dict[str, str]]:
+        """将 RSS item 或 Atom entry 转为帖子字典"""
+        fields = {}
+        link = ''
+        for child in entry:
+            name = FeedParser._local_name(child.tag)
+            if name == 'link':
+                # Atom 使用 href 属性，RSS 使用文本
+                href = child.get('href')
+                if href and child.get('rel', 'alternate') == 'alternate' and not link:
+                    link = href
+                elif child.text and child.text.strip() and not link:
+                    link = child.text.strip()
+            elif name not in fields:
+                fields[name] = child.text or ''
+        
+        title = FeedParser._text(fields.get('title'))
+        if link and not link.startswith('http'):
+            link = base_url.rstrip('/') + '/' + link.lstrip('/')
+        
+        guid = fields.get('guid') or fields.get('id')
+        post_id = PostParser.extract_post_id(link) or PostParser.extract_post_id(guid or '', {'id': guid})
+        if not (title and link and post_id):
+            return None
+        
+        # RSS 优先 content:encoded，其次 description；Atom 优先 content，其次 summary
+        content_html = fields.get('encoded') or fields.get('content') or fields.get('description') or fields.get('summary')
+        return {
+            'id': post_id,
+            'title': title,
+            'link': link,
+            'content': FeedParser._text(content_html)
+        }
+    
+    @staticmethod
+    def _text(html: Optional[str]) -> str:
+        """与 PostParser 相同的文本提取方式"""
+        if not html:
+            return ""
+        if '<' not in html and '&' not in html:
+            return html.strip()
+        return BeautifulSoup(html, 'html.parser').get_text(strip=True)
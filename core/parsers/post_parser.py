@@ -3,26 +3,41 @@
 从页面中提取帖子信息
 """
 from typing import List, Dict, Optional
+import os
 import re
 from bs4 import BeautifulSoup
 import logging
 
+from .engines import get_engine
+from .prescan import narrow_list_html
+
 logger = logging.getLogger(__name__)
 
 class PostParser:
     @staticmethod
-    def parse_post_list(html: str, selectors: Dict[str, str], base_url: str) -> List[Dict[str, str]]:
+    def parse_post_list(html: str, selectors: Dict[str, str], base_url: str,
+                        engine: Optional[str] = None) -> List[Dict[str, str]]:
         """
         解析帖子列表页面
+        engine 为空时使用选择器中的 parser_engine 或环境变量 PARSER_ENGINE
+        配置了 list_container 或开启 partial_parse 时只解析帖子列表区域
         返回帖子列表
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        posts = []
+        if PostParser._partial_enabled(selectors):
+            html = narrow_list_html(html, selectors.get('list_container'))
         
         post_item_selector = selectors.get('post_item', 'li[data-id]')
         title_selector = selectors.get('post_title', '.DiscussionListItem-title')
         link_selector = selectors.get('post_link', '.DiscussionListItem-main a')
         
+        fast_engine = get_engine(engine or selectors.get('parser_engine'))
+        if fast_engine:
+            items = fast_engine.select_list(html, post_item_selector, title_selector, link_selector)
+            return PostParser._build_posts(items, base_url)
+        
+        soup = BeautifulSoup(html, 'html.parser')
+        posts = []
+        
         # 查找所有帖子项
         post_elements = soup.select(post_item_selector)
         
@@ -59,16 +74,57 @@ class PostParser:
         return posts
     
     @staticmethod
-    def parse_post_detail(html: str, selectors: Dict[str, str]) -> Dict[str, str]:
+    def _partial_enabled(selectors: Dict[str, str]) -> bool:
+        """是否局部解析（选择器 partial_parse，未配置时读取环境变量 PARSER_PARTIAL）"""
+        if selectors.get('list_container'):
+            return True
+        partial = selectors.get('partial_parse', os.getenv('PARSER_PARTIAL', 'false'))
+        return str(partial).lower() in ('true', '1', 'yes')
+    
+    @staticmethod
+    def _build_posts(items, base_url: str) -> List[Dict[str, str]]:
+        """将解析引擎返回的 (标题, href, 属性) 按与 BeautifulSoup 路径相同的规则组装为帖子"""
+        posts = []
+        for title, link, attrs in items:
+            try:
+                if link and not link.startswith('http'):
+                    link = base_url.rstrip('/') + '/' + link.lstrip('/')
+                
+                post_id = PostParser.extract_post_id(link, attrs)
+                
+                if title and link and post_id:
+                    posts.append({
+                        'id': post_id,
+                        'title': title,
+                        'link': link
+                    })
+            
+            except Exception as e:
+                logger.warning(f"解析帖子项失败: {e}")
+                continue
+        
+        logger.info(f"解析到 {len(posts)} 个帖子")
+        return posts
+    
+    @staticmethod
+    def parse_post_detail(html: str, selectors: Dict[str, str], engine: Optional[str] = None) -> Dict[str, str]:
         """
         解析帖子详情页面
         返回帖子详细信息
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        
         title_selector = selectors.get('detail_title', '.DiscussionHero-title')
         content_selector = selectors.get('detail_content', '.Post-body')
         
+        fast_engine = get_engine(engine or selectors.get('parser_engine'))
+        if fast_engine:
+            title, content = fast_engine.select_detail(html, title_selector, content_selector)
+            return {
+                'title': title,
+                'content': content
+            }
+        
+        soup = BeautifulSoup(html, 'html.parser')
+        
         # 提取标题
         title_elem = soup.select_one(title_selector)
         title = title_elem.get_text(strip=True) if title_elem else ""
@@ -0,0 +1,121 @@
+"""
+局部解析预扫描
+在建树之前用正则扫描原始 HTML：把注释、脚本和样式（含内联的 JSON 预加载数据）替换为空注释，
+并按站点的 list_container 选择器只截取帖子列表所在的区域，页头、侧栏等其余部分不再被解析
+"""
+from functools import lru_cache
+from typing import Optional
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 按出现顺序匹配，脚本中的 "<!--" 或注释中的 "<script>" 都不会被误判
+NOISE_PATTERN = re.compile(
+    r'<!--.*?-->|<(script|style)\b[^>]*>.*?</\1\s*>',
+    re.DOTALL | re.IGNORECASE
+)
+
+# 被去掉的内容以空注释占位：解析器仍在此处切分文本节点，
+# 否则 "Hello <!-- x --> world" 会被合并为一个文本节点，get_text(strip=True) 结果与完整解析不同
+NOISE_PLACEHOLDER = '<!---->'
+
+# 支持的容器选择器：tag、#id、.class、tag.class、tag#id，可附加一个 [attr] 或 [attr="value"]
+SIMPLE_SELECTOR_PATTERN = re.compile(
+    r'^(?P<tag>[a-zA-Z][\w-]*)?'
+    r'(?:#(?P<id>[\w-]+)|\.(?P<cls>[\w-]+))?'
+    r'(?:\[(?P<attr>[\w-]+)(?:=["\']?(?P<value>[^"\'\]]*)["\']?)?\])?$'
+)
+
+def strip_noise(html: str) -> str:
+    """把注释、script 和 style 元素替换为空注释（它们的文本本来就不会出现在解析结果中）"""
+    return NOISE_PATTERN.sub(NOISE_PLACEHOLDER, html)
+
+@lru_cache(maxsize=128)
+def compile_container(selector: str):
+    """
+    将容器选择器编译为匹配其起始标签的正则
+    返回 (起始标签正则, 用于快速定位候选位置的字面量)；不是简单选择器时返回 None
+    """
+    match = SIMPLE_SELECTOR_PATTERN.match(selector.strip())
+    if not match or not any(match.groupdict().values()):
+        logger.warning(f"list_container 只支持简单选择器，已忽略: {selector}")
+        return None
+    
+    tag = match.group('tag')
+    conditions = []
+    if match.group('id'):
+        conditions.append(r'(?=[^>]*\bid\s*=\s*["\']?' + re.escape(match.group('id')) + r'["\'\s>])')
+    if match.group('cls'):
+        # class 按空白分隔的单词匹配，.topic-list 不会匹配 topic-list-item
+        conditions.append(
+            r'(?=[^>]*\bclass\s*=\s*["\'](?:[^"\']*\s)?' + re.escape(match.group('cls')) + r'(?:\s[^"\']*)?["\'])'
+        )
+    if match.group('attr'):
+        attr = re.escape(match.group('attr'))
+        if match.group('value') is not None:
+            conditions.append(r'(?=[^>]*\s' + attr + r'\s*=\s*["\']?' + re.escape(match.group('value')) + r'["\'\s>])')
+        else:
+            conditions.append(r'(?=[^>]*\s' + attr + r'[\s=>])')
+    
+    tag_pattern = re.escape(tag) if tag else r'[a-zA-Z][\w-]*'
+    pattern = re.compile(r'<(' + tag_pattern + r')\b' + ''.join(conditions) + r'[^>]*>', re.IGNORECASE)
+    literal = match.group('id') or match.group('cls') or match.group('value') or match.group('attr')
+    return pattern, literal
+
+def cut_container(html: str, selector: str) -> Optional[str]:
+    """
+    截取第一个匹配 selector 的元素（含起止标签）
+    未找到或选择器不受支持时返回 None
+    """
+    compiled = compile_container(selector)
+    if not compiled:
+        return None
+    start_pattern, literal = compiled
+    
+    start = None
+    if literal:
+        # 先用 str.find 定位 id/class 字面量，再回退到所在标签的 "<" 校验，避免对每个标签执行前瞻
+        pos = html.find(literal)
+        while pos != -1:
+            tag_start = html.rfind('<', 0, pos)
+            candidate = start_pattern.match(html, tag_start) if tag_start != -1 else None
+            if candidate and candidate.end() > pos:
+                start = candidate
+                break
+            pos = html.find(literal, pos + 1)
+    else:
+        start = start_pattern.search(html)
+    if not start:
+        return None
+    
+    # 从起始标签开始统计同名标签的嵌套深度，找到对应的结束标签
+    tag = re.escape(start.group(1))
+    tags = re.compile(r'<(/?)' + tag + r'\b[^>]*?(/?)>', re.IGNORECASE)
+    depth = 0
+    for m in tags.finditer(html, start.start()):
+        if m.group(1):
+            depth -= 1
+        elif not m.group(2):
+            depth += 1
+        if depth == 0:
+            return html[start.start():m.end()]
+    
+    # 缺少结束标签（残缺的页面），保留到文档末尾
+    return html[start.start():]
+
+def narrow_list_html(html: str, container: Optional[str] = None) -> str:
+    """
+    局部解析前的预扫描：先去掉注释/脚本/样式，再截取帖子列表容器
+    找不到容器时返回去噪后的整页，保证结果与完整解析一致
+    """
+    if not html:
+        return html
+    
+    html = strip_noise(html)
+    if container:
+        region = cut_container(html, container)
+        if region is not None:
+            return region
+        logger.debug(f"未找到帖子列表容器 {container}，解析整页")
+    return html
@@ -0,0 +1,150 @@
+"""
+负缓存
+记录被 ContentAnalyzer 拒绝的帖子：内存中按站点维护布隆过滤器，SQLite 中保存带过期时间的记录。
+列表页上先查布隆过滤器，确定不在其中的帖子不访问数据库；可能命中的再批量查库确认（排除误判和已过期的记录）
+"""
+import os
+import math
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Set
+
+from backend.services.rejected_post_service import RejectedPostService
+
+logger = logging.getLogger(__name__)
+
+class BloomFilter:
+    """按预期容量和误判率确定位数组大小与哈希个数，使用双重哈希"""
+    
+    def __init__(self, capacity: int = 10000, error_rate: float = 0.01):
+        self.capacity = max(capacity, 1)
+        self.size = max(int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+    
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+    
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RejectionCache:
+    """
+    线程安全的负缓存
+    布隆过滤器无法删除元素，每隔 rebuild_interval 秒或元素数超过容量时从数据库重建（过期记录随之移除）
+    """
+    
+    def __init__(self, ttl_days: float = 7, rebuild_interval: float = 3600):
+        self.ttl_days = ttl_days
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.Lock()
+        self._filters: Dict[int, BloomFilter] = {}
+        self._built_at: Dict[int, float] = {}
+        self._stats: Dict[int, Dict[str, int]] = {}
+    
+    def _filter(self, site_id: int) -> BloomFilter:
+        """获取站点的布隆过滤器，需要时从数据库重建（调用方持有锁）"""
+        bloom = self._filters.get(site_id)
+        expired = time.monotonic() - self._built_at.get(site_id, 0) > self.rebuild_interval
+        if bloom is None or expired or bloom.count > bloom.capacity:
+            post_ids = RejectedPostService.get_active_ids(site_id)
+            bloom = BloomFilter(capacity=max(len(post_ids) * 2, 10000))
+            for post_id in post_ids:
+                bloom.add(post_id)
+            self._filters[site_id] = bloom
+            self._built_at[site_id] = time.monotonic()
+            logger.debug(f"站点 {site_id} 负缓存已重建: {len(post_ids)} 条")
+        return bloom
+    
+    def _site_stats(self, site_id: int) -> Dict[str, int]:
+        return self._stats.setdefault(site_id, {
+            'lookups': 0, 'hits': 0, 'bloom_negatives': 0, 'false_positives': 0, 'added': 0
+        })
+    
+    def filter_rejected(self, site_id: int, post_ids: Iterable[str]) -> Set[str]:
+        """返回 post_ids 中仍处于负缓存中的帖子ID"""
+        post_ids = [str(post_id) for post_id in post_ids]
+        if not post_ids:
+            return set()
+        
+        with self._lock:
+            bloom = self._filter(site_id)
+            candidates = [post_id for post_id in post_ids if post_id in bloom]
+        
+        rejected = set()
+        if candidates:
+            rejected = RejectedPostService.get_rejected_ids(site_id, candidates)
+        
+        with self._lock:
+            stats = self._site_stats(site_id)
+            stats['lookups'] += len(post_ids)
+            stats['bloom_negatives'] += len(post_ids) - len(candidates)
+            stats['hits'] += len(rejected)
+            stats['false_positives'] += len(candidates) - len(rejected)
+        return rejected
+    
+    def add(self, site_id: int, post_id: str, reason: str):
+        """记录被拒绝的帖子"""
+        RejectedPostService.add_rejected(site_id, post_id, reason, self.ttl_days)
+        with self._lock:
+            self._filter(site_id).add(str(post_id))
+            self._site_stats(site_id)['added'] += 1
+    
+    @staticmethod
+    def _with_hit_rate(stats: Dict[str, int]) -> Dict:
+        item = dict(stats)
+        item['hit_rate'] = round(stats['hits'] / stats['lookups'], 3) if stats['lookups'] else 0.0
+        return item
+    
+    def stats(self) -> Dict[int, Dict]:
+        """各站点自进程启动以来的查询次数、命中数与命中率"""
+        with self._lock:
+            return {site_id: self._with_hit_rate(stats) for site_id, stats in self._stats.items()}
+    
+    def snapshot(self, site_id: int) -> Dict[str, int]:
+        """站点当前的累计计数，与 stats_since 配合得到一次运行内的统计"""
+        with self._lock:
+            return dict(self._site_stats(site_id))
+    
+    def stats_since(self, site_id: int, snapshot: Dict[str, int]) -> Optional[Dict]:
+        """自 snapshot 以来的计数与命中率，期间没有查询和新增时返回 None"""
+        with self._lock:
+            current = self._site_stats(site_id)
+            delta = {key: current[key] - snapshot.get(key, 0) for key in current}
+        if not delta['lookups'] and not delta['added']:
+            return None
+        return self._with_hit_rate(delta)
+    
+    def purge_expired(self) -> int:
+        """删除数据库中的过期记录，并在下次查询时重建布隆过滤器"""
+        removed = RejectedPostService.purge_expired()
+        with self._lock:
+            self._built_at.clear()
+        if removed:
+            logger.info(f"负缓存清理过期记录 {removed} 条")
+        return removed
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_rejection_cache() -> RejectionCache:
+    """获取全局负缓存，过期天数由 REJECTION_CACHE_TTL_DAYS 配置（默认 7）"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RejectionCache(ttl_days=float(os.getenv('REJECTION_CACHE_TTL_DAYS', '7')))
+        return _cache
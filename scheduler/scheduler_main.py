@@ -16,6 +16,13 @@ from datetime import datetime
 from backend.database.db import init_db, get_db
 from backend.services.site_service import SiteService
 from scheduler.task_runner import TaskRunner
+from core.browser.driver_pool import get_driver_pool
+from core.browser.browser_manager import BrowserManager
+from core.browser.shared_browser import close_shared_browsers
+from core.metrics import get_metrics_registry
+from core.rejection_cache import get_rejection_cache
+from core.ai.client_registry import get_llm_client_registry
+from core.ai.llm_engine import get_llm_engine
 
 # 确保日志目录存在
 log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
@@ -71,6 +78,45 @@ class ForumBotScheduler:
             
             self.load_site_jobs()
             
+            # 定期清理驱动池中空闲过久的浏览器
+            pool = get_driver_pool()
+            if pool:
+                self.scheduler.add_job(
+                    func=pool.evict_idle,
+                    trigger='interval',
+                    minutes=5,
+                    id='driver_pool_evict',
+                    name='驱动池空闲清理',
+                    replace_existing=True
+                )
+                # 调度器启动后立即在后台预热，首次运行的站点不必冷启动浏览器
+                self.scheduler.add_job(
+                    func=self.prewarm_driver_pool,
+                    id='driver_pool_prewarm',
+                    name='驱动池预热',
+                    replace_existing=True
+                )
+            
+            # 定期输出阶段耗时指标，便于跟踪启动耗时的变化
+            self.scheduler.add_job(
+                func=self.log_metrics,
+                trigger='interval',
+                hours=1,
+                id='metrics_report',
+                name='阶段耗时统计',
+                replace_existing=True
+            )
+            
+            # 每天清理负缓存中的过期记录
+            self.scheduler.add_job(
+                func=get_rejection_cache().purge_expired,
+                trigger='interval',
+                hours=24,
+                id='rejection_cache_purge',
+                name='负缓存过期清理',
+                replace_existing=True
+            )
+            
             logger.info("调度器初始化完成")
             
         except Exception as e:
@@ -94,6 +140,27 @@ class ForumBotScheduler:
         except Exception as e:
             logger.error(f"加载站点任务失败: {e}", exc_info=True)
     
+    def prewarm_driver_pool(self):
+        """按活跃站点使用的 (代理, UA, 无头模式) 分组预先启动浏览器，每组数量为 DRIVER_POOL_SIZE"""
+        pool = get_driver_pool()
+        if not pool:
+            return
+        
+        keys = set()
+        for site in SiteService.get_all_active_sites():
+            # 持久化配置的站点不使用驱动池；开启共享浏览器时各站点优先使用共享进程中的上下文
+            if site.selectors.get('persistent_profile') or int(os.getenv('SHARED_BROWSER_CONTEXTS', '0')) > 0:
+                continue
+            keys.add(pool.make_key(True, site.user_agent, site.http_proxy))
+        
+        for proxy, user_agent, headless in keys:
+            manager = BrowserManager(headless=headless, user_agent=user_agent or None, proxy=proxy or None)
+            try:
+                pool.prewarm(pool.max_idle_per_key, headless, user_agent or None, proxy or None,
+                             factory=manager._create_driver)
+            except Exception as e:
+                logger.warning(f"驱动池预热失败 (proxy={proxy or '无'}): {e}")
+    
     def add_site_job(self, site):
         """添加站点任务"""
         try:
@@ -166,10 +233,51 @@ class ForumBotScheduler:
             
             if results:
                 self.task_runner.send_task_report(results)
+            
+            pool = get_driver_pool()
+            if pool:
+                logger.info(f"驱动池统计: {pool.get_stats()}")
+            self.log_metrics()
             logger.info("所有站点任务执行完成")
         except Exception as e:
             logger.error(f"执行所有站点任务失败: {e}", exc_info=True)
     
+    def get_metrics(self, site_name: str = None) -> dict:
+        """
+        查询阶段耗时指标
+        site_name 为空时返回全部站点合计以及每个站点的 p50/p95
+        """
+        registry = get_metrics_registry()
+        if site_name:
+            return registry.summary(site=site_name)
+        return {
+            'all': registry.summary(),
+            'sites': {name: registry.summary(site=name) for name in registry.sites()}
+        }
+    
+    def log_metrics(self):
+        """输出各阶段耗时的 p50/p95、各站点负缓存的命中率、LLM 客户端连接池状态以及请求调度统计"""
+        for phase, stats in get_metrics_registry().summary().items():
+            logger.info(
+                f"阶段耗时 {phase}: p50={stats['p50']:.2f}s p95={stats['p95']:.2f}s "
+                f"max={stats['max']:.2f}s (n={stats['count']})"
+            )
+        for site_id, stats in get_rejection_cache().stats().items():
+            logger.info(
+                f"负缓存 site_id={site_id}: 命中率={stats['hit_rate']:.1%} "
+                f"(命中 {stats['hits']}/{stats['lookups']}，布隆误判 {stats['false_positives']}，新增 {stats['added']})"
+            )
+        llm_stats = get_llm_client_registry().get_stats()
+        if llm_stats['clients']:
+            logger.info(f"LLM 客户端: {llm_stats}")
+        engine_stats = get_llm_engine().get_stats()
+        if engine_stats['requests']:
+            logger.info(
+                f"LLM 调度: 请求 {engine_stats['requests']} 次（成功 {engine_stats['succeeded']}，失败 {engine_stats['failed']}，"
+                f"重试 {engine_stats['retries']}，限流 {engine_stats['rate_limited']}），"
+                f"平均排队 {engine_stats['avg_queue_wait']:.2f}s，平均耗时 {engine_stats['avg_latency']:.2f}s"
+            )
+    
     def start(self):
         """启动调度器"""
         try:
@@ -177,6 +285,11 @@ class ForumBotScheduler:
             self.scheduler.start()
         except (KeyboardInterrupt, SystemExit):
             logger.info("调度器已停止")
+            pool = get_driver_pool()
+            if pool:
+                pool.close_all()
+            close_shared_browsers()
+            get_llm_client_registry().close_all()
         except Exception as e:
             logger.error(f"调度器启动失败: {e}", exc_info=True)
             raise
@@ -201,6 +314,12 @@ def main():
                     scheduler.task_runner.send_task_report([result])
             else:
                 scheduler.execute_all_sites()
+            
+            pool = get_driver_pool()
+            if pool:
+                pool.close_all()
+            close_shared_browsers()
+            get_llm_client_registry().close_all()
         else:
             logger.info("运行模式: 定时调度")
             scheduler.start()
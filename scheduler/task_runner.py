@@ -3,13 +3,14 @@
 执行具体的站点任务
 """
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 
 # 修复导入路径
 from backend.models.site import Site
 from core.executors.signin_executor import SignInExecutor
 from core.executors.reply_executor import ReplyExecutor
+from core.executors.site_session import SiteSession
 from core.ai.reply_generator import ReplyGenerator
 from backend.services.task_service import TaskService
 from backend.services.notification_service import NotificationService
@@ -39,15 +40,18 @@ class TaskRunner:
         
         start_time = time.time()
         
+        # 整个站点运行共享一个浏览器会话，只登录一次
+        session = SiteSession(site)
+        
         try:
             # 执行签到任务
             if site.enable_signin:
-                signin_result = self._run_signin(site)
+                signin_result = self._run_signin(site, session)
                 result['signin'] = signin_result
             
             # 执行回复任务
             if site.enable_reply:
-                reply_result = self._run_reply(site)
+                reply_result = self._run_reply(site, session)
                 result['reply'] = reply_result
             
             # 更新站点最后运行时间
@@ -62,19 +66,25 @@ class TaskRunner:
             result['message'] = f'任务执行异常: {str(e)}'
         
         finally:
+            session.close()
             duration = time.time() - start_time
             result['duration'] = duration
             logger.info(f"站点任务执行完成: {site.name}, 耗时: {duration:.2f}秒")
         
         return result
     
-    def _run_signin(self, site: Site) -> Dict[str, Any]:
+    def _run_signin(self, site: Site, session: Optional[SiteSession] = None) -> Dict[str, Any]:
         """执行签到任务"""
         logger.info(f"执行签到任务: {site.name}")
         start_time = time.time()
         
-        executor = SignInExecutor(site)
-        success, message, details = executor.execute()
+        executor = SignInExecutor(site, session)
+        if session:
+            with session.stage('signin'):
+                success, message, details = executor.execute()
+            details['stages'] = session.pop_stage_timings()
+        else:
+            success, message, details = executor.execute()
         duration = time.time() - start_time
         
         # 记录任务日志
@@ -94,7 +104,7 @@ class TaskRunner:
             'duration': duration
         }
     
-    def _run_reply(self, site: Site) -> Dict[str, Any]:
+    def _run_reply(self, site: Site, session: Optional[SiteSession] = None) -> Dict[str, Any]:
         """执行回复任务"""
         logger.info(f"执行回复任务: {site.name}")
         start_time = time.time()
@@ -118,8 +128,13 @@ class TaskRunner:
             max_tokens=ai_config.get('max_tokens', 100)
         )
         
-        executor = ReplyExecutor(site, ai_generator)
-        success, message, details = executor.execute()
+        executor = ReplyExecutor(site, ai_generator, session)
+        if session:
+            with session.stage('reply'):
+                success, message, details = executor.execute()
+            details['stages'] = session.pop_stage_timings()
+        else:
+            success, message, details = executor.execute()
         duration = time.time() - start_time
         
         # 记录任务日志
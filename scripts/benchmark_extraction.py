@@ -0,0 +1,128 @@
+"""
+提取方式基准测试
+对比 page_source + BeautifulSoup 与页面内提取（DomExtractor）的传输字节数和耗时，并校验两者结果一致
+
+用法（在项目根目录下）:
+    python scripts/benchmark_extraction.py --preset presets/linuxdo.json
+    python scripts/benchmark_extraction.py --site-id 1 --rounds 5 --detail-url https://linux.do/t/topic/1
+"""
+import sys
+import os
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.browser.browser_manager import BrowserManager
+from core.parsers.post_parser import PostParser
+from core.parsers.dom_extractor import DomExtractor
+
+def load_target(args):
+    """返回 (base_url, selectors)"""
+    if args.preset:
+        with open(args.preset, 'r', encoding='utf-8') as f:
+            preset = json.load(f)
+        return preset['base_url'], preset['selectors']
+
+    from backend.services.site_service import SiteService
+    site = SiteService.get_site_by_id(args.site_id)
+    if not site:
+        raise SystemExit(f'站点不存在: {args.site_id}')
+    return site.base_url, site.selectors
+
+class RecordingDriver:
+    """包装 WebDriver，记录最近一次 execute_script 原始返回值序列化后的字节数（即实际经 WebDriver 协议传回的数据）"""
+
+    def __init__(self, driver):
+        self._driver = driver
+        self.last_bytes = 0
+
+    def execute_script(self, script, *args):
+        result = self._driver.execute_script(script, *args)
+        self.last_bytes = len(json.dumps(result, ensure_ascii=False).encode('utf-8'))
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+def measure(rounds, func):
+    """执行 rounds 次，返回 (最后一次结果, 平均耗时秒, 传输字节数)"""
+    total = 0.0
+    result, size = None, 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result, size = func()
+        total += time.perf_counter() - start
+    return result, total / rounds, size
+
+def report(name, page_source_stats, dom_stats):
+    ps_result, ps_time, ps_bytes = page_source_stats
+    dom_result, dom_time, dom_bytes = dom_stats
+    print(f'\n[{name}]')
+    print(f'  page_source: {ps_bytes / 1024:10.1f} KB  {ps_time * 1000:8.1f} ms')
+    print(f'  dom        : {dom_bytes / 1024:10.1f} KB  {dom_time * 1000:8.1f} ms')
+    if ps_bytes:
+        print(f'  传输减少 {(1 - dom_bytes / ps_bytes) * 100:.1f}%，耗时减少 {(1 - dom_time / ps_time) * 100:.1f}%')
+    print(f'  结果一致: {"是" if ps_result == dom_result else "否"}')
+    return ps_result == dom_result
+
+def main():
+    parser = argparse.ArgumentParser(description='对比 page_source 解析与页面内提取')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--preset', help='预设 JSON 文件路径')
+    group.add_argument('--site-id', type=int, help='数据库中的站点ID')
+    parser.add_argument('--rounds', type=int, default=3, help='每种方式重复次数')
+    parser.add_argument('--detail-url', help='同时测试的帖子详情页 URL')
+    args = parser.parse_args()
+
+    base_url, selectors = load_target(args)
+    list_url = selectors.get('post_list_url', '/all')
+    if not list_url.startswith('http'):
+        list_url = base_url.rstrip('/') + '/' + list_url.lstrip('/')
+
+    browser = BrowserManager(headless=True)
+    try:
+        driver = browser.get_driver()
+        all_match = True
+
+        browser.navigate_to(list_url, wait_time=5)
+        recorder = RecordingDriver(driver)
+
+        def list_page_source():
+            html = driver.page_source
+            return PostParser.parse_post_list(html, selectors, base_url), len(html.encode('utf-8'))
+
+        def list_dom():
+            posts = DomExtractor.extract_post_list(recorder, selectors, base_url)
+            return posts, recorder.last_bytes
+
+        all_match &= report(
+            f'帖子列表 {list_url}',
+            measure(args.rounds, list_page_source),
+            measure(args.rounds, list_dom)
+        )
+
+        if args.detail_url:
+            browser.navigate_to(args.detail_url, wait_time=5)
+
+            def detail_page_source():
+                html = driver.page_source
+                return PostParser.parse_post_detail(html, selectors), len(html.encode('utf-8'))
+
+            def detail_dom():
+                detail = DomExtractor.extract_post_detail(recorder, selectors)
+                return detail, recorder.last_bytes
+
+            all_match &= report(
+                f'帖子详情 {args.detail_url}',
+                measure(args.rounds, detail_page_source),
+                measure(args.rounds, detail_dom)
+            )
+    finally:
+        browser.quit()
+
+    sys.exit(0 if all_match else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+解析引擎基准测试
+对比 BeautifulSoup 与 lxml / selectolax 引擎解析帖子列表和详情的速度（文档/秒）与峰值内存，并校验结果一致
+帖子列表同时测试局部解析（只解析 list_container 区域，标记为 +partial）
+峰值内存由 tracemalloc 统计，只包含 Python 分配，lxml / selectolax 在 C 层分配的文档树不计入
+
+用法（在项目根目录下）:
+    python scripts/benchmark_parser.py
+    python scripts/benchmark_parser.py --preset presets/nodeloc.json --list-html saved/list.html --detail-html saved/detail.html
+    python scripts/benchmark_parser.py --list-html saved/list.html --container .DiscussionList-discussions
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import logging
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.parsers.post_parser import PostParser
+from core.parsers.engines import get_engine
+
+def synthetic_list_html(count):
+    """生成与默认 Flarum 选择器匹配的列表页（含页头、侧栏、预加载 JSON、脚本、注释和空白）"""
+    items = []
+    for i in range(count):
+        items.append(f'''
+        <li data-id="{i + 1}" class="DiscussionListItem">
+          <div class="DiscussionListItem-main">
+            <a href="/d/{i + 1}-topic-{i}">
+              <h3 class="DiscussionListItem-title">  话题 {i} <em>标题</em><!-- 注释 --> &amp; 更多 <!-- x --> 尾部<script>{i}</script> 结束 </h3>
+            </a>
+            <script>var tracking = {i};</script>
+          </div>
+        </li>''')
+    preload = json.dumps({'discussions': [{'id': i, 'title': f'话题 {i}', 'tags': ['<li data-id="0">']} for i in range(count * 5)]})
+    header = ''.join(f'<li class="Nav-item"><a href="/t/{i}">标签 {i}</a></li>' for i in range(200))
+    sidebar = ''.join(f'<div class="Widget"><span>统计 {i}</span></div>' for i in range(300))
+    return (
+        f'<html><head><title>列表</title><style>li {{ color: red; }}</style>'
+        f'<script id="flarum-json-payload" type="application/json">{preload}</script></head>'
+        f'<body><header><ul class="Nav">{header}</ul></header><aside>{sidebar}</aside>'
+        f'<ul class="DiscussionList-discussions">{"".join(items)}</ul><footer><!-- <ul> --></footer></body></html>'
+    )
+
+def synthetic_detail_html(paragraphs):
+    body = ''.join(f'<p>第 {i} 段 <strong>内容</strong>\n  <a href="#">链接</a></p><script>x={i}</script>' for i in range(paragraphs))
+    return (
+        '<html><body><h2 class="DiscussionHero-title"> 帖子标题 </h2>'
+        f'<div class="Post-body">{body}<template><p>隐藏</p></template></div></body></html>'
+    )
+
+def measure(func, rounds):
+    """返回 (结果, 文档/秒, 峰值内存 KB)"""
+    result = func()
+    
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    elapsed = time.perf_counter() - start
+    
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return result, rounds / elapsed if elapsed else 0.0, peak / 1024
+
+def run(name, variants, rounds, func):
+    print(f'\n[{name}]')
+    baseline = None
+    all_match = True
+    for variant in variants:
+        result, docs_per_sec, peak_kb = measure(lambda: func(variant), rounds)
+        if baseline is None:
+            baseline = result
+        match = result == baseline
+        all_match &= match
+        print(f'  {variant:<19}: {docs_per_sec:10.1f} 文档/秒  Python 峰值内存 {peak_kb:10.1f} KB  结果一致: {"是" if match else "否"}')
+    return all_match
+
+def main():
+    parser = argparse.ArgumentParser(description='对比帖子解析引擎')
+    parser.add_argument('--preset', help='预设 JSON 文件路径（使用其中的选择器）')
+    parser.add_argument('--list-html', help='保存的帖子列表页 HTML，未指定时使用生成的页面')
+    parser.add_argument('--detail-html', help='保存的帖子详情页 HTML，未指定时使用生成的页面')
+    parser.add_argument('--container', help='局部解析使用的帖子列表容器选择器，默认取预设的 list_container')
+    parser.add_argument('--rounds', type=int, default=50, help='每个引擎解析次数')
+    args = parser.parse_args()
+    
+    # 解析器每次都会输出帖子数量，基准测试时关闭
+    logging.disable(logging.INFO)
+    
+    base_url, selectors = 'https://example.com', {'list_container': '.DiscussionList-discussions'}
+    if args.preset:
+        with open(args.preset, 'r', encoding='utf-8') as f:
+            preset = json.load(f)
+        base_url, selectors = preset['base_url'], preset['selectors']
+    
+    if args.list_html:
+        with open(args.list_html, 'r', encoding='utf-8') as f:
+            list_html = f.read()
+    else:
+        list_html = synthetic_list_html(60)
+    
+    if args.detail_html:
+        with open(args.detail_html, 'r', encoding='utf-8') as f:
+            detail_html = f.read()
+    else:
+        detail_html = synthetic_detail_html(200)
+    
+    engines = ['bs4'] + [name for name in ('lxml', 'selectolax') if getattr(get_engine(name), 'name', None) == name]
+    
+    container = args.container or selectors.get('list_container')
+    full_selectors = {k: v for k, v in selectors.items() if k not in ('list_container', 'partial_parse')}
+    partial_selectors = dict(full_selectors, partial_parse=True)
+    if container:
+        partial_selectors['list_container'] = container
+    
+    def parse_list(variant):
+        engine, _, partial = variant.partition('+')
+        return PostParser.parse_post_list(list_html, partial_selectors if partial else full_selectors, base_url, engine=engine)
+    
+    all_match = run(
+        f'帖子列表 {len(list_html) / 1024:.1f} KB，容器 {container or "无（仅去除脚本）"}',
+        [variant for engine in engines for variant in (engine, engine + '+partial')], args.rounds,
+        parse_list
+    )
+    all_match &= run(
+        f'帖子详情 {len(detail_html) / 1024:.1f} KB',
+        engines, args.rounds,
+        lambda engine: PostParser.parse_post_detail(detail_html, selectors, engine=engine)
+    )
+    
+    sys.exit(0 if all_match else 1)
+
+if __name__ == '__main__':
+    main()